@@ -1,16 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
 import logging
 
-from preprocessing.video.load_videos_data import load_video_transcripts
-from preprocessing.pdf.load_pdfs_data import load_pdf_collection
-from models.embedder import Embedder
-from models.gemini_llm_client import GeminiLLMClient
+from models.registry import create_embedder, create_llm_client
 from rag.answer_refiner import AnswerRefiner
-from rag.retrievel import retrieve_from_videos, retrieve_from_pdfs
-from rag.format_answers import format_answer
-import os
+from rag.refinement_cache import refinement_cache_from_env
+from rag.semantic_cache import SemanticAnswerCache
+from rag.batch import answer_batch, batch_result
+from rag.micro_batcher import MicroBatcher
+from rag.retrieval_coordinator import RetrievalCoordinator
+from rag.retrievel import load_or_build_retriever, build_retriever, unified_index_enabled, document_id
+from rag.reindex import ReindexManager
+from indexing.snapshots import publish_snapshot
+from rag.format_answers import format_answer, format_answer_head, answer_source
+from preprocessing.video.load_videos_data import parse_video_transcript
+from preprocessing.pdf.load_pdfs_data import load_pdf_bytes
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -27,6 +36,27 @@ class AskRequest(BaseModel):
 class AskResponse(BaseModel):
     answer: str
 
+
+class BatchAskRequest(BaseModel):
+    questions: list[str]
+
+
+class DocumentResponse(BaseModel):
+    document_id: str
+    source: str
+    chunks: int
+
+
+class ReindexRequest(BaseModel):
+    embedding_model: str | None = None
+
+
+class ReindexStatus(BaseModel):
+    generation: int
+    rebuilding: bool
+    last_error: str | None = None
+    last_duration: float | None = None
+
 @app.on_event("startup")
 def startup():
     """
@@ -36,25 +66,105 @@ def startup():
     and builds vector indexes used for retrieval during API requests.
 
     Notes:
-        - Data sources are loaded once at startup.
-        - Adding new files requires restarting the service or re-indexing.
+        - Data sources are loaded, chunked and embedded once at startup.
+        - If `INDEX_DIR` is set and holds a snapshot, the indexes are
+          memory-mapped from it instead of re-ingesting the sources.
+        - Documents can be added or removed at runtime through the
+          `/documents` endpoints without re-indexing the corpus.
+        - A full rebuild can be run in the background through `/reindex`
+          while requests keep being served.
     """
 
-    global embedder, llm_client, answer_refiner, videos, pdfs
+    global embedder, llm_client, answer_refiner, index_manager, semantic_cache, cpu_executor, query_batcher, retrieval
 
     logging.info("Loading resources...")
 
-    embedder = Embedder()
-    llm_client = GeminiLLMClient()
-    answer_refiner = AnswerRefiner(llm_client)
+    # Backends are imported on selection (EMBEDDING_BACKEND, LLM_BACKEND).
+    embedder = create_embedder()
+    llm_client = create_llm_client()
+    answer_refiner = AnswerRefiner(llm_client, cache=refinement_cache_from_env())
+    semantic_cache = SemanticAnswerCache.from_env()
+    # Bounded pool for CPU-bound embedding and FAISS work, so the event
+    # loop stays free to drive many concurrent LLM calls.
+    cpu_executor = ThreadPoolExecutor(
+        max_workers=int(os.getenv("CPU_WORKERS", os.cpu_count() or 1)),
+        thread_name_prefix="cpu",
+    )
+    # Searches the video and PDF sources concurrently on its own pool.
+    retrieval = RetrievalCoordinator.from_env()
+    # Coalesces concurrent /ask questions into batched encodes and searches.
+    query_batcher = MicroBatcher.from_env(_answer_questions, executor=cpu_executor)
 
-    videos = load_video_transcripts(os.getenv("VIDEO_SOURCE_PATH"))
-    pdfs = load_pdf_collection(os.getenv("PDF_SOURCE_PATH"))
+    retriever = load_or_build_retriever(
+        embedder,
+        os.getenv("VIDEO_SOURCE_PATH"),
+        os.getenv("PDF_SOURCE_PATH"),
+        index_dir=os.getenv("INDEX_DIR"),
+        unified=unified_index_enabled(),
+    )
+    index_manager = ReindexManager(
+        retriever,
+        persist=_persist_snapshot,
+        persist_delay=float(os.getenv("SNAPSHOT_DELAY", 5)),
+    )
 
     logging.info("Startup completed")
 
+@app.on_event("shutdown")
+def shutdown():
+    """
+    Writes the snapshot of document changes not persisted yet.
+    """
+    index_manager.flush()
+
+def _answer_questions(items):
+    """
+    Processes one micro-batch of `/ask` questions.
+
+    Questions are grouped by the retriever generation they were submitted
+    against. Each group is embedded in one batch and looked up in the
+    semantic answer cache; the misses are then retrieved with one
+    multi-row search per source, both sources searched concurrently by
+    the `RetrievalCoordinator`.
+
+    Args:
+        items: List of (retriever, question, corpus_version) tuples.
+
+    Returns:
+        One (q_vec, (video_answer, pdf_answer), cached) tuple per item.
+    """
+    groups = {}
+    for i, (retriever, _, _) in enumerate(items):
+        groups.setdefault(id(retriever), []).append(i)
+
+    results = [None] * len(items)
+    for indices in groups.values():
+        retriever = items[indices[0]][0]
+        questions = [items[i][1] for i in indices]
+        q_vecs = retriever.embedder.embed_queries(questions)
+
+        misses = []
+        for j, i in enumerate(indices):
+            cached = semantic_cache.lookup(q_vecs[j], items[i][2])
+            if cached is not None:
+                results[i] = (q_vecs[j], cached, True)
+            else:
+                misses.append(j)
+
+        if misses:
+            answers = retrieval.retrieve_batch(
+                retriever,
+                [questions[j] for j in misses],
+                q_vecs=q_vecs[misses],
+            )
+            for j, answer in zip(misses, answers):
+                results[indices[j]] = (q_vecs[j], answer, False)
+
+    return results
+
+
 @app.post("/ask", response_model=AskResponse)
-def ask(req: AskRequest):
+async def ask(req: AskRequest):
     """
     Answers a user question using the RAG pipeline.
 
@@ -62,6 +172,15 @@ def ask(req: AskRequest):
     If no sufficiently similar video result is found, it falls back to PDF
     documents. The retrieved answer may optionally be refined using an LLM.
 
+    Questions that are near-duplicates of a previously answered one (see
+    `SemanticAnswerCache`) reuse its refined answer without retrieval or
+    refinement, as long as the corpus has not changed since.
+
+    Embedding and vector search go through a `MicroBatcher`: questions
+    arriving within a few milliseconds of each other are embedded and
+    searched as one batch on the bounded CPU executor. The LLM call is
+    awaited, so a worker never blocks a thread on the network.
+
     Args:
         req: Request body containing the user question.
 
@@ -72,19 +191,16 @@ def ask(req: AskRequest):
     """
     
     question = req.question
+    # Use one generation for the whole request, even if a rebuild swaps it.
+    corpus_version = index_manager.corpus_version
+    retriever = index_manager.current
 
-    video_threshold = float(os.getenv("VIDEO_SIMILARITY_THRESHOLD", 0.7))
-    pdf_threshold = float(os.getenv("PDF_SIMILARITY_THRESHOLD", 0.7))
-
-    video_answer = retrieve_from_videos(
-        question, videos, embedder, video_threshold
+    q_vec, (video_answer, pdf_answer), cached = await query_batcher.submit(
+        (retriever, question, corpus_version)
     )
-
-    pdf_answer = None
-    if not video_answer:
-        pdf_answer = retrieve_from_pdfs(
-            question, pdfs, embedder, pdf_threshold
-        )
+    if cached:
+        logging.info("Semantic cache hit")
+        return AskResponse(answer=format_answer(question, video_answer, pdf_answer))
 
     if not video_answer and not pdf_answer:
         raise HTTPException(
@@ -92,11 +208,12 @@ def ask(req: AskRequest):
             detail="No relevant answer found",
         )
 
-    video_answer, pdf_answer = answer_refiner.refine_answer(
+    video_answer, pdf_answer = await answer_refiner.arefine_answer(
         question,
         video_answer,
         pdf_answer,
     )
+    semantic_cache.store(q_vec, (video_answer, pdf_answer), corpus_version)
 
     formatted = format_answer(
         question=question,
@@ -109,4 +226,309 @@ def ask(req: AskRequest):
     return AskResponse(answer=formatted)
 
 
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _ask_stream(question: str) -> StreamingResponse:
+    """
+    Retrieves the answer to `question` and streams it as Server-Sent Events.
+
+    Events:
+        - `source`: sent as soon as retrieval finishes, with the source
+          metadata and `text`, the formatted answer up to the refinement
+          (see `format_answer_head`).
+        - `token`: one per piece of the refined answer, in order.
+          Concatenating `source.text` and every `token.text` gives the
+          `/ask` answer.
+        - `done`: the answer is complete.
+
+    Raises:
+        HTTPException: 404 before any event if no relevant answer is found.
+    """
+    corpus_version = index_manager.corpus_version
+    retriever = index_manager.current
+
+    q_vec, (video_answer, pdf_answer), cached = await query_batcher.submit(
+        (retriever, question, corpus_version)
+    )
+    if not video_answer and not pdf_answer:
+        raise HTTPException(
+            status_code=404,
+            detail="No relevant answer found",
+        )
+
+    async def events():
+        yield _sse_event("source", {
+            "question": question,
+            "source": answer_source(video_answer, pdf_answer),
+            "text": format_answer_head(question, video_answer, pdf_answer),
+        })
+
+        if cached:
+            logging.info("Semantic cache hit")
+            refined = video_answer.refined_answer if video_answer else pdf_answer.summary
+            yield _sse_event("token", {"text": refined})
+        else:
+            async for piece in answer_refiner.astream_refinement(question, video_answer, pdf_answer):
+                yield _sse_event("token", {"text": piece})
+            semantic_cache.store(q_vec, (video_answer, pdf_answer), corpus_version)
+
+        yield _sse_event("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/ask/stream")
+async def ask_stream(req: AskRequest):
+    """
+    Streaming variant of `/ask` using Server-Sent Events.
+
+    The source block is sent right after retrieval, then the refined
+    answer is streamed while the LLM generates it.
+    """
+    return await _ask_stream(req.question)
+
+
+@app.get("/ask/stream")
+async def ask_stream_get(question: str):
+    """
+    Same as `POST /ask/stream`, with the question as a query parameter so
+    browsers can consume it with `EventSource`.
+    """
+    return await _ask_stream(question)
+
+
+@app.post("/ask/batch")
+async def ask_batch(req: BatchAskRequest):
+    """
+    Answers many questions in one request.
+
+    All questions are embedded in one batch and each source is searched
+    with one multi-row query; LLM refinements then run concurrently
+    (`BATCH_LLM_CONCURRENCY`).
+
+    Args:
+        req: Request body containing the list of questions.
+
+    Returns:
+        A newline-delimited JSON stream with one
+        `{"index", "question", "answer"}` object per question, written in
+        completion order. `answer` is null when nothing relevant was found.
+    """
+    retriever = index_manager.current
+    video_threshold = float(os.getenv("VIDEO_SIMILARITY_THRESHOLD", 0.7))
+    pdf_threshold = float(os.getenv("PDF_SIMILARITY_THRESHOLD", 0.7))
+
+    async def stream():
+        async for i, video_answer, pdf_answer in answer_batch(
+            req.questions,
+            retriever,
+            answer_refiner,
+            video_threshold,
+            pdf_threshold,
+            concurrency=int(os.getenv("BATCH_LLM_CONCURRENCY", 16)),
+            executor=cpu_executor,
+        ):
+            result = batch_result(i, req.questions[i], video_answer, pdf_answer)
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _persist_snapshot(retriever):
+    """
+    Publishes the indexes as a new `INDEX_DIR` snapshot generation, if
+    configured, so that runtime changes survive a restart.
+    """
+    index_dir = os.getenv("INDEX_DIR")
+    if index_dir:
+        publish_snapshot(index_dir, retriever.save)
+
+
+def _source_dir(source: str) -> str | None:
+    return os.getenv("VIDEO_SOURCE_PATH" if source == "video" else "PDF_SOURCE_PATH")
+
+
+def _check_document_id(doc_id: str):
+    """
+    Rejects document ids that cannot be used as a file name in the source
+    directory, e.g. a `video_id` with path separators or `..`.
+    """
+    if (
+        not isinstance(doc_id, str)
+        or not doc_id
+        or doc_id in (".", "..")
+        or Path(doc_id).name != doc_id
+        or any(c in doc_id for c in "\\/\0")
+    ):
+        raise HTTPException(status_code=400, detail=f"Invalid document id {doc_id!r}")
+
+
+def _source_path(source_dir: str, name: str) -> Path:
+    """
+    Returns the path of `name` in `source_dir`, refusing any path that
+    resolves outside of it.
+    """
+    path = Path(source_dir) / name
+    if path.resolve().parent != Path(source_dir).resolve():
+        raise HTTPException(status_code=400, detail=f"Invalid document id {name!r}")
+    return path
+
+
+@app.post("/documents", response_model=DocumentResponse)
+def add_document(file: UploadFile):
+    """
+    Indexes a new video transcript (.json) or PDF (.pdf) document.
+
+    Only the uploaded document is chunked and embedded; its vectors are
+    added to the existing index under new chunk IDs. Uploading a document
+    whose identifier is already indexed replaces it. The file is also
+    stored in the source directory so that full rebuilds include it: it
+    overwrites the file the document was ingested from, and other files
+    sharing its identifier are deleted.
+
+    Args:
+        file: Uploaded video transcript JSON or PDF file.
+
+    Returns:
+        The document identifier (video ID or PDF filename), its source
+        type and the number of chunks indexed.
+    """
+    filename = Path(file.filename or "").name
+    data = file.file.read()
+    suffix = Path(filename).suffix.lower()
+
+    try:
+        if suffix == ".json":
+            source = "video"
+            body = json.loads(data)
+            if not isinstance(body, dict):
+                raise ValueError("expected a JSON object")
+            doc = parse_video_transcript(body)
+        elif suffix == ".pdf":
+            source = "pdf"
+            doc = load_pdf_bytes(filename, data)
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Only .json video transcripts and .pdf documents are supported",
+            )
+    except (ValueError, KeyError, TypeError, RuntimeError) as e:
+        # TypeError: well-formed JSON of the wrong shape, e.g. a non-int token id.
+        raise HTTPException(status_code=400, detail=f"Invalid {suffix} document: {e}")
+
+    # The id names the stored source file, so it is checked before indexing.
+    doc_id = document_id(source, doc)
+    _check_document_id(doc_id)
+
+    source_dir = _source_dir(source)
+    existing = [Path(path) for path in index_manager.current.source_files.get(doc_id, [])]
+    target = None
+    if existing:
+        target = existing[0]
+    elif source_dir:
+        # PDF ids are filenames; name new transcript files after the video id
+        # so uploads with a generic filename do not overwrite each other.
+        target = _source_path(source_dir, filename if source == "pdf" else f"{doc_id}.json")
 
+    try:
+        doc_id, n_chunks = index_manager.add_document(source, doc, source_file=target)
+    except RuntimeError as e:
+        # The index could not be modified; the document is not indexed.
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if target is not None:
+        target.write_bytes(data)
+        # Other copies would be merged back into the document on a rebuild.
+        for path in existing[1:]:
+            path.unlink(missing_ok=True)
+
+    return DocumentResponse(document_id=doc_id, source=source, chunks=n_chunks)
+
+
+@app.delete("/documents/{document_id}", response_model=DocumentResponse)
+def delete_document(document_id: str):
+    """
+    Removes a document and all of its vectors from the index, and its
+    files from the source directory so that full rebuilds exclude it.
+
+    Args:
+        document_id: Video ID or PDF filename of the document.
+
+    Returns:
+        The document identifier, its source type and the number of
+        vectors removed.
+    """
+    source_files = list(index_manager.current.source_files.get(document_id, []))
+    try:
+        source, removed = index_manager.remove_document(document_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown document {document_id}")
+    except RuntimeError as e:
+        # e.g. HNSW indexes do not support removal
+        raise HTTPException(status_code=409, detail=str(e))
+
+    for path in source_files:
+        Path(path).unlink(missing_ok=True)
+
+    return DocumentResponse(document_id=document_id, source=source, chunks=removed)
+
+
+@app.post("/reindex", response_model=ReindexStatus, status_code=202)
+def reindex(req: ReindexRequest | None = None):
+    """
+    Starts a full rebuild of the indexes in the background.
+
+    The sources are reloaded, chunked and embedded (optionally with a new
+    embedding model) in a worker thread while `/ask` keeps serving the
+    current generation. The new generation is swapped in atomically when
+    it is complete.
+
+    Args:
+        req: Optional body selecting a different embedding model.
+
+    Returns:
+        The rebuild status. Responds with 409 if a rebuild is already running.
+    """
+    model_name = req.embedding_model if req else None
+
+    def build():
+        rebuild_embedder = create_embedder(model_name=model_name) if model_name else index_manager.current.embedder
+        return build_retriever(
+            rebuild_embedder,
+            os.getenv("VIDEO_SOURCE_PATH"),
+            os.getenv("PDF_SOURCE_PATH"),
+            unified=unified_index_enabled(),
+        )
+
+    if not index_manager.start_rebuild(build):
+        raise HTTPException(status_code=409, detail="A rebuild is already running")
+
+    return ReindexStatus(**index_manager.status())
+
+
+@app.get("/reindex", response_model=ReindexStatus)
+def reindex_status():
+    """
+    Returns the serving index generation and the state of the last rebuild.
+    """
+    return ReindexStatus(**index_manager.status())
+
+
+@app.get("/stats")
+def stats():
+    """
+    Returns cache and serving statistics for monitoring.
+    """
+    query_cache = getattr(index_manager.current.embedder, "query_cache", None)
+    return {
+        "query_embedding_cache": query_cache.stats() if query_cache else None,
+        "refinement_cache": answer_refiner.cache.stats() if answer_refiner.cache else None,
+        "semantic_answer_cache": semantic_cache.stats(),
+        "query_micro_batching": query_batcher.stats(),
+    }
@@ -0,0 +1,126 @@
+"""
+Import-time benchmark for the CLI and API entry points.
+
+Each entry module is imported in a fresh interpreter with
+`python -X importtime`, and the cumulative import time plus the slowest
+imported modules are reported. With `--check`, the run fails when an
+entry point imports one of the heavy ML/PDF/FAISS stacks at module level
+(they must only load once a backend is selected or an index is used) or
+exceeds its import-time budget (BUDGET_MS, or `--budget-ms` for all).
+
+Usage:
+    python benchmark_import_time.py --repeat 5 --top 10 --check
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent
+
+ENTRY_POINTS = {
+    "cli": "main",
+    "cli client": "rag.daemon",
+    "api worker": "api.app",
+}
+
+# Cumulative import-time budget per entry module, in milliseconds. The API
+# worker is dominated by FastAPI itself (~0.4 s); the budgets leave room
+# for slower machines but catch a heavy stack creeping back in.
+BUDGET_MS = {
+    "main": 300,
+    "rag.daemon": 300,
+    "api.app": 1500,
+}
+
+# Top-level packages that must not be imported by the entry modules.
+HEAVY_MODULES = (
+    "faiss",
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "fitz",
+    "pymupdf",
+    "google.genai",
+)
+
+
+def measure_imports(module: str, python: str = sys.executable) -> dict[str, tuple[int, int]]:
+    """
+    Imports `module` in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        Mapping of each imported module to its (self, cumulative) import
+        time in microseconds.
+    """
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    return imports
+
+
+def fastest_import(module: str, repeat: int = 3) -> dict[str, tuple[int, int]]:
+    """
+    Returns the imports (see `measure_imports`) of the fastest of `repeat`
+    runs, to filter out scheduling noise.
+    """
+    runs = [measure_imports(module) for _ in range(repeat)]
+    return min(runs, key=lambda run: run[module][1])
+
+
+def heavy_imports(imports: dict) -> list[str]:
+    """
+    Returns the heavy modules (see HEAVY_MODULES) present in `imports`.
+    """
+    return sorted(
+        name for name in imports
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3, help="runs per entry point; the fastest is reported")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules to list")
+    parser.add_argument("--check", action="store_true", help="fail on heavy imports or budget overruns")
+    parser.add_argument("--budget-ms", type=float, default=None, help="maximum cumulative import time per entry point (default: BUDGET_MS)")
+    args = parser.parse_args()
+
+    failures = []
+    for label, module in ENTRY_POINTS.items():
+        imports = fastest_import(module, args.repeat)
+        total_ms = imports[module][1] / 1000
+
+        print(f"{label} ({module}): {total_ms:.1f} ms")
+        slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+        for name, (self_us, cumulative_us) in slowest:
+            print(f"    {self_us / 1000:8.1f} ms self  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+        heavy = heavy_imports(imports)
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)}")
+        budget_ms = args.budget_ms if args.budget_ms is not None else BUDGET_MS[module]
+        if total_ms > budget_ms:
+            failures.append(f"{module} took {total_ms:.1f} ms (budget {budget_ms} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# Chunk IDs are 64-bit integers: the upper bits identify the document,
+# the lower DOC_SHIFT bits the chunk position within that document.
+# All chunks of one document therefore occupy a contiguous ID range.
+DOC_SHIFT = 32
+
+
+def make_chunk_id(doc_key: int, position: int) -> int:
+    """
+    Builds the stable ID of the chunk at `position` in document `doc_key`.
+    """
+    return (doc_key << DOC_SHIFT) | position
+
+
+def doc_key_of(chunk_id: int) -> int:
+    """
+    Returns the document key encoded in a chunk ID.
+    """
+    return int(chunk_id) >> DOC_SHIFT
+
+
+def doc_id_range(doc_key: int) -> tuple[int, int]:
+    """
+    Returns the half-open `[start, end)` range of chunk IDs of a document.
+    """
+    return doc_key << DOC_SHIFT, (doc_key + 1) << DOC_SHIFT
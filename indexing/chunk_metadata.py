@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+
+from indexing.chunk_table import CHUNK_KINDS, ChunkTable
+from preprocessing.pdf.pdf_chunk import PDFChunk
+from preprocessing.video.transcript_chunk import TranscriptChunk
+
+# Fields persisted for each chunk type, in constructor order.
+CHUNK_FIELDS = {
+    "video": (
+        TranscriptChunk,
+        ["video_id", "start_token_id", "end_token_id", "start_timestamp", "end_timestamp", "text"],
+    ),
+    "pdf": (
+        PDFChunk,
+        ["pdf_id", "page_number", "paragraph_index", "text"],
+    ),
+}
+
+
+def encode_chunk_columns(chunk_type: str, chunks: list) -> dict:
+    """
+    Returns the fields of `chunks` as a mapping of field name to column
+    of values, in chunk order.
+    """
+    _, fields = CHUNK_FIELDS[chunk_type]
+    return {
+        field: [getattr(chunk, field) for chunk in chunks]
+        for field in fields
+    }
+
+
+def decode_chunk_columns(chunk_type: str, columns: dict) -> list:
+    """
+    Rebuilds the chunk objects encoded with `encode_chunk_columns`.
+    """
+    chunk_cls, fields = CHUNK_FIELDS[chunk_type]
+    return [chunk_cls(*values) for values in zip(*(columns[field] for field in fields))]
+
+
+def save_chunks(chunks, path: str, chunk_type: str | None = None):
+    """
+    Writes chunk metadata to a compact column-oriented JSON file.
+
+    Each field is stored once as a list of values, so the i-th entry of
+    every column describes the chunk stored under the i-th chunk ID.
+
+    Args:
+        chunks: `ChunkTable`, or mapping of chunk ID to TranscriptChunk or
+            PDFChunk objects.
+        path: Destination file path.
+        chunk_type: "video" or "pdf" to write only the chunks of that
+            type, e.g. from a unified table. By default the chunks must
+            all be of one type.
+    """
+    table = chunks if isinstance(chunks, ChunkTable) else ChunkTable.from_chunks(chunks)
+    if chunk_type is None:
+        present = [kind for kind in CHUNK_KINDS if table.count(kind)]
+        if len(present) > 1:
+            raise ValueError("Chunks must all be TranscriptChunk or all be PDFChunk")
+        chunk_type = present[0] if present else "video"
+
+    ids, columns = table.columns(chunk_type)
+    payload = {
+        "type": chunk_type,
+        "count": len(ids),
+        "ids": ids,
+        "columns": columns,
+    }
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_chunks(path: str, table: ChunkTable | None = None) -> ChunkTable:
+    """
+    Reads chunk metadata written with `save_chunks`.
+
+    The columns are loaded straight into a `ChunkTable`; no chunk objects
+    are built.
+
+    Args:
+        path: Path to the metadata file.
+        table: Optional table to add the chunks to (e.g. to load both
+            sources of a unified index into one table).
+
+    Returns:
+        The table, mapping chunk ID to TranscriptChunk or PDFChunk.
+    """
+    with open(Path(path), "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    if table is None:
+        table = ChunkTable()
+    table.extend_columns(payload["type"], payload["ids"], payload["columns"])
+    return table
@@ -0,0 +1,224 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from indexing.chunk_metadata import encode_chunk_columns, decode_chunk_columns
+from preprocessing.pdf.load_pdfs_data import load_pdf_files
+from preprocessing.pdf.pdf_chunking import chunk_pdf_pages
+from preprocessing.video.load_videos_data import iter_video_files
+from preprocessing.video.video_chunking import chunk_video_transcript
+
+# Bump when the chunking logic changes without a change in its parameters.
+CHUNKER_VERSION = 1
+
+SOURCE_PATTERNS = {"video": "*.json", "pdf": "*.pdf"}
+
+
+def chunking_config(source: str) -> str:
+    """
+    Describes how `source` documents are chunked: the chunker version plus
+    the default parameters of the chunking function. Stored chunks built
+    with another configuration are re-processed.
+    """
+    chunker = chunk_video_transcript if source == "video" else chunk_pdf_pages
+    params = {
+        name: param.default
+        for name, param in inspect.signature(chunker).parameters.items()
+        if param.default is not inspect.Parameter.empty
+    }
+    return json.dumps(
+        {"version": CHUNKER_VERSION, "chunker": chunker.__name__, "params": params},
+        sort_keys=True,
+    )
+
+
+def file_hash(path) -> str:
+    """
+    Returns the SHA-256 of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ChunkStore:
+    """
+    Persistent store of the chunks produced from each source file.
+
+    For every transcript JSON and PDF file, the file size, modification
+    time, content hash and chunking configuration are stored in SQLite
+    next to its chunks. `sync` only loads and chunks files that are new or
+    changed since the last run, and forgets files that were deleted.
+
+    A file whose size and mtime are unchanged is trusted without reading
+    it. Otherwise its content hash decides, so a touched but identical file
+    is not re-processed either.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens (or creates) the store database.
+
+        Args:
+            path: Path to the SQLite file.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS source_files (
+                source TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                chunking_config TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                chunks TEXT NOT NULL,
+                PRIMARY KEY (source, path)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def sync(self, source: str, folder: str | None) -> list[tuple[str, list]]:
+        """
+        Brings the stored chunks of `folder` up to date and returns them.
+
+        Args:
+            source: "video" or "pdf".
+            folder: Source directory (None or missing is treated as empty).
+
+        Returns:
+            A list of (document id, chunks) tuples, one per readable file,
+            in filename order.
+        """
+        config = chunking_config(source)
+        paths = sorted(Path(folder).glob(SOURCE_PATTERNS[source])) if folder else []
+        keys = {path: str(path.resolve()) for path in paths}
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns, content_hash, chunking_config, doc_id, chunks "
+                "FROM source_files WHERE source = ?",
+                (source,),
+            ).fetchall()
+        stored = {row[0]: row[1:] for row in rows}
+
+        documents = {}
+        touched, changed = [], []
+        for path in paths:
+            stat = path.stat()
+            row = stored.get(keys[path])
+            if row is not None and row[3] == config and row[:2] == (stat.st_size, stat.st_mtime_ns):
+                documents[path] = (row[4], decode_chunk_columns(source, json.loads(row[5])))
+                continue
+
+            content_hash = file_hash(path)
+            if row is not None and row[3] == config and row[2] == content_hash:
+                documents[path] = (row[4], decode_chunk_columns(source, json.loads(row[5])))
+                touched.append((stat.st_size, stat.st_mtime_ns, source, keys[path]))
+            else:
+                changed.append((path, stat, content_hash))
+
+        fresh = self._process(source, [path for path, _, _ in changed])
+        updates = []
+        for path, stat, content_hash in changed:
+            if path not in fresh:
+                continue
+            doc_id, chunks = fresh[path]
+            documents[path] = (doc_id, chunks)
+            updates.append((
+                source, keys[path], stat.st_size, stat.st_mtime_ns, content_hash, config,
+                doc_id, json.dumps(encode_chunk_columns(source, chunks), ensure_ascii=False),
+            ))
+
+        # Deleted files, and files that can no longer be read, are dropped.
+        present = {keys[path] for path in documents}
+        gone = [(source, key) for key in stored if key not in present]
+
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE source_files SET size = ?, mtime_ns = ? WHERE source = ? AND path = ?",
+                touched,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO source_files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                updates,
+            )
+            self._conn.executemany(
+                "DELETE FROM source_files WHERE source = ? AND path = ?",
+                gone,
+            )
+            self._conn.commit()
+
+        logging.info(
+            f"Chunk store: {len(documents) - len(updates)} unchanged, "
+            f"{len(updates)} re-processed, {len(gone)} removed {source} files"
+        )
+        return [documents[path] for path in paths if path in documents]
+
+    def source_files(self) -> dict[str, list[str]]:
+        """
+        Returns the paths of the files stored for each document id, as of
+        the last `sync`.
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT doc_id, path FROM source_files ORDER BY path").fetchall()
+        files = {}
+        for doc_id, path in rows:
+            files.setdefault(doc_id, []).append(path)
+        return files
+
+    def _process(self, source: str, paths: list[Path]) -> dict:
+        """
+        Loads and chunks the given files.
+
+        Returns:
+            A mapping of path to (document id, chunks) for every file that
+            could be read.
+        """
+        if not paths:
+            return {}
+
+        if source == "pdf":
+            by_name = {path.name: path for path in paths}
+            return {
+                by_name[pdf["pdf_id"]]: (pdf["pdf_id"], chunk_pdf_pages(pdf))
+                for pdf in load_pdf_files(paths)
+            }
+
+        documents = {}
+        for path, video in iter_video_files(paths):
+            documents[path] = (
+                video["video_id"],
+                chunk_video_transcript(video_id=video["video_id"], tokens=video["video_transcripts"]),
+            )
+        return documents
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM source_files").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def chunk_store_from_env() -> ChunkStore | None:
+    """
+    Opens the chunk store configured by CHUNK_STORE_PATH, or returns None
+    when it is not set.
+    """
+    path = os.getenv("CHUNK_STORE_PATH")
+    return ChunkStore(path) if path else None
@@ -0,0 +1,411 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from indexing.chunk_ids import DOC_SHIFT
+from preprocessing.pdf.pdf_chunk import PDFChunk
+from preprocessing.video.transcript_chunk import TranscriptChunk
+
+# Chunk kinds stored in the `kind` column.
+CHUNK_KINDS = ("video", "pdf")
+
+# Column name -> dtype. `a`/`b` hold the start/end token ids of video
+# chunks and the page number/paragraph index of PDF chunks; `t0`/`t1` the
+# start/end timestamps of video chunks (NaN for PDF chunks). A text is
+# either token window [text_start, text_end) of transcript `text_source`,
+# or (text_source == -1) byte range [text_start, text_end) of the blob.
+_COLUMNS = {
+    "id": np.int64,
+    "alive": np.bool_,
+    "kind": np.uint8,
+    "doc": np.int32,
+    "a": np.int64,
+    "b": np.int64,
+    "t0": np.float64,
+    "t1": np.float64,
+    "text_source": np.int32,
+    "text_start": np.int64,
+    "text_end": np.int64,
+}
+
+# Compact once this many rows are dead and they outnumber the live ones.
+_COMPACT_MIN_DEAD = 1024
+
+
+class ChunkTable(MutableMapping):
+    """
+    Struct-of-arrays store of chunk metadata, keyed by 64-bit chunk ID.
+
+    Instead of one TranscriptChunk/PDFChunk object (plus a dict entry) per
+    chunk, every field is a NumPy column, document ids are interned, and
+    texts are either windows into the shared `TranscriptColumns` of their
+    transcript or byte ranges of one UTF-8 buffer. A chunk costs about 70
+    bytes plus its text.
+
+    The table behaves as a mapping of chunk ID to chunk, but chunk objects
+    are only built when a chunk is read, e.g. for the hits of a search.
+    Lookups binary-search the ID column, which stays sorted as long as IDs
+    are appended in increasing order (the common case, since document keys
+    only grow); otherwise a sorted permutation is rebuilt on demand.
+    Removed rows are tombstoned and compacted away in bulk.
+    """
+
+    def __init__(self):
+        self._n = 0
+        self._live = 0
+        self._columns = {name: np.empty(0, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._doc_names = []
+        self._doc_index = {}
+        self._transcripts = []
+        self._transcript_index = {}
+        self._blob = bytearray()
+        self._sorted = True
+        self._order = None
+
+    def copy(self) -> "ChunkTable":
+        """
+        Returns an independent copy of the table. Transcripts, which are
+        never modified, are shared.
+        """
+        table = ChunkTable()
+        table._columns = {name: column[: self._n].copy() for name, column in self._columns.items()}
+        table._n = self._n
+        table._live = self._live
+        table._doc_names = list(self._doc_names)
+        table._doc_index = dict(self._doc_index)
+        table._transcripts = list(self._transcripts)
+        table._transcript_index = dict(self._transcript_index)
+        table._blob = bytearray(self._blob)
+        table._sorted = self._sorted
+        return table
+
+    @classmethod
+    def from_chunks(cls, chunks) -> "ChunkTable":
+        """
+        Builds a table from a mapping of chunk ID to chunk object.
+        """
+        table = cls()
+        table.extend(list(chunks.keys()), list(chunks.values()))
+        return table
+
+    def _column(self, name: str) -> np.ndarray:
+        return self._columns[name][: self._n]
+
+    def _reserve(self, extra: int):
+        capacity = len(self._columns["id"])
+        if self._n + extra <= capacity:
+            return
+        capacity = max(16, 2 * capacity, self._n + extra)
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[: self._n] = column[: self._n]
+            self._columns[name] = grown
+
+    def _intern_doc(self, doc_id: str) -> int:
+        index = self._doc_index.get(doc_id)
+        if index is None:
+            index = self._doc_index[doc_id] = len(self._doc_names)
+            self._doc_names.append(doc_id)
+        return index
+
+    def _intern_transcript(self, columns) -> int:
+        index = self._transcript_index.get(id(columns))
+        if index is None:
+            index = self._transcript_index[id(columns)] = len(self._transcripts)
+            self._transcripts.append(columns)
+        return index
+
+    def _append_text(self, text: str) -> tuple[int, int]:
+        start = len(self._blob)
+        self._blob += text.encode("utf-8")
+        return start, len(self._blob)
+
+    def _append_rows(self, ids: np.ndarray, values: dict):
+        """
+        Appends rows given as full columns; IDs already present are
+        replaced.
+        """
+        count = len(ids)
+        if count == 0:
+            return
+
+        existing = self._rows(ids)
+        replaced = existing[existing >= 0]
+        if len(replaced):
+            self._columns["alive"][replaced] = False
+            self._live -= len(replaced)
+
+        if self._sorted:
+            increasing = count == 1 or bool(np.all(ids[1:] > ids[:-1]))
+            after_last = self._n == 0 or ids[0] > self._columns["id"][self._n - 1]
+            self._sorted = increasing and after_last and len(replaced) == 0
+
+        self._reserve(count)
+        rows = slice(self._n, self._n + count)
+        self._columns["id"][rows] = ids
+        self._columns["alive"][rows] = True
+        for name, column in values.items():
+            self._columns[name][rows] = column
+        self._n += count
+        self._live += count
+        self._order = None
+
+    def extend(self, ids, chunks):
+        """
+        Adds chunk objects under the given chunk IDs.
+
+        Args:
+            ids: Chunk IDs, one per chunk.
+            chunks: TranscriptChunk or PDFChunk objects (may be mixed).
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        count = len(chunks)
+        values = {name: np.empty(count, dtype=_COLUMNS[name]) for name in _COLUMNS if name not in ("id", "alive")}
+
+        for row, chunk in enumerate(chunks):
+            if isinstance(chunk, TranscriptChunk):
+                values["kind"][row] = 0
+                values["doc"][row] = self._intern_doc(chunk.video_id)
+                values["a"][row] = chunk.start_token_id
+                values["b"][row] = chunk.end_token_id
+                values["t0"][row] = chunk.start_timestamp
+                values["t1"][row] = chunk.end_timestamp
+                window = chunk.window
+            else:
+                values["kind"][row] = 1
+                values["doc"][row] = self._intern_doc(chunk.pdf_id)
+                values["a"][row] = chunk.page_number
+                values["b"][row] = chunk.paragraph_index
+                values["t0"][row] = np.nan
+                values["t1"][row] = np.nan
+                window = None
+
+            if window is not None:
+                columns, start, end = window
+                values["text_source"][row] = self._intern_transcript(columns)
+            else:
+                values["text_source"][row] = -1
+                start, end = self._append_text(chunk.text)
+            values["text_start"][row] = start
+            values["text_end"][row] = end
+
+        self._append_rows(ids, values)
+
+    def extend_columns(self, kind: str, ids, columns: dict):
+        """
+        Adds chunks given as field columns, as written by
+        `indexing.chunk_metadata.save_chunks`, without building chunk
+        objects.
+
+        Args:
+            kind: "video" or "pdf".
+            ids: Chunk IDs, one per chunk.
+            columns: Mapping of chunk field name to list of values.
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        count = len(ids)
+        video = kind == "video"
+        doc_field, a_field, b_field = (
+            ("video_id", "start_token_id", "end_token_id") if video
+            else ("pdf_id", "page_number", "paragraph_index")
+        )
+
+        encoded = [text.encode("utf-8") for text in columns["text"]]
+        lengths = np.fromiter((len(text) for text in encoded), dtype=np.int64, count=count)
+        text_end = len(self._blob) + np.cumsum(lengths)
+        self._blob += b"".join(encoded)
+
+        self._append_rows(ids, {
+            "kind": np.full(count, CHUNK_KINDS.index(kind), dtype=np.uint8),
+            "doc": np.fromiter((self._intern_doc(doc) for doc in columns[doc_field]), dtype=np.int32, count=count),
+            "a": np.asarray(columns[a_field], dtype=np.int64).reshape(-1),
+            "b": np.asarray(columns[b_field], dtype=np.int64).reshape(-1),
+            "t0": np.asarray(columns["start_timestamp"], dtype=np.float64).reshape(-1) if video else np.full(count, np.nan),
+            "t1": np.asarray(columns["end_timestamp"], dtype=np.float64).reshape(-1) if video else np.full(count, np.nan),
+            "text_source": np.full(count, -1, dtype=np.int32),
+            "text_start": text_end - lengths,
+            "text_end": text_end,
+        })
+
+    def _rows(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Returns the live row of each chunk ID, or -1 where it is absent.
+        """
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if self._live == 0 or len(ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+
+        if self._sorted:
+            order = None
+            keys = self._column("id")
+        else:
+            if self._order is None:
+                live = np.flatnonzero(self._column("alive"))
+                self._order = live[np.argsort(self._column("id")[live], kind="stable")]
+            order = self._order
+            keys = self._column("id")[order]
+
+        pos = np.minimum(np.searchsorted(keys, ids), len(keys) - 1)
+        rows = pos if order is None else order[pos]
+        found = (keys[pos] == ids) & self._column("alive")[rows]
+        return np.where(found, rows, -1)
+
+    def _text(self, row: int):
+        source = self._columns["text_source"][row]
+        start = int(self._columns["text_start"][row])
+        end = int(self._columns["text_end"][row])
+        if source >= 0:
+            return self._transcripts[source], start, end
+        return self._blob[start:end].decode("utf-8")
+
+    def _chunk(self, row: int):
+        columns = self._columns
+        doc_id = self._doc_names[columns["doc"][row]]
+        a, b = int(columns["a"][row]), int(columns["b"][row])
+        if columns["kind"][row] == 0:
+            return TranscriptChunk(
+                doc_id, a, b, float(columns["t0"][row]), float(columns["t1"][row]), self._text(row)
+            )
+        return PDFChunk(doc_id, a, b, self._text(row))
+
+    def __getitem__(self, chunk_id):
+        row = self._rows([chunk_id])[0]
+        if row < 0:
+            raise KeyError(chunk_id)
+        return self._chunk(row)
+
+    def __setitem__(self, chunk_id, chunk):
+        self.extend([chunk_id], [chunk])
+
+    def __delitem__(self, chunk_id):
+        row = self._rows([chunk_id])[0]
+        if row < 0:
+            raise KeyError(chunk_id)
+        self._kill(np.array([row]))
+
+    def __contains__(self, chunk_id) -> bool:
+        try:
+            return bool(self._rows([chunk_id])[0] >= 0)
+        except (TypeError, ValueError, OverflowError):
+            return False
+
+    def __iter__(self):
+        return iter(self._column("id")[self._column("alive")].tolist())
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _kill(self, rows: np.ndarray):
+        self._columns["alive"][rows] = False
+        self._live -= len(rows)
+        self._order = None
+        dead = self._n - self._live
+        if dead >= _COMPACT_MIN_DEAD and dead > self._live:
+            self._compact()
+
+    def remove_range(self, start: int, end: int) -> int:
+        """
+        Removes all chunks with IDs in `[start, end)`.
+
+        Returns:
+            Number of chunks removed.
+        """
+        ids = self._column("id")
+        rows = np.flatnonzero(self._column("alive") & (ids >= start) & (ids < end))
+        if len(rows):
+            self._kill(rows)
+        return len(rows)
+
+    def ids_in_range(self, start: int, end: int) -> np.ndarray:
+        """
+        Returns the live chunk IDs in `[start, end)`.
+        """
+        ids = self._column("id")
+        return ids[self._column("alive") & (ids >= start) & (ids < end)]
+
+    def _compact(self):
+        """
+        Drops dead rows, and the texts and transcripts only they used.
+        """
+        rows = np.flatnonzero(self._column("alive"))
+        columns = {name: self._column(name)[rows] for name in _COLUMNS}
+
+        blob = bytearray()
+        in_blob = np.flatnonzero(columns["text_source"] < 0)
+        for i in in_blob:
+            start, end = columns["text_start"][i], columns["text_end"][i]
+            columns["text_start"][i] = len(blob)
+            blob += self._blob[start:end]
+            columns["text_end"][i] = len(blob)
+
+        used = np.unique(columns["text_source"][columns["text_source"] >= 0])
+        remap = np.full(len(self._transcripts) + 1, -1, dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        columns["text_source"] = np.where(columns["text_source"] >= 0, remap[columns["text_source"]], -1)
+        self._transcripts = [self._transcripts[i] for i in used]
+        self._transcript_index = {id(transcript): i for i, transcript in enumerate(self._transcripts)}
+
+        self._columns = columns
+        self._n = self._live = len(rows)
+        self._blob = blob
+        self._order = None
+
+    def count(self, kind: str) -> int:
+        """
+        Returns the number of live chunks of `kind` ("video" or "pdf").
+        """
+        return int(np.count_nonzero(self._column("alive") & (self._column("kind") == CHUNK_KINDS.index(kind))))
+
+    def documents(self) -> list[tuple[str, str, int]]:
+        """
+        Returns (document id, kind, document key) for every document with
+        live chunks. The document key is the upper half of the chunk IDs.
+        """
+        alive = self._column("alive")
+        if not alive.any():
+            return []
+        rows = np.stack([
+            self._column("doc")[alive].astype(np.int64),
+            self._column("kind")[alive].astype(np.int64),
+            self._column("id")[alive] >> DOC_SHIFT,
+        ], axis=1)
+        return [
+            (self._doc_names[doc], CHUNK_KINDS[kind], key)
+            for doc, kind, key in np.unique(rows, axis=0).tolist()
+        ]
+
+    def columns(self, kind: str) -> tuple[list[int], dict]:
+        """
+        Exports the live chunks of `kind` in insertion order.
+
+        Returns:
+            Tuple of (chunk IDs, mapping of chunk field name to list of
+            values), as read by `extend_columns`.
+        """
+        rows = np.flatnonzero(self._column("alive") & (self._column("kind") == CHUNK_KINDS.index(kind)))
+        docs = [self._doc_names[doc] for doc in self._column("doc")[rows].tolist()]
+        texts = [self._text(row) for row in rows.tolist()]
+        texts = [text if isinstance(text, str) else text[0].text(text[1], text[2]) for text in texts]
+        a = self._column("a")[rows].tolist()
+        b = self._column("b")[rows].tolist()
+
+        if kind == "video":
+            fields = {
+                "video_id": docs,
+                "start_token_id": a,
+                "end_token_id": b,
+                "start_timestamp": self._column("t0")[rows].tolist(),
+                "end_timestamp": self._column("t1")[rows].tolist(),
+                "text": texts,
+            }
+        else:
+            fields = {"pdf_id": docs, "page_number": a, "paragraph_index": b, "text": texts}
+        return self._column("id")[rows].tolist(), fields
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the columns and the text buffer, in bytes (shared
+        transcripts excluded).
+        """
+        return sum(column.nbytes for column in self._columns.values()) + len(self._blob)
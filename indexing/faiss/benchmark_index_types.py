@@ -0,0 +1,109 @@
+"""
+Recall@k vs latency benchmark of the configurable index types against
+the exact flat baseline.
+
+Usage:
+    python -m indexing.faiss.benchmark_index_types --n 200000 --dim 384
+    python -m indexing.faiss.benchmark_index_types --vectors chunks.npy
+
+Without `--vectors`, random normalized vectors are used. Real chunk
+embeddings (e.g. saved with `np.save` from `Embedder.embed_texts`) give
+more representative recall numbers.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from indexing.faiss.index_factory import IndexConfig, apply_search_params
+from indexing.faiss.vector_index import VectorIndex
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """
+    Fraction of the exact top-k neighbours that were returned.
+    """
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def time_queries(index: VectorIndex, queries: np.ndarray, k: int):
+    """
+    Runs one search per query, as the API does.
+
+    Returns:
+        Tuple of (indices, mean latency in ms, p95 latency in ms).
+    """
+    results = []
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        _, indices = index.search(q, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(indices[0])
+    return np.array(results), float(np.mean(latencies)), float(np.percentile(latencies, 95))
+
+
+def operating_points(args):
+    """
+    Yields (label, config, knob) triples. Each config is built once and
+    then searched with every value of its query-time knob.
+    """
+    yield "flat", IndexConfig("flat"), []
+    yield "ivf_flat", IndexConfig("ivf_flat", nlist=args.nlist), [("nprobe", v) for v in args.nprobe]
+    yield "ivf_pq", IndexConfig("ivf_pq", nlist=args.nlist, pq_m=args.pq_m), [("nprobe", v) for v in args.nprobe]
+    yield "hnsw", IndexConfig("hnsw"), [("ef_search", v) for v in args.ef_search]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=str, help="Optional .npy file of corpus embeddings")
+    parser.add_argument("--n", type=int, default=100_000, help="Number of random corpus vectors")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--pq-m", type=int, default=16)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        corpus = np.load(args.vectors).astype(np.float32)
+    else:
+        corpus = rng.standard_normal((args.n, args.dim), dtype=np.float32)
+        corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+
+    # Queries are perturbed corpus vectors so that near neighbours exist.
+    picked = corpus[rng.choice(len(corpus), size=args.queries, replace=False)]
+    queries = picked + 0.1 * rng.standard_normal(picked.shape, dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"corpus: {corpus.shape[0]} x {corpus.shape[1]}, queries: {len(queries)}, k={args.k}")
+    print(f"{'index':<24}{'build s':>10}{'recall@k':>10}{'mean ms':>10}{'p95 ms':>10}")
+
+    truth = None
+    for name, config, knobs in operating_points(args):
+        start = time.perf_counter()
+        index = VectorIndex(dim=corpus.shape[1], config=config)
+        index.add(corpus)
+        build_s = time.perf_counter() - start
+
+        for knob, value in knobs or [(None, None)]:
+            label = name
+            if knob is not None:
+                setattr(config, knob, value)
+                apply_search_params(index.index, config)
+                label = f"{name} {knob}={value}"
+
+            found, mean_ms, p95_ms = time_queries(index, queries, args.k)
+            if truth is None:
+                truth = found
+            recall = recall_at_k(found, truth)
+
+            print(f"{label:<24}{build_s:>10.2f}{recall:>10.3f}{mean_ms:>10.3f}{p95_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
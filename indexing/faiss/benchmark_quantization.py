@@ -0,0 +1,156 @@
+"""
+Memory vs score drift report for reduced-precision vector storage.
+
+Each storage mode (scalar quantization, and the two-stage PCA-reduced
+search) is compared with the exact float32 flat index on the same corpus
+and queries:
+
+- RAM bytes/vector: in-memory size of the FAISS index per vector. The
+  float32 rescoring vectors are memory-mapped from disk and not counted
+  (the "disk" column).
+- ms/query: batched search latency.
+- top-1 agree: fraction of queries whose best chunk is unchanged.
+- drift: mean and max absolute error of the best score.
+- flips@T: fraction of queries whose accept/reject decision against the
+  similarity threshold T changes. The thresholds default to the
+  VIDEO_SIMILARITY_THRESHOLD and PDF_SIMILARITY_THRESHOLD settings used
+  by `rag.retrievel`.
+
+Usage:
+    python -m indexing.faiss.benchmark_quantization --n 200000 --dim 384 --pca-dim 64 --shortlist 100
+    python -m indexing.faiss.benchmark_quantization --vectors chunks.npy --thresholds 0.6 0.7
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from indexing.faiss.index_factory import IndexConfig
+from indexing.faiss.vector_index import VectorIndex
+
+# (label, index type, rescore factor or None for --rescore-factor, PCA-reduced)
+MODES = (
+    ("flat float32", "flat", 0, False),
+    ("sq_fp16", "sq_fp16", 0, False),
+    ("sq_fp16 + rescore", "sq_fp16", None, False),
+    ("sq_int8", "sq_int8", 0, False),
+    ("sq_int8 + rescore", "sq_int8", None, False),
+    ("pca", "flat", 0, True),
+    ("pca + rescore", "flat", None, True),
+)
+
+
+def default_thresholds() -> list[float]:
+    """
+    Returns the distinct video/PDF similarity thresholds from the settings.
+    """
+    return sorted({
+        float(os.getenv("VIDEO_SIMILARITY_THRESHOLD", 0.7)),
+        float(os.getenv("PDF_SIMILARITY_THRESHOLD", 0.7)),
+    })
+
+
+def drift_report(exact: tuple, approx: tuple, thresholds: list[float]) -> dict:
+    """
+    Compares the top-1 results of an approximate search with the exact ones.
+
+    Args:
+        exact: (scores, ids) of the exact search.
+        approx: (scores, ids) of the approximate search.
+        thresholds: Similarity thresholds to count decision flips for.
+
+    Returns:
+        Mapping with `agree`, `mean_drift`, `max_drift` and `flips` (a
+        mapping of threshold to flip rate).
+    """
+    exact_scores, exact_ids = exact[0][:, 0], exact[1][:, 0]
+    scores, ids = approx[0][:, 0], approx[1][:, 0]
+    drift = np.abs(scores - exact_scores)
+    return {
+        "agree": float(np.mean(ids == exact_ids)),
+        "mean_drift": float(drift.mean()),
+        "max_drift": float(drift.max()),
+        "flips": {t: float(np.mean((scores > t) != (exact_scores > t))) for t in thresholds},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=str, help="Optional .npy file of corpus embeddings")
+    parser.add_argument("--n", type=int, default=100_000, help="Number of random corpus vectors")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument("--pca-dim", type=int, default=64)
+    parser.add_argument("--shortlist", type=int, default=100)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=None)
+    args = parser.parse_args()
+    thresholds = args.thresholds or default_thresholds()
+
+    rng = np.random.default_rng(0)
+    if args.vectors:
+        corpus = np.load(args.vectors).astype(np.float32)
+    else:
+        corpus = rng.standard_normal((args.n, args.dim), dtype=np.float32)
+        corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+
+    # Perturbed corpus vectors with varying noise, so that best scores
+    # spread across the thresholds.
+    picked = corpus[rng.choice(len(corpus), size=args.queries, replace=False)]
+    noise = rng.uniform(0.05, 1.5, size=(args.queries, 1)).astype(np.float32)
+    queries = picked + noise * rng.standard_normal(picked.shape, dtype=np.float32) / np.sqrt(corpus.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    n, dim = corpus.shape
+    print(f"corpus: {n} x {dim}, queries: {len(queries)}, thresholds: {thresholds}")
+    header = f"{'storage':<20}{'RAM B/vec':>10}{'disk B/vec':>11}{'ms/query':>10}{'top-1 agree':>12}{'mean drift':>12}{'max drift':>11}"
+    print(header + "".join(f"{f'flips@{t:g}':>12}" for t in thresholds))
+
+    exact = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, index_type, rescore_factor, reduced in MODES:
+            if reduced and not 0 < args.pca_dim < dim:
+                continue
+            factor = args.rescore_factor if rescore_factor is None else rescore_factor
+            config = IndexConfig(
+                index_type,
+                rescore_factor=factor,
+                shortlist=args.shortlist if reduced else 0,
+                pca_dim=args.pca_dim if reduced else 0,
+            )
+            if reduced:
+                label = label.replace("pca", f"pca {args.pca_dim}")
+            index = VectorIndex(dim=dim, config=config)
+            index.add(corpus)
+
+            # Reload from disk, as a worker does, so rescoring reads the
+            # memory-mapped float32 vectors.
+            path = Path(tmp) / f"{label.replace(' ', '_')}.index"
+            index.save(path)
+            index = VectorIndex.load(path, config=config)
+
+            ram = faiss.serialize_index(index.index).nbytes / n
+            disk = index.rescore_store.dim * 4 if index.rescore_store is not None else 0
+            start = time.perf_counter()
+            result = index.search_batch(queries, 1)
+            latency = (time.perf_counter() - start) * 1000 / len(queries)
+            if exact is None:
+                exact = result
+            report = drift_report(exact, result, thresholds)
+
+            row = (
+                f"{label:<20}{ram:>10.1f}{disk:>11.0f}{latency:>10.3f}{report['agree']:>12.4f}"
+                f"{report['mean_drift']:>12.2e}{report['max_drift']:>11.2e}"
+            )
+            print(row + "".join(f"{report['flips'][t]:>12.4f}" for t in thresholds))
+
+    near = {t: float(np.mean(np.abs(exact[0][:, 0] - t) < 0.02)) for t in thresholds}
+    print("queries within 0.02 of a threshold: " + ", ".join(f"{t:g}: {v:.3f}" for t, v in near.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import logging
+import math
+import os
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq_fp16", "sq_int8")
+
+# Scalar-quantized types, whose candidates are rescored with float32 vectors.
+QUANTIZED_TYPES = {
+    "sq_fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq_int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+class IndexConfig:
+    """
+    Configuration of the FAISS index type and its build/search knobs.
+
+    Attributes:
+        index_type: One of "flat", "ivf_flat", "ivf_pq", "hnsw", "sq_fp16"
+            or "sq_int8".
+        nlist: Number of IVF cells (clamped to the training sample size).
+        nprobe: Number of IVF cells visited per query.
+        pq_m: Number of PQ sub-quantizers (must divide the dimension).
+        pq_nbits: Bits per PQ sub-quantizer code.
+        hnsw_m: Number of HNSW neighbours per node.
+        ef_construction: HNSW build-time search depth.
+        ef_search: HNSW query-time search depth.
+        train_sample: Maximum number of vectors used to train the index.
+        rescore_factor: For scalar-quantized and PCA-reduced indexes,
+            `k * rescore_factor` candidates are fetched and rescored with
+            the exact float32 vectors; 0 returns the approximate scores
+            as they are.
+        shortlist: Minimum number of candidates rescored per query.
+        pca_dim: When set below the embedding dimension, vectors are
+            projected to `pca_dim` dimensions (PCA trained at build time)
+            before indexing, and the shortlist is rescored at full
+            dimension. Indexes trained on fewer than `pca_dim` vectors
+            are kept at full dimension.
+    """
+
+    def __init__(self,
+                 index_type: str = "flat",
+                 nlist: int = 1024,
+                 nprobe: int = 16,
+                 pq_m: int = 16,
+                 pq_nbits: int = 8,
+                 hnsw_m: int = 32,
+                 ef_construction: int = 200,
+                 ef_search: int = 64,
+                 train_sample: int = 100_000,
+                 rescore_factor: int = 4,
+                 shortlist: int = 0,
+                 pca_dim: int = 0,
+                 ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.train_sample = train_sample
+        self.rescore_factor = rescore_factor
+        self.shortlist = shortlist
+        self.pca_dim = pca_dim
+
+    def reduces(self, dim: int, n_train: int | None = None) -> bool:
+        """
+        Whether `dim`-dimensional vectors are PCA-reduced before indexing.
+
+        A PCA fitted on fewer vectors than `pca_dim` has no `pca_dim`
+        directions to keep, so such small indexes are not reduced.
+        """
+        return 0 < self.pca_dim < dim and (n_train is None or n_train >= self.pca_dim)
+
+    def rescores(self, dim: int, n_train: int | None = None) -> bool:
+        """
+        Whether candidates are rescored with the float32 vectors, i.e.
+        the index is scalar-quantized or PCA-reduced and rescoring is on.
+        """
+        return self.rescore_factor > 0 and (self.index_type in QUANTIZED_TYPES or self.reduces(dim, n_train))
+
+    @classmethod
+    def from_env(cls) -> "IndexConfig":
+        """
+        Builds a configuration from `INDEX_*` environment variables.
+        """
+        return cls(
+            index_type=os.getenv("INDEX_TYPE", "flat").lower(),
+            nlist=int(os.getenv("INDEX_NLIST", 1024)),
+            nprobe=int(os.getenv("INDEX_NPROBE", 16)),
+            pq_m=int(os.getenv("INDEX_PQ_M", 16)),
+            pq_nbits=int(os.getenv("INDEX_PQ_NBITS", 8)),
+            hnsw_m=int(os.getenv("INDEX_HNSW_M", 32)),
+            ef_construction=int(os.getenv("INDEX_EF_CONSTRUCTION", 200)),
+            ef_search=int(os.getenv("INDEX_EF_SEARCH", 64)),
+            train_sample=int(os.getenv("INDEX_TRAIN_SAMPLE", 100_000)),
+            rescore_factor=int(os.getenv("INDEX_RESCORE_FACTOR", 4)),
+            shortlist=int(os.getenv("INDEX_SHORTLIST", 0)),
+            pca_dim=int(os.getenv("INDEX_PCA_DIM", 0)),
+        )
+
+
+def build_faiss_index(dim: int, config: IndexConfig, n_train: int | None = None) -> faiss.Index:
+    """
+    Creates an empty inner-product FAISS index for the configured type.
+
+    Args:
+        dim: Dimensionality of the embedding vectors.
+        config: Index configuration.
+        n_train: Number of training vectors that will be available. When
+            given, the number of IVF cells and PQ centroids is reduced so
+            that training remains possible on small corpora, and PCA
+            reduction is skipped for fewer than `pca_dim` vectors.
+
+    Returns:
+        A FAISS index. IVF, int8 and PCA-reduced indexes still need to be
+        trained (see `train_faiss_index`) before use.
+    """
+    if 0 < config.pca_dim < dim and not config.reduces(dim, n_train):
+        logging.info(f"Only {n_train} training vectors for a {config.pca_dim}-dimensional PCA, indexing at full dimension")
+    elif config.reduces(dim, n_train):
+        # Trained by `train_faiss_index`.
+        projection = faiss.PCAMatrix(dim, config.pca_dim)
+        return faiss.IndexPreTransform(projection, _build_base_index(config.pca_dim, config, n_train))
+    return _build_base_index(dim, config, n_train)
+
+
+def _build_base_index(dim: int, config: IndexConfig, n_train: int | None) -> faiss.Index:
+    metric = faiss.METRIC_INNER_PRODUCT
+
+    if config.index_type == "flat":
+        return faiss.IndexFlatIP(dim)
+
+    if config.index_type in QUANTIZED_TYPES:
+        return faiss.IndexScalarQuantizer(dim, QUANTIZED_TYPES[config.index_type], metric)
+
+    if config.index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, config.hnsw_m, metric)
+        index.hnsw.efConstruction = config.ef_construction
+        apply_search_params(index, config)
+        return index
+
+    nlist = config.nlist
+    if n_train is not None:
+        # FAISS needs at least one training point per cell; aim for ~39.
+        nlist = max(1, min(nlist, n_train // 39, int(math.sqrt(n_train)) * 4))
+
+    quantizer = faiss.IndexFlatIP(dim)
+    if config.index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+    else:
+        pq_m = _largest_divisor_at_most(dim, config.pq_m)
+        pq_nbits = config.pq_nbits
+        if n_train is not None:
+            pq_nbits = max(1, min(pq_nbits, int(math.log2(max(n_train, 2)))))
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, pq_m, pq_nbits, metric)
+
+    apply_search_params(index, config)
+    return index
+
+
+def train_faiss_index(index: faiss.Index, sample: np.ndarray):
+    """
+    Trains an index built by `build_faiss_index` on a sample of vectors.
+
+    The PCA projection of reduced indexes is fitted without centering, so
+    that inner products of the projected vectors approximate the
+    full-dimension ones rather than those of mean-shifted vectors.
+    """
+    if isinstance(index, faiss.IndexPreTransform):
+        projection = faiss.downcast_VectorTransform(index.chain.at(0))
+        # A sample symmetrized by its negation has zero mean, so PCAMatrix
+        # fits the second-moment matrix and applies no offset.
+        projection.train(np.concatenate([sample, -sample]))
+    index.train(sample)
+
+
+def apply_search_params(index: faiss.Index, config: IndexConfig):
+    """
+    Applies the query-time knobs (nprobe, efSearch) to an index.
+
+    Used both for freshly built indexes and for indexes loaded from disk.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(config.nprobe, ivf.nlist)
+
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    if isinstance(index, faiss.IndexPreTransform):
+        index = faiss.downcast_index(index.index)
+
+    if isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = config.ef_search
+
+
+def _largest_divisor_at_most(n: int, limit: int) -> int:
+    for m in range(min(n, limit), 0, -1):
+        if n % m == 0:
+            return m
+    return 1
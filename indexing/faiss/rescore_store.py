@@ -0,0 +1,222 @@
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Rows kept in memory before they are spilled to a memory-mapped segment.
+SPILL_ROWS = 16_384
+# Rows copied at a time when writing a segment.
+_WRITE_BLOCK = 65_536
+
+
+class RescoreStore:
+    """
+    Full-precision (float32) copies of indexed vectors, keyed by ID.
+
+    Quantized indexes only keep lossy codes in memory. This store keeps the
+    original vectors so that the candidates returned by a quantized search
+    can be rescored exactly.
+
+    The vectors live in memory-mapped segments, so only the rows of the
+    candidates being rescored are paged in and the resident cost is the
+    8-byte ID per vector. Added vectors are buffered in memory and spilled
+    to a temporary segment every `spill_rows` rows; segments are merged
+    geometrically, so there are O(log n) of them. Without the spill, an
+    index that is never saved would hold its quantized codes and all float32
+    vectors in RAM, i.e. more than a flat index. The price is disk space in
+    the temporary directory (`TMPDIR`) and a rewrite of each row about
+    log2(n / spill_rows) times while the index grows.
+
+    `save` writes a single segment next to the index file, and `load`
+    memory-maps it. A vector re-added under an existing ID replaces the
+    older copy, and rows of removed IDs are dropped on save.
+    """
+
+    def __init__(self, dim: int, spill_rows: int = SPILL_ROWS):
+        self.dim = dim
+        self.spill_rows = spill_rows
+        # Sorted (ids, vectors) segments with memory-mapped vectors; for
+        # duplicate IDs later segments win.
+        self._segments = []
+        # Rows added since the last spill: a sorted tail plus unmerged blocks.
+        self._tail = (np.empty(0, dtype=np.int64), np.empty((0, dim), dtype=np.float32))
+        self._pending = []
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """
+        Records the float32 vectors stored under `ids`.
+        """
+        self._pending.append((
+            np.array(ids, dtype=np.int64).reshape(-1),
+            np.array(vectors, dtype=np.float32).reshape(-1, self.dim),
+        ))
+        if len(self._tail[0]) + sum(len(block[0]) for block in self._pending) >= self.spill_rows:
+            self._spill()
+
+    @staticmethod
+    def _merge_order(blocks, live_ids=None):
+        """
+        Sorts the IDs of (ids, vectors) blocks, keeping the row of the latest
+        block for duplicate IDs (and only `live_ids` when given).
+
+        Returns:
+            Tuple of (sorted unique IDs, row of each in the concatenated blocks).
+        """
+        ids = np.concatenate([block[0] for block in blocks])
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+        last = np.append(sorted_ids[1:] != sorted_ids[:-1], True)[: len(sorted_ids)]
+        sorted_ids, order = sorted_ids[last], order[last]
+        if live_ids is not None:
+            keep = np.isin(sorted_ids, live_ids)
+            sorted_ids, order = sorted_ids[keep], order[keep]
+        return sorted_ids, order
+
+    def _merge(self, blocks):
+        # In-memory merge, for the small tail only.
+        ids, order = self._merge_order(blocks)
+        return ids, np.concatenate([block[1] for block in blocks])[order]
+
+    def _write(self, blocks, path, live_ids=None) -> np.ndarray:
+        """
+        Writes the merged vectors of `blocks` to an .npy file block by block,
+        so that memory-mapped segments are never loaded whole.
+
+        Returns:
+            The sorted IDs of the written rows.
+        """
+        ids, order = self._merge_order(blocks, live_ids)
+        offsets = np.cumsum([0] + [len(block[0]) for block in blocks])
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(len(ids), self.dim))
+        for start in range(0, len(ids), _WRITE_BLOCK):
+            rows = order[start:start + _WRITE_BLOCK]
+            source = np.searchsorted(offsets, rows, side="right") - 1
+            chunk = np.empty((len(rows), self.dim), dtype=np.float32)
+            for b in np.unique(source).tolist():
+                selected = source == b
+                chunk[selected] = blocks[b][1][rows[selected] - offsets[b]]
+            out[start:start + len(rows)] = chunk
+        out.flush()
+        del out
+        return ids
+
+    def _spill(self):
+        """
+        Moves the buffered rows into a new segment, merging it with the
+        previous segments while they are not much larger.
+        """
+        blocks = [self._tail] + self._pending
+        rows = sum(len(block[0]) for block in blocks)
+        if not rows:
+            return
+        while self._segments and len(self._segments[-1][0]) <= 2 * rows:
+            segment = self._segments.pop()
+            blocks.insert(0, segment)
+            rows += len(segment[0])
+
+        fd, path = tempfile.mkstemp(prefix="rescore-", suffix=".npy")
+        os.close(fd)
+        try:
+            ids = self._write(blocks, path)
+            vectors = np.load(path, mmap_mode="r")
+        finally:
+            # The mapping stays valid after the file is unlinked (POSIX).
+            os.unlink(path)
+
+        self._segments.append((ids, vectors))
+        self._tail = (np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32))
+        self._pending = []
+
+    def _flush_pending(self):
+        if self._pending:
+            self._tail = self._merge([self._tail] + self._pending)
+            self._pending = []
+
+    @staticmethod
+    def _lookup(sorted_ids, ids):
+        if not len(sorted_ids):
+            return np.zeros(len(ids), dtype=bool), np.zeros(len(ids), dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        return sorted_ids[pos] == ids, pos
+
+    def get(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Returns the vectors of `ids` (any shape), with zero vectors for
+        IDs that are not stored (e.g. the -1 padding of FAISS results).
+        """
+        self._flush_pending()
+        ids = np.asarray(ids, dtype=np.int64)
+        flat = ids.reshape(-1)
+        vectors = np.zeros((len(flat), self.dim), dtype=np.float32)
+
+        for sorted_ids, stored in self._segments + [self._tail]:
+            found, pos = self._lookup(sorted_ids, flat)
+            if found.any():
+                vectors[found] = stored[pos[found]]
+        return vectors.reshape(ids.shape + (self.dim,))
+
+    def copy(self) -> "RescoreStore":
+        """
+        Returns an independent copy. Segments and arrays are replaced rather
+        than modified in place, so they are shared.
+        """
+        store = RescoreStore(self.dim, self.spill_rows)
+        store._segments = list(self._segments)
+        store._tail = self._tail
+        store._pending = list(self._pending)
+        return store
+
+    def __len__(self) -> int:
+        self._flush_pending()
+        return len(np.unique(np.concatenate([ids for ids, _ in self._segments + [self._tail]])))
+
+    @property
+    def resident_nbytes(self) -> int:
+        """
+        Bytes held in memory, i.e. excluding memory-mapped rows.
+        """
+        total = 0
+        for ids, vectors in self._segments + [self._tail] + self._pending:
+            total += ids.nbytes + (0 if isinstance(vectors, np.memmap) else vectors.nbytes)
+        return total
+
+    def save(self, path, live_ids: np.ndarray | None = None):
+        """
+        Writes the store next to an index file, as `<path>.ids.npy` and
+        `<path>.vectors.npy`, then memory-maps the written vectors.
+
+        Args:
+            path: Base path (the index file path).
+            live_ids: IDs still present in the index; other rows are
+                dropped. All rows are kept when None.
+        """
+        self._flush_pending()
+        # Written aside and renamed, since a segment may be mapped from the
+        # destination itself.
+        tmp_path = f"{path}.vectors.tmp.npy"
+        ids = self._write(self._segments + [self._tail], tmp_path, live_ids)
+        os.replace(tmp_path, f"{path}.vectors.npy")
+        np.save(f"{path}.ids.npy", ids)
+
+        # Open files stay readable on POSIX even if the snapshot directory
+        # is later removed.
+        self._segments = [(ids, np.load(f"{path}.vectors.npy", mmap_mode="r"))]
+        self._tail = (np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32))
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "RescoreStore | None":
+        """
+        Reads a store written with `save`, or returns None if there is
+        none next to `path`.
+
+        Args:
+            path: Base path (the index file path).
+            mmap: Memory-map the vectors instead of reading them.
+        """
+        if not Path(f"{path}.vectors.npy").exists():
+            return None
+        vectors = np.load(f"{path}.vectors.npy", mmap_mode="r" if mmap else None)
+        store = cls(vectors.shape[1])
+        store._segments = [(np.load(f"{path}.ids.npy"), vectors)]
+        return store
@@ -1,6 +1,9 @@
 import faiss
 import numpy as np
 
+from indexing.faiss.index_factory import IndexConfig, build_faiss_index, train_faiss_index, apply_search_params
+from indexing.faiss.rescore_store import RescoreStore
+
 class VectorIndex:
     """
     Lightweight wrapper around a FAISS vector index for similarity search.
@@ -8,27 +11,170 @@ class VectorIndex:
     Uses inner product similarity on normalized vectors, which corresponds
     to cosine similarity. The index supports adding vectors and querying
     for the top-k most similar entries.
+
+    The underlying index type (exact flat search, IVF-Flat, IVF-PQ or
+    HNSW) is selected through an IndexConfig, by default read from the
+    `INDEX_*` environment variables. Indexes that need training are
+    trained on a sample of the first batch of added vectors.
+
+    Vectors are stored under stable 64-bit IDs, so search results refer to
+    those IDs rather than to insertion positions, and vectors can be
+    removed by ID or by ID range. IVF indexes store the IDs in their
+    inverted lists; other types are wrapped in `faiss.IndexIDMap2`.
+
+    Scalar-quantized types (`sq_fp16`, `sq_int8`) keep 2 or 1 bytes per
+    dimension in memory instead of 4. Their float32 vectors are kept in a
+    memory-mapped `RescoreStore`, on disk next to the saved index or, until
+    it is saved, in temporary files (see its docstring for the trade-off). A search fetches
+    `k * rescore_factor` candidates from the quantized index and returns
+    them reranked by their exact scores, so thresholds keep applying to
+    float32 similarities.
+
+    With `pca_dim` set, the same two stages apply to a PCA-reduced index:
+    the shortlist is found with the projected vectors (for any index type)
+    and rescored at full dimension. The projection is trained with the
+    index and saved in the index file.
     """
      
-    def __init__(self, dim: int):
+    def __init__(self, dim: int, index: faiss.Index | None = None, config: IndexConfig | None = None,
+                 rescore_store: RescoreStore | None = None):
         """
         Initializes the FAISS index.
 
         Args:
             dim: Dimensionality of the embedding vectors.
+            index: Existing FAISS index to wrap (e.g. loaded from disk).
+                A new index is created from `config` when omitted.
+            config: Index type and knobs. Defaults to `IndexConfig.from_env()`.
+            rescore_store: Exact vectors of an existing index. For a new
+                scalar-quantized index an empty store is created.
         """
-        self.index = faiss.IndexFlatIP(dim)
+        self.dim = dim
+        self.config = config if config is not None else IndexConfig.from_env()
+        if index is None:
+            index = with_ids(build_faiss_index(dim, self.config))
+            if self.config.rescores(dim):
+                rescore_store = RescoreStore(dim)
+        self.index = index
+        self.rescore_store = rescore_store
 
-
-    def add(self, vectors: np.ndarray):
+    def add(self, vectors: np.ndarray, ids: np.ndarray | None = None):
         """
         Adds embedding vectors to the index.
 
         Args:
             vectors: 2D array of shape (n_vectors, dim) containing
                 normalized embedding vectors.
+            ids: Optional 64-bit IDs, one per vector. Defaults to
+                consecutive IDs starting at the current index size.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if ids is None:
+            ids = np.arange(self.index.ntotal, self.index.ntotal + len(vectors))
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+
+        if not self.index.is_trained:
+            self._train(vectors)
+        self._ensure_writable()
+        self.index.add_with_ids(vectors, ids)
+        if self.rescore_store is not None:
+            self.rescore_store.add(ids, vectors)
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        """
+        Removes the vectors stored under the given IDs.
+
+        Returns:
+            Number of vectors removed.
+        """
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+        self._ensure_writable()
+        return self.index.remove_ids(faiss.IDSelectorBatch(ids))
+
+    def remove_range(self, start: int, end: int) -> int:
+        """
+        Removes all vectors with IDs in `[start, end)`.
+
+        Note:
+            HNSW indexes do not support removal; FAISS raises a RuntimeError.
+
+        Returns:
+            Number of vectors removed.
+        """
+        self._ensure_writable()
+        return self.index.remove_ids(faiss.IDSelectorRange(start, end))
+
+    @property
+    def is_mmapped(self) -> bool:
+        """
+        Whether the vectors are read from a memory-mapped index file
+        rather than held in memory.
+        """
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            return isinstance(faiss.downcast_InvertedLists(ivf.invlists), faiss.OnDiskInvertedLists)
+        codes = getattr(_storage(self.index), "codes", None)
+        return codes is not None and not codes.is_owned
+
+    @property
+    def supports_removal(self) -> bool:
+        """
+        Whether vectors can be removed; FAISS cannot remove from HNSW graphs.
         """
-        self.index.add(vectors)
+        index = self.index
+        while isinstance(index, (faiss.IndexIDMap, faiss.IndexPreTransform)):
+            index = faiss.downcast_index(index.index)
+        return not isinstance(index, faiss.IndexHNSW)
+
+    def _ensure_writable(self):
+        """
+        Copies a memory-mapped index into memory before the first write.
+
+        FAISS maps index files read-only: writing to the mapped codes of a
+        flat, HNSW or scalar-quantized index aborts the process, and the
+        mapped inverted lists of an IVF index refuse additions.
+        """
+        if faiss.try_extract_index_ivf(self.index) is not None:
+            self._load_inverted_lists()
+        elif self.is_mmapped:
+            # A round trip through memory gives the index owned arrays.
+            self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+            apply_search_params(self.index, self.config)
+
+    def _load_inverted_lists(self):
+        """
+        Replaces memory-mapped IVF inverted lists with in-memory ones.
+        """
+        ivf = faiss.try_extract_index_ivf(self.index)
+        invlists = faiss.downcast_InvertedLists(ivf.invlists)
+        if not isinstance(invlists, faiss.OnDiskInvertedLists):
+            return
+
+        copy = faiss.ArrayInvertedLists(invlists.nlist, invlists.code_size)
+        for list_no in range(invlists.nlist):
+            size = invlists.list_size(list_no)
+            if size:
+                copy.add_entries(list_no, size, invlists.get_ids(list_no), invlists.get_codes(list_no))
+        ivf.replace_invlists(copy, True)
+        # Owned by the index from now on.
+        copy.this.disown()
+
+    def _train(self, vectors: np.ndarray):
+        """
+        Trains the index on a random sample of `vectors`.
+
+        The index is rebuilt for the actual sample size first, so that
+        small corpora do not ask for more IVF cells than training points.
+        """
+        n_train = min(len(vectors), self.config.train_sample)
+        rng = np.random.default_rng(0)
+        sample = vectors[np.sort(rng.choice(len(vectors), size=n_train, replace=False))]
+
+        index = build_faiss_index(self.dim, self.config, n_train=n_train)
+        train_faiss_index(index, sample)
+        self.index = with_ids(index)
+        if not self.config.rescores(self.dim, n_train):
+            self.rescore_store = None
 
     def search(self, query_vector: np.ndarray, k: int):
         """
@@ -39,6 +185,138 @@ class VectorIndex:
             k: Number of nearest neighbors to retrieve.
 
         Returns:
-            Tuple of (scores, indices) as returned by FAISS.
+            Tuple of (scores, ids) as returned by FAISS. Missing results
+            have ID -1.
         """
+        if self.rescore_store is not None:
+            return self.search_batch(query_vector.reshape(1, -1), k)
         return self.index.search(query_vector.reshape(1, -1), k)
+
+    def search_batch(self, query_vectors: np.ndarray, k: int):
+        """
+        Searches the index for many queries in one call.
+
+        Args:
+            query_vectors: 2D array of shape (n_queries, dim).
+            k: Number of nearest neighbors to retrieve per query.
+
+        Returns:
+            Tuple of (scores, ids) arrays of shape (n_queries, k).
+        """
+        query_vectors = np.ascontiguousarray(query_vectors, dtype=np.float32)
+        if self.rescore_store is None:
+            return self.index.search(query_vectors, k)
+
+        candidates = max(k * max(1, self.config.rescore_factor), self.config.shortlist)
+        _, ids = self.index.search(query_vectors, min(candidates, max(k, self.index.ntotal)))
+        scores = np.einsum("qd,qcd->qc", query_vectors, self.rescore_store.get(ids))
+        scores[ids < 0] = -np.finfo(np.float32).max
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+    def __len__(self) -> int:
+        return self.index.ntotal
+
+    def copy(self) -> "VectorIndex":
+        """
+        Returns a copy of the index, e.g. to write it to disk without
+        blocking searches on the original.
+
+        Memory-mapped flat, HNSW and scalar-quantized codes are shared with
+        the copy, which is safe since they are never written in place (see
+        `_ensure_writable`). FAISS cannot copy memory-mapped IVF lists, so
+        those are read into memory first, as on a write.
+        """
+        if faiss.try_extract_index_ivf(self.index) is not None:
+            self._load_inverted_lists()
+        rescore_store = self.rescore_store.copy() if self.rescore_store is not None else None
+        return VectorIndex(self.dim, index=faiss.clone_index(self.index), config=self.config, rescore_store=rescore_store)
+
+    def save(self, path: str):
+        """
+        Writes the index to disk, plus the rescoring vectors of
+        scalar-quantized indexes (`<path>.ids.npy`, `<path>.vectors.npy`).
+
+        Args:
+            path: Destination file path.
+        """
+        faiss.write_index(self.index, str(path))
+        if self.rescore_store is not None:
+            self.rescore_store.save(path, live_ids=stored_ids(self.index))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, config: IndexConfig | None = None) -> "VectorIndex":
+        """
+        Reads an index previously written with `save`.
+
+        Args:
+            path: Path to the index file.
+            mmap: Memory-map the index file instead of reading it into
+                memory, so vectors are paged in on demand. The index is
+                copied into memory on the first add or removal.
+            config: Query-time knobs (nprobe, efSearch) to apply. Defaults
+                to `IndexConfig.from_env()`.
+
+        Returns:
+            A VectorIndex wrapping the loaded FAISS index.
+        """
+        if not mmap:
+            index = faiss.read_index(str(path))
+        else:
+            # IO_FLAG_MMAP_IFC maps the codes of flat, HNSW and scalar-quantized
+            # indexes; IO_FLAG_MMAP maps IVF inverted lists, but only when
+            # reading the file directly, so IVF indexes fail on the first
+            # inverted list with both flags and are read again with it alone.
+            try:
+                index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_MMAP_IFC)
+            except RuntimeError:
+                index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP)
+        config = config if config is not None else IndexConfig.from_env()
+        rescore_store = RescoreStore.load(path, mmap=mmap) if config.rescore_factor > 0 else None
+        vector_index = cls(dim=index.d, index=index, config=config, rescore_store=rescore_store)
+        apply_search_params(index, vector_index.config)
+        return vector_index
+
+
+def with_ids(index: faiss.Index) -> faiss.Index:
+    """
+    Makes `index` store vectors under caller-provided IDs.
+
+    IVF indexes already do. Wrapping them in `IndexIDMap2` would break
+    removal: the map renumbers its positions after a removal while the
+    inverted lists keep the old ones.
+    """
+    if faiss.try_extract_index_ivf(index) is not None:
+        return index
+    return faiss.IndexIDMap2(index)
+
+
+def _storage(index: faiss.Index) -> faiss.Index:
+    """
+    Returns the innermost index holding the vector codes, below the ID
+    map, PCA transform and HNSW graph wrappers.
+    """
+    index = faiss.downcast_index(index)
+    while True:
+        if isinstance(index, (faiss.IndexIDMap, faiss.IndexPreTransform)):
+            index = faiss.downcast_index(index.index)
+        elif isinstance(index, faiss.IndexHNSW):
+            index = faiss.downcast_index(index.storage)
+        else:
+            return index
+
+
+def stored_ids(index: faiss.Index) -> np.ndarray:
+    """
+    Returns the IDs of all vectors stored in an index built by `with_ids`.
+    """
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.vector_to_array(index.id_map)
+
+    invlists = faiss.try_extract_index_ivf(index).invlists
+    ids = [
+        faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)).copy()
+        for list_no in range(invlists.nlist)
+        if invlists.list_size(list_no)
+    ]
+    return np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
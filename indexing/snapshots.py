@@ -0,0 +1,87 @@
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+
+# Index snapshots are stored as numbered generation directories inside
+# INDEX_DIR. The CURRENT file names the generation to load; it is
+# replaced atomically, so readers always see a complete snapshot.
+CURRENT_FILE = "CURRENT"
+GENERATION_PREFIX = "gen-"
+
+_publish_lock = threading.Lock()
+
+
+def current_snapshot_dir(index_dir: str) -> Path | None:
+    """
+    Returns the directory of the current snapshot generation, if any.
+
+    A directory written before generations were introduced (a manifest
+    directly inside `index_dir`) is also accepted.
+    """
+    index_dir = Path(index_dir)
+    current = index_dir / CURRENT_FILE
+
+    if current.exists():
+        snapshot_dir = index_dir / current.read_text().strip()
+        if snapshot_dir.is_dir():
+            return snapshot_dir
+        logging.warning(f"{current} points to missing snapshot {snapshot_dir}")
+        return None
+
+    if (index_dir / "manifest.json").exists():
+        return index_dir
+    return None
+
+
+def _generation_number(path: Path) -> int:
+    try:
+        return int(path.name[len(GENERATION_PREFIX):])
+    except ValueError:
+        return -1
+
+
+def publish_snapshot(index_dir: str, save, keep: int | None = None) -> Path:
+    """
+    Writes a new snapshot generation and makes it current.
+
+    Args:
+        index_dir: Root snapshot directory (the `INDEX_DIR` setting).
+        save: Callable writing the snapshot into the directory it is given,
+            e.g. `retriever.save`.
+        keep: Number of most recent generations to keep, the new one
+            included (at least 2). Defaults to the `SNAPSHOT_KEEP` setting
+            (2).
+
+    Returns:
+        The directory of the published generation.
+
+    Notes:
+        - Only generations older than the `keep` most recent ones are
+          deleted, so a reader that resolved the previous generation just
+          before the swap can still load it. Files that are still
+          memory-mapped by a running process stay readable until they are
+          unmapped.
+    """
+    index_dir = Path(index_dir)
+    keep = max(2, keep if keep is not None else int(os.getenv("SNAPSHOT_KEEP", 2)))
+
+    with _publish_lock:
+        index_dir.mkdir(parents=True, exist_ok=True)
+        generations = list(index_dir.glob(f"{GENERATION_PREFIX}*"))
+        number = max((_generation_number(p) for p in generations), default=0) + 1
+        snapshot_dir = index_dir / f"{GENERATION_PREFIX}{number:06d}"
+
+        save(snapshot_dir)
+
+        tmp_current = index_dir / f"{CURRENT_FILE}.tmp"
+        tmp_current.write_text(snapshot_dir.name)
+        os.replace(tmp_current, index_dir / CURRENT_FILE)
+
+        generations.sort(key=_generation_number)
+        for old in generations[: max(0, len(generations) - (keep - 1))]:
+            shutil.rmtree(old, ignore_errors=True)
+
+    logging.info(f"Published index snapshot {snapshot_dir}")
+    return snapshot_dir
@@ -1,22 +1,15 @@
 import argparse
-
-from preprocessing.video.load_videos_data import load_video_transcripts
-from preprocessing.video.video_chunking import chunk_video_transcript
-from models.embedder import Embedder
-from models.llm_client import LLMClient
-from models.gemini_llm_client import GeminiLLMClient
-from indexing.faiss.vector_index import VectorIndex
-from rag.answer_refiner import AnswerRefiner
-from preprocessing.pdf.load_pdfs_data import load_pdf_collection
-from preprocessing.pdf.pdf_chunking import chunk_pdf_pages
-from rag.pdf_answer import PDFAnswer
-from rag.video_answer import VideoAnswer
-from rag.retrievel import retrieve_from_videos, retrieve_from_pdfs
-from rag.format_answers import format_answer
+import asyncio
+import json
+import sys
 import os
 import logging
 from dotenv import load_dotenv
 
+from rag.daemon import ask as ask_daemon, ask_timeout_from_env, serve as serve_daemon, socket_path_from_env
+from rag.format_answers import format_answer
+from rag.batch import answer_batch, batch_result
+
 load_dotenv()
 
 logging.basicConfig(
@@ -30,40 +23,129 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("google").setLevel(logging.WARNING)
 logging.getLogger("google_genai").setLevel(logging.WARNING)
 
+def build_pipeline():
+    """
+    Loads the embedder, indexes and LLM client.
+
+    The heavy dependencies (sentence-transformers, FAISS, PyMuPDF, genai)
+    are imported here rather than at module level, so `main.py ask` can
+    hand its question to a running daemon without importing them.
+
+    Returns:
+        Tuple of (retriever, answer_refiner, coordinator).
+    """
+    from models.registry import create_embedder, create_llm_client
+    from rag.answer_refiner import AnswerRefiner
+    from rag.refinement_cache import refinement_cache_from_env
+    from rag.retrievel import load_or_build_retriever, unified_index_enabled
+    from rag.retrieval_coordinator import RetrievalCoordinator
+
+    # Initialize embedder and build (or load from INDEX_DIR) the indexes once
+    embedder = create_embedder()
+    retriever = load_or_build_retriever(
+        embedder,
+        os.getenv('VIDEO_SOURCE_PATH'),
+        os.getenv('PDF_SOURCE_PATH'),
+        index_dir=os.getenv('INDEX_DIR'),
+        unified=unified_index_enabled(),
+    )
+
+    llm_client = create_llm_client()
+    answer_refiner = AnswerRefiner(llm_client, cache=refinement_cache_from_env())
+    # Video and PDF sources are searched concurrently; video answers win.
+    coordinator = RetrievalCoordinator.from_env()
+    return retriever, answer_refiner, coordinator
+
+async def answer_question(pipeline, question: str) -> str:
+    """
+    Retrieves, refines and formats the answer to one question.
+    """
+    retriever, answer_refiner, coordinator = pipeline
+    video_answer, pdf_answer = await coordinator.answer(retriever, question, answer_refiner)
+    return format_answer(question, video_answer, pdf_answer)
+
+async def run_batch(questions_file, output, retriever, answer_refiner, video_threshold, pdf_threshold):
+    """
+    Answers every question of a JSONL file and writes one JSON line per
+    answer to `output` as soon as it is ready.
+
+    Each input line is an object with a `question` field; its other fields
+    are copied to the output record, which adds `index` and `answer`.
+    """
+    with open(questions_file, "r") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    questions = [record["question"] for record in records]
+    logging.info(f"Answering {len(questions)} questions")
+
+    out = sys.stdout if output == "-" else open(output, "w")
+    try:
+        async for i, video_answer, pdf_answer in answer_batch(
+            questions,
+            retriever,
+            answer_refiner,
+            video_threshold,
+            pdf_threshold,
+            concurrency=int(os.getenv("BATCH_LLM_CONCURRENCY", 16)),
+        ):
+            result = {**records[i], **batch_result(i, questions[i], video_answer, pdf_answer)}
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
 def main():
-    video_answer = None
-    pdf_answer = None
     parser = argparse.ArgumentParser()
-    parser.add_argument("--question", required=True, type=str)
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser("serve", help="keep the pipeline loaded and answer questions over a Unix socket")
+    serve_parser.add_argument("--socket", type=str, default=socket_path_from_env())
+    ask_parser = subparsers.add_parser("ask", help="ask the running daemon, or answer in-process if none is running")
+    ask_parser.add_argument("question", type=str)
+    ask_parser.add_argument("--socket", type=str, default=socket_path_from_env())
+    ask_parser.add_argument("--timeout", type=float, default=ask_timeout_from_env(), help="seconds to wait for the daemon's answer")
+    ask_parser.add_argument("--no-fallback", action="store_true", help="fail instead of answering in-process when no daemon is running")
+
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--question", type=str)
+    group.add_argument("--questions-file", type=str, help="JSONL file with one {\"question\": ...} object per line")
+    parser.add_argument("--output", type=str, default="-", help="JSONL output file for --questions-file (default: stdout)")
     args = parser.parse_args()
 
-    ######## VIDEO SOURCE ########
-    videos_path = os.getenv('VIDEO_SOURCE_PATH')
-    video_similarity_threshold = float(os.getenv('VIDEO_SIMILARITY_THRESHOLD'))
-
-    # load videos -> [{video_id, video_transcripts:[ {token_id: , timestamp: ...} ]}]
-    videos = load_video_transcripts(videos_path)
-    logging.info(f"Loaded {len(videos)} videos")
-
-    # Initialize embedder
-    embedder = Embedder()
-    video_answer = retrieve_from_videos(args.question, videos, embedder, video_similarity_threshold)
-    
-    ######## PDF SOURCE ########
-    if not video_answer:
-        pdfs_path = os.getenv('PDF_SOURCE_PATH')
-        pdfs = load_pdf_collection(pdfs_path)
-        pdf_similarity_threshold = float(os.getenv('PDF_SIMILARITY_THRESHOLD'))
-        pdf_answer = retrieve_from_pdfs(args.question, pdfs, embedder, pdf_similarity_threshold)
-
-
-    
-    llm_client = GeminiLLMClient()
-    answer_refiner = AnswerRefiner(llm_client)
-    video_answer, pdf_answer = answer_refiner.refine_answer(args.question, video_answer, pdf_answer)
-
-    formatted_answer = format_answer(args.question, video_answer, pdf_answer)
-    print(formatted_answer)
+    if args.command is None and not (args.question or args.questions_file):
+        parser.error("one of serve, ask, --question or --questions-file is required")
+
+    if args.command == "ask":
+        try:
+            print(ask_daemon(args.socket, args.question, timeout=args.timeout))
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            if args.no_fallback:
+                sys.exit(f"No daemon is listening on {args.socket}")
+            logging.info("No daemon running, answering in-process")
+        except TimeoutError as e:
+            sys.exit(str(e))
+        except RuntimeError as e:
+            sys.exit(f"Daemon error: {e}")
+
+    pipeline = build_pipeline()
+
+    if args.command == "serve":
+        asyncio.run(serve_daemon(args.socket, lambda question: answer_question(pipeline, question)))
+        return
+
+    if args.questions_file:
+        retriever, answer_refiner, _ = pipeline
+        asyncio.run(run_batch(
+            args.questions_file,
+            args.output,
+            retriever,
+            answer_refiner,
+            float(os.getenv('VIDEO_SIMILARITY_THRESHOLD', 0.7)),
+            float(os.getenv('PDF_SIMILARITY_THRESHOLD', 0.7)),
+        ))
+        return
+
+    print(asyncio.run(answer_question(pipeline, args.question)))
 
 #TODO add logs + docstrings + tests
 if __name__ == "__main__":
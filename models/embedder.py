@@ -4,15 +4,31 @@ import os
 from dotenv import load_dotenv
 import logging
 
+from models.embedding_cache import EmbeddingCache, normalize_text, text_hash
+from models.lru_cache import LRUCache
+
 class Embedder:
     """
     Wrapper around a SentenceTransformer model for generating text embeddings.
 
     Loads the embedding model from an environment variable or a default,
     and provides helper methods for embedding documents and queries.
+
+    When an embedding cache is configured (argument or the
+    `EMBEDDING_CACHE_PATH` environment variable), document embeddings are
+    looked up by content hash and only cache misses are encoded.
+
+    Query embeddings are kept in a bounded in-memory LRU cache
+    (`QUERY_CACHE_SIZE`, `QUERY_CACHE_TTL`), so repeated questions skip
+    the transformer forward pass.
     """
 
-    def __init__(self, model_name: str | None = None):
+    def __init__(self,
+                 model_name: str | None = None,
+                 cache: EmbeddingCache | None = None,
+                 batch_size: int | None = None,
+                 query_cache: LRUCache | None = None,
+                 ):
         if model_name is None:
             model_name = os.getenv(
                 "EMBEDDING_MODEL_NAME",
@@ -25,22 +41,115 @@ class Embedder:
             logging.error("Failed to load embedding model %s", model_name)
             raise
 
+        if cache is None and os.getenv("EMBEDDING_CACHE_PATH"):
+            cache = EmbeddingCache(os.getenv("EMBEDDING_CACHE_PATH"))
+
+        if batch_size is None:
+            batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+
+        if query_cache is None:
+            query_cache = LRUCache(
+                max_size=int(os.getenv("QUERY_CACHE_SIZE", 1024)),
+                ttl=float(os.getenv("QUERY_CACHE_TTL", 0)),
+            )
+
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = batch_size
+        self.query_cache = query_cache
+
     def embed_texts(self, texts: list[str]) -> np.ndarray:
         """
         Embeds a list of texts into normalized vectors.
+
+        With a cache configured, only texts whose normalized content is
+        not cached yet are encoded, in batches of `batch_size`.
         """
-        return self.model.encode(
-            texts,
-            normalize_embeddings=True,
-            convert_to_numpy=True,
+        if self.cache is None:
+            return self._encode(texts)
+
+        hashes = [text_hash(text) for text in texts]
+        cached = self.cache.get_many(self.model_name, hashes)
+
+        # Encode each missing text once, even if it appears several times.
+        missing = {}
+        for text, h in zip(texts, hashes):
+            if h not in cached and h not in missing:
+                missing[h] = text
+
+        logging.info(
+            f"embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses"
         )
 
+        miss_hashes = list(missing)
+        for start in range(0, len(miss_hashes), self.batch_size):
+            batch_hashes = miss_hashes[start : start + self.batch_size]
+            vectors = self._encode([missing[h] for h in batch_hashes])
+            self.cache.put_many(self.model_name, batch_hashes, vectors)
+            cached.update(zip(batch_hashes, np.asarray(vectors, dtype=np.float32)))
+
+        if not texts:
+            return self._encode(texts)
+        return np.vstack([cached[h] for h in hashes])
+
     def embed_query(self, query: str) -> np.ndarray:
         """
         Embeds a single query string into a normalized vector.
+
+        Results are cached by (model name, whitespace-normalized query).
+        The returned array is read-only because it is shared between
+        callers; copy it before modifying it.
         """
-        return self.model.encode(
+        key = (self.model_name, normalize_text(query))
+        vector = self.query_cache.get(key)
+        if vector is not None:
+            return vector
+
+        vector = self.model.encode(
             query,
             normalize_embeddings=True,
             convert_to_numpy=True,
-        )
\ No newline at end of file
+        )
+        vector = np.array(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        self.query_cache.put(key, vector)
+        return vector
+
+    def embed_queries(self, queries: list[str]) -> np.ndarray:
+        """
+        Embeds many query strings with a single batched model call.
+
+        Queries already in the query cache are not re-encoded, and the
+        newly encoded ones are added to it.
+
+        Returns:
+            A 2D float32 array with one normalized row per query.
+        """
+        keys = [(self.model_name, normalize_text(query)) for query in queries]
+        vectors = [self.query_cache.get(key) for key in keys]
+
+        missing = {}
+        for i, (key, vector) in enumerate(zip(keys, vectors)):
+            if vector is None:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            encoded = self._encode([queries[positions[0]] for positions in missing.values()])
+            for (key, positions), vector in zip(missing.items(), encoded):
+                vector = np.array(vector, dtype=np.float32)
+                vector.setflags(write=False)
+                self.query_cache.put(key, vector)
+                for i in positions:
+                    vectors[i] = vector
+
+        if not queries:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text before hashing so whitespace-only differences
+    map to the same cache entry.
+    """
+    return " ".join(text.split())
+
+
+def text_hash(text: str) -> str:
+    """
+    Returns the content hash of the normalized text.
+    """
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent content-addressed store for text embeddings.
+
+    Embeddings are stored in a SQLite database as raw float32 blobs,
+    keyed by (model name, hash of the normalized text). Unchanged chunks
+    are therefore never re-encoded across process restarts.
+    """
+
+    # SQLite limits the number of bound parameters per statement.
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, path: str):
+        """
+        Opens (or creates) the cache database.
+
+        Args:
+            path: Path to the SQLite file.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model_name TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model_name, text_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(self, model_name: str, hashes: list[str]) -> dict[str, np.ndarray]:
+        """
+        Looks up cached embeddings.
+
+        Args:
+            model_name: Name of the embedding model.
+            hashes: Text hashes to look up.
+
+        Returns:
+            A dictionary mapping each cached hash to its float32 vector.
+            Missing hashes are absent from the result.
+        """
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            for start in range(0, len(unique), self._LOOKUP_BATCH):
+                batch = unique[start : start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model_name = ? AND text_hash IN ({placeholders})",
+                    [model_name, *batch],
+                )
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32)
+
+        return found
+
+    def put_many(self, model_name: str, hashes: list[str], vectors: np.ndarray):
+        """
+        Stores embeddings in the cache.
+
+        Args:
+            model_name: Name of the embedding model.
+            hashes: Text hashes, one per row of `vectors`.
+            vectors: 2D array of embeddings.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = [
+            (model_name, h, vectors.shape[1], vectors[i].tobytes())
+            for i, h in enumerate(hashes)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model_name, text_hash, dim, vector) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+        logging.debug(f"cached {len(rows)} embeddings for {model_name}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
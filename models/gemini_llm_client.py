@@ -1,5 +1,5 @@
 from google import genai
-import torch, os
+import os
 from dotenv import load_dotenv
 
 class GeminiLLMClient:
@@ -35,5 +35,40 @@ class GeminiLLMClient:
             contents= prompt
         )
         return refined_response.text
-    
 
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Asynchronously generates a text response from the Gemini model.
+
+        Uses the genai asyncio client, so no thread is blocked while the
+        request is in flight.
+
+        Args:
+            prompt: Input prompt provided to the language model.
+
+        Returns:
+            Generated text response.
+        """
+        refined_response = await self.client.aio.models.generate_content(
+            model=self.model_name,
+            contents= prompt
+        )
+        return refined_response.text
+
+    async def astream(self, prompt: str):
+        """
+        Streams a text response from the Gemini model as it is generated.
+
+        Args:
+            prompt: Input prompt provided to the language model.
+
+        Yields:
+            Consecutive pieces of the generated text.
+        """
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model_name,
+            contents= prompt
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
@@ -1,6 +1,8 @@
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from transformers import AutoModelForCausalLM
+from transformers import AutoModelForCausalLM, TextIteratorStreamer
 import torch, os
+import asyncio
+import threading
 
 class LLMClient:
     """
@@ -26,6 +28,7 @@ class LLMClient:
         self.model = AutoModelForCausalLM.from_pretrained(model_name)
         self.model.to(device)
 
+        self.model_name = model_name
         self.device = device
         self.max_new_tokens = max_new_tokens
     
@@ -62,6 +65,66 @@ class LLMClient:
         if refined.startswith(prompt):
             refined = refined[len(prompt):]
         return refined
+
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Async variant of `generate`.
+
+        Local generation is CPU/GPU bound, so it runs in a worker thread
+        to keep the event loop responsive.
+        """
+        return await asyncio.to_thread(self.generate, prompt)
+
+    async def astream(self, prompt: str):
+        """
+        Streams the generated text as it is decoded.
+
+        Generation runs in a background thread feeding a
+        `TextIteratorStreamer`, which is drained without blocking the
+        event loop. The prompt is not echoed.
+
+        Yields:
+            Consecutive pieces of the generated text.
+        """
+        inputs = self.tokenizer(
+            prompt,
+            return_tensors="pt",
+            truncation=True,
+        ).to(self.device)
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+        )
+
+        errors = []
+
+        def run():
+            try:
+                with torch.no_grad():
+                    self.model.generate(
+                        **inputs,
+                        max_new_tokens=self.max_new_tokens,
+                        num_beams=1,
+                        do_sample=False,
+                        streamer=streamer,
+                    )
+            except Exception as e:
+                # Unblock the consumer; the error is re-raised below.
+                errors.append(e)
+                streamer.end()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        while True:
+            piece = await asyncio.to_thread(next, streamer, None)
+            if piece is None:
+                break
+            if piece:
+                yield piece
+        thread.join()
+        if errors:
+            raise errors[0]
     
 def normalize(text: str) -> str:
     return " ".join(text.split())
@@ -0,0 +1,67 @@
+import importlib
+import os
+
+# Backends are referenced as "module:attribute" strings and only imported
+# when selected, so choosing Gemini never loads torch/transformers and
+# vice versa.
+LLM_BACKENDS = {
+    "gemini": "models.gemini_llm_client:GeminiLLMClient",
+    "local": "models.llm_client:LLMClient",
+}
+
+EMBEDDING_BACKENDS = {
+    "sentence-transformers": "models.embedder:Embedder",
+}
+
+
+def _load_backend(backends: dict, name: str, kind: str):
+    """
+    Imports and returns the class registered under `name`.
+
+    Raises:
+        ValueError: If no backend is registered under `name`.
+    """
+    if name not in backends:
+        raise ValueError(f"Unknown {kind} backend {name!r}. Available: {sorted(backends)}")
+    module_name, attribute = backends[name].split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def register_llm_backend(name: str, target: str):
+    """
+    Registers an LLM client class given as a "module:attribute" string.
+    """
+    LLM_BACKENDS[name] = target
+
+
+def register_embedding_backend(name: str, target: str):
+    """
+    Registers an embedder class given as a "module:attribute" string.
+    """
+    EMBEDDING_BACKENDS[name] = target
+
+
+def create_llm_client(backend: str | None = None, **kwargs):
+    """
+    Creates the LLM client of the selected backend.
+
+    Args:
+        backend: Backend name; defaults to the LLM_BACKEND setting
+            ("gemini" if unset).
+        **kwargs: Passed to the client constructor.
+    """
+    backend = backend or os.getenv("LLM_BACKEND", "gemini")
+    return _load_backend(LLM_BACKENDS, backend, "LLM")(**kwargs)
+
+
+def create_embedder(backend: str | None = None, **kwargs):
+    """
+    Creates the embedder of the selected backend.
+
+    Args:
+        backend: Backend name; defaults to the EMBEDDING_BACKEND setting
+            ("sentence-transformers" if unset).
+        **kwargs: Passed to the embedder constructor.
+    """
+    backend = backend or os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+    return _load_backend(EMBEDDING_BACKENDS, backend, "embedding")(**kwargs)
@@ -1,25 +1,63 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
+import logging
+import os
 from preprocessing.pdf.pdf_chunking import chunk_pdf_pages
 
 
-import fitz  # PyMuPDF
-
-def load_pdf_pages(pdf_path: str) -> list[str]:
+def load_pdf_pages(pdf_path: str, start: int = 0, end: int | None = None) -> list[str]:
     """
-    Load and extract text from all pages of a PDF file.
+    Load and extract text from the pages of a PDF file.
 
     Args:
         pdf_path (str): Path to the PDF file.
+        start (int): Index of the first page to extract.
+        end (int | None): Index after the last page to extract
+            (None extracts up to the last page).
 
     Returns:
         list[str]: A list where each element contains the extracted text
         of a single page, in page order.
     """
-    doc = fitz.open(pdf_path)
+    import fitz  # PyMuPDF, imported on first use to keep video-only paths light
+
+    with fitz.open(pdf_path) as doc:
+        end = len(doc) if end is None else min(end, len(doc))
+        return [doc[number].get_text() for number in range(start, end)]
+
+def pdf_page_count(pdf_path: str) -> int:
+    """
+    Returns the number of pages of a PDF file without extracting text.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+def load_pdf_bytes(pdf_id: str, data: bytes) -> dict:
+    """
+    Extract the page texts of an in-memory PDF (e.g. an uploaded file).
+
+    Args:
+        pdf_id (str): Identifier of the PDF, usually its filename.
+        data (bytes): Raw PDF file content.
+
+    Returns:
+        dict: A dictionary with the `pdf_id` and `pages` keys, as produced
+        by `load_pdf_collection`.
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(stream=data, filetype="pdf")
     pages = [page.get_text() for page in doc]
-    return pages
+    return {
+        "pdf_id": pdf_id,
+        "pages": pages,
+    }
 
-def load_pdf_collection(pdf_dir: str) -> list:
+def load_pdf_collection(pdf_dir: str, workers: int | None = None, pages_per_task: int | None = None) -> list:
     """
     Load all PDF files in a directory and extract their page contents.
 
@@ -28,6 +66,11 @@ def load_pdf_collection(pdf_dir: str) -> list:
 
     Args:
         pdf_dir (str): Path to a directory containing PDF files.
+        workers (int | None): Number of extraction processes. Defaults to
+            the `PDF_WORKERS` setting (1, i.e. serial, if unset).
+        pages_per_task (int | None): Maximum pages extracted by one task
+            in parallel mode; larger PDFs are split into page ranges.
+            Defaults to the `PDF_PAGES_PER_TASK` setting (64 if unset).
 
     Returns:
         list: A list of dictionaries with the following keys:
@@ -35,17 +78,112 @@ def load_pdf_collection(pdf_dir: str) -> list:
             - pages (list[str]): Extracted text for each page.
 
     Notes:
-        - All `.pdf` files in the directory are loaded.
+        - All `.pdf` files in the directory are loaded, in filename order.
         - Page numbering is implicit and based on its order.
+        - A PDF that cannot be read is logged and skipped; the other
+          files are still loaded.
+    """
+    return load_pdf_files(sorted(Path(pdf_dir).glob("*.pdf")), workers, pages_per_task)
+
+def load_pdf_files(paths: list[Path], workers: int | None = None, pages_per_task: int | None = None) -> list:
+    """
+    Loads the given PDF files, as `load_pdf_collection` does for a whole
+    directory.
+
+    Args:
+        paths (list[Path]): PDF files to load.
+        workers (int | None): Number of extraction processes (see
+            `load_pdf_collection`).
+        pages_per_task (int | None): Maximum pages per parallel task.
+
+    Returns:
+        list: One dictionary per readable file, in the order of `paths`.
     """
-    pdfs = []
+    return [pdf for _, pdf in iter_pdf_files(paths, workers, pages_per_task)]
 
-    for pdf_path in Path(pdf_dir).glob("*.pdf"):
-        pages = load_pdf_pages(str(pdf_path))
+def iter_pdf_files(paths: list[Path], workers: int | None = None, pages_per_task: int | None = None):
+    """
+    Extracts PDF files one at a time or, with several `workers`, on a
+    single process pool, keeping at most `4 * workers` files in flight
+    ahead of the consumer.
 
-        pdfs.append({
-            "pdf_id": pdf_path.name,
-            "pages": pages,
-        })
+    In parallel mode there is one task per file or, for files longer than
+    `pages_per_task`, per page range. Ranges are reassembled in page
+    order. The pool is created once for the whole iteration, and the next
+    files are submitted as soon as the consumer takes one, so a slow PDF
+    only holds back the files queued behind it.
+
+    Args:
+        paths (list[Path]): PDF files to load.
+        workers (int | None): Number of extraction processes (see
+            `load_pdf_collection`).
+        pages_per_task (int | None): Maximum pages per parallel task.
+
+    Yields:
+        (path, pdf) for every readable file, in the order of `paths`, with
+        `pdf` as returned by `load_pdf_collection`.
+    """
+    paths = [Path(path) for path in paths]
+    if workers is None:
+        workers = int(os.getenv("PDF_WORKERS", 1))
+    if pages_per_task is None:
+        pages_per_task = int(os.getenv("PDF_PAGES_PER_TASK", 64))
 
-    return pdfs
+    if workers <= 1 or not paths:
+        for pdf_path in paths:
+            try:
+                pages = load_pdf_pages(str(pdf_path))
+            except Exception as e:
+                logging.error(f"Skipping unreadable PDF {pdf_path.name}: {e}")
+                continue
+            yield pdf_path, {"pdf_id": pdf_path.name, "pages": pages}
+        return
+
+    pages_per_task = max(1, pages_per_task)
+    # Spawned workers do not inherit the parent's threads or loaded models.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+    try:
+        in_flight = deque()
+        for pdf_path in paths:
+            futures = _submit_pdf(pool, pdf_path, pages_per_task)
+            if futures is None:
+                continue
+            in_flight.append((pdf_path, futures))
+            if len(in_flight) < 4 * workers:
+                continue
+            done_path, done_futures = in_flight.popleft()
+            if (pdf := _collect_pdf(done_path, done_futures)) is not None:
+                yield done_path, pdf
+        for done_path, done_futures in in_flight:
+            if (pdf := _collect_pdf(done_path, done_futures)) is not None:
+                yield done_path, pdf
+    finally:
+        # A consumer that stops early does not wait for the queued files.
+        pool.shutdown(cancel_futures=True)
+
+def _submit_pdf(pool: ProcessPoolExecutor, pdf_path: Path, pages_per_task: int) -> list | None:
+    """
+    Submits the page ranges of one PDF, or returns None if it cannot be
+    opened.
+    """
+    try:
+        page_count = pdf_page_count(str(pdf_path))
+    except Exception as e:
+        logging.error(f"Skipping unreadable PDF {pdf_path.name}: {e}")
+        return None
+
+    return [
+        pool.submit(load_pdf_pages, str(pdf_path), start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+def _collect_pdf(pdf_path: Path, futures: list) -> dict | None:
+    """
+    Reassembles the page ranges of one PDF, or returns None if one failed.
+    """
+    try:
+        pages = [page for future in futures for page in future.result()]
+    except Exception as e:
+        logging.error(f"Skipping unreadable PDF {pdf_path.name}: {e}")
+        return None
+    return {"pdf_id": pdf_path.name, "pages": pages}
@@ -6,8 +6,10 @@ class PDFChunk:
     identified by the source PDF, page number (1-based), and
     paragraph index.
     """
+    __slots__ = ("pdf_id", "page_number", "paragraph_index", "text")
+
     def __init__(self, pdf_id, page_number, paragraph_index, text):
         self.pdf_id = pdf_id
         self.page_number = page_number
         self.paragraph_index = paragraph_index
-        self.text = text
\ No newline at end of file
+        self.text = text
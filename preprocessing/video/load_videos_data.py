@@ -1,7 +1,272 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import json
+import logging
+import os
+import re
 from pathlib import Path
 from typing import List
 
+from preprocessing.video.transcript_columns import TranscriptColumns, TranscriptColumnsBuilder
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SEPARATOR = re.compile(r"[ \t\n\r]*,[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+def parse_video_transcript(data: dict) -> dict:
+    """
+    Extracts the video identifier and transcript tokens from decoded JSON.
+
+    Args:
+        data: Decoded transcript JSON document.
+
+    Returns:
+        A dictionary with the `video_id` and `video_transcripts` keys. The
+        tokens are converted to `TranscriptColumns`.
+    """
+    return {
+        "video_id": data["video_id"],
+        "video_transcripts": TranscriptColumns.from_tokens(data["video_id"], data["video_transcripts"]),
+    }
+
+class _JSONStream:
+    """
+    Minimal pull reader over a text stream: values are decoded one at a
+    time with the C-accelerated `json` scanner from a sliding buffer that
+    is refilled in `read_size` blocks.
+    """
+
+    def __init__(self, f, read_size: int):
+        self.f = f
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.f.read(self.read_size)
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        self.eof = not data
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character ("" at the end).
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def accept(self, char: str) -> bool:
+        """
+        Consumes `char` if it is the next character.
+        """
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, char: str):
+        if not self.accept(char):
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the buffered transcript, got {self.peek()!r}")
+
+    def value(self):
+        """
+        Decodes the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+                # A value touching the end of the buffer may be a truncated
+                # number; only trust it once more input (or EOF) follows.
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def array(self, extend):
+        """
+        Decodes the JSON array at the cursor, passing the elements decoded
+        from each buffered block to `extend` as a list.
+        """
+        self.expect("[")
+        if self.accept("]"):
+            return
+
+        skip = _WHITESPACE.match
+        separator = _SEPARATOR.match
+        scan = _DECODER.scan_once
+        needs_separator = False
+        while True:
+            # Decode every element the buffer holds before refilling it.
+            buffer, pos = self.buffer, self.pos
+            size = len(buffer)
+            values = []
+            while True:
+                if needs_separator:
+                    match = separator(buffer, pos)
+                    if match is not None and match.end() < size:
+                        pos = match.end()
+                        needs_separator = False
+                    else:
+                        pos = skip(buffer, pos).end()
+                        if pos >= size:
+                            break
+                        if buffer[pos] == "]":
+                            self.pos = pos + 1
+                            extend(values)
+                            return
+                        if buffer[pos] != ",":
+                            raise ValueError(f"Expected ',' or ']' in array, got {buffer[pos]!r}")
+                        pos += 1
+                        needs_separator = False
+                        continue
+                else:
+                    pos = skip(buffer, pos).end()
+                    if pos >= size:
+                        break
+                try:
+                    value, end = scan(buffer, pos)
+                except (StopIteration, json.JSONDecodeError):
+                    break
+                if end >= size and not self.eof:
+                    break
+                values.append(value)
+                pos = end
+                needs_separator = True
+
+            extend(values)
+            self.pos = pos
+            if self.eof:
+                raise ValueError("Truncated or invalid JSON array")
+            self._fill()
+
+def read_video_transcript(f, read_size: int = 1 << 16) -> dict:
+    """
+    Parses a transcript JSON document from a text stream incrementally.
+
+    The `video_transcripts` array is decoded one token at a time and each
+    token is appended to compact columns right away, so the decoded list
+    of token dictionaries never exists. Other top-level keys are decoded
+    whole (only `video_id` is kept) and may appear in any order.
+
+    Args:
+        f: Text stream positioned at the start of the document.
+        read_size: Number of characters read per block.
+
+    Returns:
+        A dictionary with the `video_id` and `video_transcripts` keys, as
+        returned by `parse_video_transcript`.
+
+    Raises:
+        KeyError: If `video_id` or `video_transcripts` is missing.
+        ValueError: If the document is not valid JSON.
+    """
+    stream = _JSONStream(f, read_size)
+    builder = None
+    video_id = None
+
+    stream.expect("{")
+    if not stream.accept("}"):
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "video_transcripts":
+                builder = TranscriptColumnsBuilder()
+                stream.array(builder.extend)
+            else:
+                value = stream.value()
+                if key == "video_id":
+                    video_id = value
+            if not stream.accept(","):
+                break
+        stream.expect("}")
+
+    if video_id is None:
+        raise KeyError("video_id")
+    if builder is None:
+        raise KeyError("video_transcripts")
+    return {"video_id": video_id, "video_transcripts": builder.build(video_id)}
+
+def load_video_file(path) -> dict:
+    """
+    Loads a single video transcript JSON file with `read_video_transcript`.
+
+    Args:
+        path: Path to the transcript JSON file.
+
+    Returns:
+        A dictionary with the `video_id` and `video_transcripts` keys.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return read_video_transcript(f)
+
+def iter_video_files(paths: list, workers: int | None = None):
+    """
+    Loads transcript files on a thread pool, keeping at most `workers`
+    files in flight ahead of the consumer.
+
+    Args:
+        paths: Transcript JSON files to load.
+        workers: Number of loader threads. Defaults to the
+            `VIDEO_LOAD_WORKERS` setting (4).
+
+    Yields:
+        (path, video) for every readable file, in the order of `paths`.
+
+    Notes:
+        - Parsing holds the GIL, so threads mainly overlap file reads
+          (network or cold storage) with parsing.
+        - A transcript that cannot be read is logged and skipped.
+    """
+    paths = [Path(path) for path in paths]
+    if workers is None:
+        workers = int(os.getenv("VIDEO_LOAD_WORKERS", 4))
+
+    def load(path):
+        try:
+            return load_video_file(path)
+        except Exception as e:
+            logging.error(f"Skipping unreadable transcript {path.name}: {e}")
+            return None
+
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            video = load(path)
+            if video is not None:
+                yield path, video
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="video-load") as pool:
+        in_flight = deque()
+        for path in paths:
+            in_flight.append((path, pool.submit(load, path)))
+            if len(in_flight) < workers:
+                continue
+            done_path, future = in_flight.popleft()
+            if (video := future.result()) is not None:
+                yield done_path, video
+        for done_path, future in in_flight:
+            if (video := future.result()) is not None:
+                yield done_path, video
+
+def load_video_files(paths: list, workers: int | None = None) -> List[dict]:
+    """
+    Loads the given transcript files, as `iter_video_files` does.
+
+    Returns:
+        One dictionary per readable file, in the order of `paths`.
+    """
+    return [video for _, video in iter_video_files(paths, workers)]
+
 def load_video_transcripts(folder: str) -> List[dict]:
     """
     Loads video transcript data from JSON files in a directory.
@@ -15,25 +280,12 @@ def load_video_transcripts(folder: str) -> List[dict]:
     Returns:
         A list of dictionaries, each with the following keys:
             - video_id: Identifier of the video.
-            - video_transcripts: Tokenized transcript data for the video.
+            - video_transcripts: Tokenized transcript data for the video,
+              as `TranscriptColumns`.
 
     Notes:
-        - All `.json` files in the directory are processed.
+        - All `.json` files in the directory are processed, in filename
+          order, on a thread pool (see `iter_video_files`).
         - The function assumes a consistent JSON schema across files.
     """
-    
-    videos= []
-
-    for path in Path(folder).glob("*.json"):
-        with open(path, "r") as f:
-            data = json.load(f)
-
-        video_id = data["video_id"]
-        video_transcripts = data["video_transcripts"]
-
-        videos.append({
-            "video_id": video_id,
-            "video_transcripts": video_transcripts
-        })
-
-    return videos
+    return load_video_files(sorted(Path(folder).glob("*.json")))
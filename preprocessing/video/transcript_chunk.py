@@ -5,12 +5,37 @@ class TranscriptChunk:
     A transcript chunk corresponds to a sequence of tokens within a video,
     annotated with token indices and timestamps. Chunks are used as the
     retrieval units for video-based semantic search.
+
+    `text` is either a string or a `(TranscriptColumns, start, end)` token
+    window. A window is decoded from the transcript's word buffer each time
+    the text is read (for embedding or display), so chunks built by
+    `chunk_video_transcript` do not hold their own copy of the text.
     """
+    __slots__ = ("video_id", "start_token_id", "end_token_id", "start_timestamp", "end_timestamp", "_text")
+
     def __init__(self, video_id, start_token_id, end_token_id, start_timestamp, end_timestamp, text):
         self.video_id = video_id
         self.start_token_id = start_token_id
         self.end_token_id = end_token_id
         self.start_timestamp = start_timestamp
         self.end_timestamp = end_timestamp
-        self.text = text
-    
\ No newline at end of file
+        self._text = text
+
+    @property
+    def text(self) -> str:
+        if isinstance(self._text, str):
+            return self._text
+        columns, start, end = self._text
+        return columns.text(start, end)
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+
+    @property
+    def window(self):
+        """
+        The `(TranscriptColumns, start, end)` window backing `text`, or
+        None when the text is a plain string.
+        """
+        return None if isinstance(self._text, str) else self._text
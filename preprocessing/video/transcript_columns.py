@@ -0,0 +1,101 @@
+from array import array
+
+import numpy as np
+
+
+class TranscriptColumns:
+    """
+    Column-oriented storage of one video transcript.
+
+    Instead of one `{id, timestamp, word}` dictionary per token, the
+    transcript is held as parallel arrays: int64 token ids, float32
+    timestamps, and int64 offsets into a single UTF-8 buffer holding every
+    word followed by a space. Token `i` spans `blob[offsets[i]:offsets[i + 1] - 1]`,
+    so the text of any token range is one slice and one decode.
+    """
+
+    def __init__(self, video_id: str, ids: np.ndarray, timestamps: np.ndarray, offsets: np.ndarray, blob: bytes):
+        self.video_id = video_id
+        self.ids = ids
+        self.timestamps = timestamps
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_tokens(cls, video_id: str, tokens: list[dict]) -> "TranscriptColumns":
+        """
+        Builds the columns from a list of `{id, timestamp, word}` tokens.
+        """
+        count = len(tokens)
+        ids = np.fromiter((token["id"] for token in tokens), dtype=np.int64, count=count)
+        timestamps = np.fromiter((token["timestamp"] for token in tokens), dtype=np.float32, count=count)
+
+        words = [token["word"].encode("utf-8") for token in tokens]
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(word) + 1 for word in words), dtype=np.int64, count=count), out=offsets[1:])
+        blob = b" ".join(words) + b" " if words else b""
+
+        return cls(video_id, ids, timestamps, offsets, blob)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def text(self, start: int, end: int) -> str:
+        """
+        Returns the words of tokens `[start, end)` joined by spaces.
+        """
+        if end <= start:
+            return ""
+        return self.blob[self.offsets[start] : self.offsets[end] - 1].decode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the columns and the word buffer, in bytes.
+        """
+        return self.ids.nbytes + self.timestamps.nbytes + self.offsets.nbytes + len(self.blob)
+
+
+class TranscriptColumnsBuilder:
+    """
+    Accumulates tokens one at a time into compact typed buffers.
+
+    Used when tokens are streamed from a file, so that no per-token
+    dictionary outlives the block it was decoded in. `build` turns the buffers into
+    `TranscriptColumns` without copying the id and timestamp columns.
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._timestamps = array("f")
+        self._lengths = array("q")
+        self._blob = bytearray()
+
+    def extend(self, tokens: list[dict]):
+        """
+        Appends a list of `{id, timestamp, word}` tokens.
+        """
+        words = [token["word"].encode("utf-8") for token in tokens]
+        self._ids.extend([token["id"] for token in tokens])
+        self._timestamps.extend([token["timestamp"] for token in tokens])
+        self._lengths.extend([len(word) + 1 for word in words])
+        if words:
+            self._blob += b" ".join(words)
+            self._blob += b" "
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def build(self, video_id: str) -> TranscriptColumns:
+        """
+        Returns the accumulated tokens as `TranscriptColumns`.
+        """
+        offsets = np.zeros(len(self._lengths) + 1, dtype=np.int64)
+        np.cumsum(np.frombuffer(self._lengths, dtype=np.int64), out=offsets[1:])
+        return TranscriptColumns(
+            video_id,
+            np.frombuffer(self._ids, dtype=np.int64),
+            np.frombuffer(self._timestamps, dtype=np.float32),
+            offsets,
+            bytes(self._blob),
+        )
@@ -1,4 +1,7 @@
+import numpy as np
+
 from preprocessing.video.transcript_chunk import TranscriptChunk
+from preprocessing.video.transcript_columns import TranscriptColumns
 
 def get_chunk_text(chunk_tokens_list: list[dict]) -> str:
    """
@@ -17,7 +20,35 @@ def get_chunk_text(chunk_tokens_list: list[dict]) -> str:
    text = ' '.join(token['word'] for token in chunk_tokens_list)
    return text
 
-def chunk_video_transcript(video_id: str, tokens: list[dict], chunk_size: int = 20, overlap: int = 2) -> list[TranscriptChunk]:
+def sliding_windows(length: int, chunk_size: int, overlap: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the token windows of a sliding-window chunking.
+
+    Args:
+        length: Number of tokens.
+        chunk_size: Number of tokens per window.
+        overlap: Number of tokens shared by consecutive windows.
+
+    Returns:
+        Arrays of window starts and (exclusive) ends. The last window may
+        be shorter than `chunk_size`.
+
+    Raises:
+        ValueError: If `overlap` is not smaller than `chunk_size`.
+    """
+    step = chunk_size - overlap
+    if step <= 0:
+        raise ValueError("overlap must be smaller than chunk_size")
+    starts = np.arange(0, length, step, dtype=np.int64)
+    ends = np.minimum(starts + chunk_size, length)
+    return starts, ends
+
+def _timestamps(values: np.ndarray) -> list[float]:
+    # Shortest float32 representation, so 10.4 stays 10.4 rather than
+    # 10.399999618530273 once widened to a Python float.
+    return [float(np.format_float_positional(value, unique=True)) for value in values]
+
+def chunk_video_transcript(video_id: str, tokens, chunk_size: int = 20, overlap: int = 2) -> list[TranscriptChunk]:
     """
     Splits a video transcript into overlapping token-based chunks.
 
@@ -26,7 +57,8 @@ def chunk_video_transcript(video_id: str, tokens: list[dict], chunk_size: int =
 
     Args:
         video_id: Identifier of the source video.
-        tokens: Tokenized transcript data containing token IDs, timestamps, and words.
+        tokens: Tokenized transcript, as `TranscriptColumns` or as a list
+            of dictionaries with token IDs, timestamps, and words.
         chunk_size: Number of tokens per chunk.
         overlap: Number of overlapping tokens between consecutive chunks.
 
@@ -37,30 +69,24 @@ def chunk_video_transcript(video_id: str, tokens: list[dict], chunk_size: int =
         - Chunks are created using a sliding window with overlap.
         - The final chunk may contain fewer than `chunk_size` tokens.
         - Token IDs and timestamps correspond to the original transcript.
+        - Window boundaries are computed with vectorized NumPy arithmetic,
+          and chunk texts stay windows into the transcript's word buffer
+          until they are read.
     """
-        
-    all_chunks = []
-    step = chunk_size - overlap
-
-    
-    for i in range(0, len(tokens), step):
-        chunk_tokens = tokens[i : i + chunk_size] # [{}, {}, {}]
-        start_chunk = chunk_tokens[0]
-        end_chunk = chunk_tokens[-1]
-        start_token_id = start_chunk['id']
-        end_token_id = end_chunk['id']
-        start_timestamp = start_chunk['timestamp']
-        end_timestamp = end_chunk['timestamp']
-        text = get_chunk_text(chunk_tokens)
-        tc = TranscriptChunk(video_id,
-                             start_token_id,
-                             end_token_id,
-                             start_timestamp,
-                             end_timestamp,
-                             text)
-        all_chunks.append(tc)
-        
-    return all_chunks
-
+    if not isinstance(tokens, TranscriptColumns):
+        tokens = TranscriptColumns.from_tokens(video_id, tokens)
 
+    starts, ends = sliding_windows(len(tokens), chunk_size, overlap)
+    last = ends - 1
 
+    return [
+        TranscriptChunk(video_id, start_id, end_id, start_ts, end_ts, (tokens, start, end))
+        for start_id, end_id, start_ts, end_ts, start, end in zip(
+            tokens.ids[starts].tolist(),
+            tokens.ids[last].tolist(),
+            _timestamps(tokens.timestamps[starts]),
+            _timestamps(tokens.timestamps[last]),
+            starts.tolist(),
+            ends.tolist(),
+        )
+    ]
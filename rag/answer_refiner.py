@@ -1,6 +1,13 @@
-from models.llm_client import LLMClient
+import asyncio
+from typing import TYPE_CHECKING
+
 from rag.video_answer import VideoAnswer
 from rag.pdf_answer import PDFAnswer
+from rag.refinement_cache import refinement_key
+
+if TYPE_CHECKING:
+    # Only for annotations: importing it at runtime would load transformers.
+    from models.llm_client import LLMClient
 
 
 VIDEO_PROMPT_TEMPLATE = """You are a helpful editor.
@@ -55,10 +62,60 @@ class AnswerRefiner:
 
     The refinement is performed in-place by mutating the provided
     VideoAnswer or PDFAnswer objects.
+
+    An optional refinement cache (see `rag.refinement_cache`) stores LLM
+    outputs keyed by a hash of (template, question, chunk text, model
+    name), so repeated retrieval outcomes skip the LLM call entirely.
     """
 
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: "LLMClient", cache=None):
         self.llm_client = llm_client
+        self.cache = cache
+        self.model_name = getattr(llm_client, "model_name", type(llm_client).__name__)
+
+    def _cache_key(self, template: str, question: str, text: str) -> str | None:
+        if self.cache is None:
+            return None
+        return refinement_key(template, question, text, self.model_name)
+
+    def _generate(self, template: str, question: str, text: str) -> str:
+        """
+        Fills the prompt template and generates a refinement, using the
+        cache when configured.
+        """
+        key = self._cache_key(template, question, text)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        prompt = template.format(QUESTION = question, TEXT = text)
+        refined = self.llm_client.generate(prompt)
+
+        if key is not None and refined is not None:
+            self.cache.put(key, refined)
+        return refined
+
+    async def _agenerate(self, template: str, question: str, text: str) -> str:
+        """
+        Async variant of `_generate`. Uses the client's `agenerate` when
+        available, otherwise runs `generate` in a worker thread.
+        """
+        key = self._cache_key(template, question, text)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        prompt = template.format(QUESTION = question, TEXT = text)
+        if hasattr(self.llm_client, "agenerate"):
+            refined = await self.llm_client.agenerate(prompt)
+        else:
+            refined = await asyncio.to_thread(self.llm_client.generate, prompt)
+
+        if key is not None and refined is not None:
+            self.cache.put(key, refined)
+        return refined
     
     def refine_answer(self, question: str, video_answer: VideoAnswer | None = None, pdf_answer: PDFAnswer | None = None) -> str:
         """
@@ -84,16 +141,101 @@ class AnswerRefiner:
         """
         
         if (video_answer):
-            answer_prompt = VIDEO_PROMPT_TEMPLATE.format(QUESTION = question, TEXT = video_answer.transcript_snippet)
-            refined_answer = self.llm_client.generate(answer_prompt)
+            refined_answer = self._generate(VIDEO_PROMPT_TEMPLATE, question, video_answer.transcript_snippet)
             video_answer.refined_answer = refined_answer
         
         if(pdf_answer):
-            answer_prompt = PDF_PROMPT_TEMPLATE.format(QUESTION = question, TEXT = pdf_answer.text)
-            summary = self.llm_client.generate(answer_prompt)
+            summary = self._generate(PDF_PROMPT_TEMPLATE, question, pdf_answer.text)
             pdf_answer.summary = summary 
         
         return video_answer, pdf_answer
 
+    async def arefine_answer(self, question: str, video_answer: VideoAnswer | None = None, pdf_answer: PDFAnswer | None = None):
+        """
+        Async variant of `refine_answer`.
+
+        The event loop is not blocked while waiting for the LLM, and the
+        video and PDF refinements (if both are present) run concurrently.
 
-        
\ No newline at end of file
+        Returns:
+            A tuple containing the updated (video_answer, pdf_answer).
+        """
+        async def refine_video():
+            video_answer.refined_answer = await self._agenerate(
+                VIDEO_PROMPT_TEMPLATE, question, video_answer.transcript_snippet
+            )
+
+        async def refine_pdf():
+            pdf_answer.summary = await self._agenerate(
+                PDF_PROMPT_TEMPLATE, question, pdf_answer.text
+            )
+
+        tasks = []
+        if video_answer:
+            tasks.append(refine_video())
+        if pdf_answer:
+            tasks.append(refine_pdf())
+        await asyncio.gather(*tasks)
+
+        return video_answer, pdf_answer
+
+    async def _astream(self, template: str, question: str, text: str):
+        """
+        Streaming variant of `_agenerate`. Yields the refinement piece by
+        piece when the client has `astream`, otherwise in one piece.
+        A cached refinement is yielded at once.
+        """
+        key = self._cache_key(template, question, text)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        if not hasattr(self.llm_client, "astream"):
+            yield await self._agenerate(template, question, text)
+            return
+
+        prompt = template.format(QUESTION = question, TEXT = text)
+        pieces = []
+        async for piece in self.llm_client.astream(prompt):
+            pieces.append(piece)
+            yield piece
+
+        if key is not None and pieces:
+            self.cache.put(key, "".join(pieces))
+
+    async def astream_refinement(self, question: str, video_answer: VideoAnswer | None = None, pdf_answer: PDFAnswer | None = None):
+        """
+        Streams the refinement of the retrieved answer as it is generated.
+
+        Only one answer is refined, the video answer taking precedence as
+        in `format_answer`. Once the stream is exhausted, the complete text
+        is set on `video_answer.refined_answer` or `pdf_answer.summary`,
+        as `arefine_answer` does.
+
+        Args:
+            question: The original user question.
+            video_answer: Retrieved video-based answer, if available.
+            pdf_answer: Retrieved PDF-based answer, if available.
+
+        Yields:
+            Consecutive pieces of the refined answer or summary.
+        """
+        if video_answer:
+            template, text = VIDEO_PROMPT_TEMPLATE, video_answer.transcript_snippet
+        elif pdf_answer:
+            template, text = PDF_PROMPT_TEMPLATE, pdf_answer.text
+        else:
+            return
+
+        pieces = []
+        async for piece in self._astream(template, question, text):
+            pieces.append(piece)
+            yield piece
+
+        refined = "".join(pieces)
+        if video_answer:
+            video_answer.refined_answer = refined
+        else:
+            pdf_answer.summary = refined
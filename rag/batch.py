@@ -0,0 +1,78 @@
+import asyncio
+
+from rag.format_answers import format_answer
+
+
+async def answer_batch(
+    questions: list[str],
+    retriever,
+    answer_refiner,
+    video_threshold: float,
+    pdf_threshold: float,
+    concurrency: int = 16,
+    chunk_size: int = 512,
+    executor=None,
+):
+    """
+    Answers many questions, yielding each result as soon as it is ready.
+
+    Questions are processed in windows of `chunk_size`: each window is
+    embedded in one batch and searched with one multi-row query per source
+    (`Retriever.retrieve_batch`, run on `executor`), then its LLM
+    refinements run concurrently, at most `concurrency` at a time.
+
+    Args:
+        questions: User questions.
+        retriever: Retriever to search.
+        answer_refiner: AnswerRefiner used to refine retrieved answers.
+        video_threshold: Minimum similarity for video answers.
+        pdf_threshold: Minimum similarity for PDF answers.
+        concurrency: Maximum number of in-flight LLM calls.
+        chunk_size: Number of questions embedded and searched together.
+        executor: Executor for the CPU-bound retrieval step (None uses the
+            event loop's default executor).
+
+    Yields:
+        Tuples of (question index, video_answer, pdf_answer) in completion
+        order. Both answers are None when nothing cleared the thresholds.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def refine(i, video_answer, pdf_answer):
+        if not video_answer and not pdf_answer:
+            return i, None, None
+        async with semaphore:
+            video_answer, pdf_answer = await answer_refiner.arefine_answer(
+                questions[i], video_answer, pdf_answer
+            )
+        return i, video_answer, pdf_answer
+
+    for start in range(0, len(questions), chunk_size):
+        window = questions[start : start + chunk_size]
+        retrieved = await loop.run_in_executor(
+            executor, retriever.retrieve_batch, window, video_threshold, pdf_threshold
+        )
+
+        tasks = [
+            refine(start + offset, video_answer, pdf_answer)
+            for offset, (video_answer, pdf_answer) in enumerate(retrieved)
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+
+
+def batch_result(index: int, question: str, video_answer, pdf_answer) -> dict:
+    """
+    Builds the JSON record of one batch answer.
+
+    The formatted answer is None when no source cleared its threshold.
+    """
+    answer = None
+    if video_answer or pdf_answer:
+        answer = format_answer(question, video_answer, pdf_answer)
+    return {
+        "index": index,
+        "question": question,
+        "answer": answer,
+    }
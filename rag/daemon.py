@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import socket
+import stat
+import tempfile
+
+# This module only depends on the standard library, so the `main.py ask`
+# client starts without importing the embedding or LLM stacks.
+
+SOCKET_NAME = "multisource-rag.sock"
+# Seconds the client waits for an answer, which includes the LLM call.
+DEFAULT_ASK_TIMEOUT = 120.0
+
+
+def _private_socket_dir() -> str:
+    # Per-user directory used when XDG_RUNTIME_DIR is unset. The temporary
+    # directory is shared, so it is checked before use (`_check_socket_dir`).
+    return os.path.join(tempfile.gettempdir(), f"multisource-rag-{os.getuid()}")
+
+
+def default_socket_path() -> str:
+    """
+    Returns the default daemon socket path, in `$XDG_RUNTIME_DIR` (private
+    to the user) when set, otherwise in a per-user 0700 directory of the
+    temporary directory.
+    """
+    return os.path.join(os.getenv("XDG_RUNTIME_DIR") or _private_socket_dir(), SOCKET_NAME)
+
+
+def socket_path_from_env() -> str:
+    """
+    Returns the daemon socket path from the RAG_SOCKET_PATH setting.
+    """
+    return os.getenv("RAG_SOCKET_PATH") or default_socket_path()
+
+
+def _check_socket_dir(socket_path: str, create: bool = False):
+    """
+    Makes sure the per-user socket directory belongs to the current user
+    and is closed to others, so nobody else can squat the socket path.
+
+    Args:
+        socket_path: Socket path; only checked inside `_private_socket_dir`.
+        create: Create a missing directory with mode 0700.
+
+    Raises:
+        RuntimeError: If the directory is not private to the current user.
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if create:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    if directory != _private_socket_dir() or not os.path.lexists(directory):
+        return
+
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{directory} must be a directory owned by the current user with mode 0700")
+
+
+def ask_timeout_from_env() -> float:
+    """
+    Returns the client timeout from the RAG_ASK_TIMEOUT setting.
+    """
+    return float(os.getenv("RAG_ASK_TIMEOUT", DEFAULT_ASK_TIMEOUT))
+
+
+def _remove_stale_socket(socket_path: str):
+    """
+    Removes a socket file left behind by a daemon that is not running.
+
+    Raises:
+        RuntimeError: If a daemon is already listening on `socket_path`.
+    """
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+
+async def serve(socket_path: str, answer):
+    """
+    Serves questions over a Unix domain socket until SIGINT or SIGTERM.
+
+    The protocol is newline-delimited JSON: each request line is
+    `{"question": "..."}` and each response line is `{"answer": "..."}`,
+    or `{"error": "..."}` if answering failed. A connection may send any
+    number of questions; connections are served concurrently.
+
+    Args:
+        socket_path: Path of the Unix socket to listen on.
+        answer: Async callable mapping a question to its formatted answer.
+    """
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    question = json.loads(line)["question"]
+                    response = {"answer": await answer(question)}
+                except Exception as e:
+                    logging.exception("Failed to answer daemon request")
+                    response = {"error": str(e)}
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    _check_socket_dir(socket_path, create=True)
+    _remove_stale_socket(socket_path)
+    # Only the owning user may talk to the daemon. The socket is created
+    # with mode 0600 rather than changed after it starts listening.
+    umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(handle, path=socket_path)
+    finally:
+        os.umask(umask)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logging.info(f"Daemon listening on {socket_path}")
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        logging.info("Daemon stopped")
+
+
+def ask(socket_path: str, question: str, timeout: float | None = None) -> str:
+    """
+    Sends one question to a running daemon and returns its answer.
+
+    Args:
+        socket_path: Path of the daemon's Unix socket.
+        question: User question.
+        timeout: Timeout in seconds for connecting and for each read or
+            write. Defaults to `ask_timeout_from_env()`.
+
+    Returns:
+        The formatted answer.
+
+    Raises:
+        FileNotFoundError, ConnectionRefusedError: If no daemon is running.
+        RuntimeError: If the daemon failed to answer, or the per-user
+            socket directory is not private (see `_check_socket_dir`).
+        TimeoutError: If the daemon is hung or still starting up.
+    """
+    timeout = timeout if timeout is not None else ask_timeout_from_env()
+    _check_socket_dir(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(socket_path)
+            client.sendall(json.dumps({"question": question}).encode() + b"\n")
+            with client.makefile("rb") as f:
+                line = f.readline()
+        except TimeoutError:
+            raise TimeoutError(
+                f"The daemon on {socket_path} did not answer within {timeout:g}s "
+                f"(RAG_ASK_TIMEOUT); it may be hung or still loading"
+            ) from None
+
+    if not line:
+        raise RuntimeError("The daemon closed the connection without answering")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response["answer"]
@@ -15,7 +15,32 @@ def format_answer(question, video_answer=None, pdf_answer=None) -> str:
         A formatted multi-line string suitable for display in CLI
         output or API responses.
     """
-    
+    head = format_answer_head(question, video_answer, pdf_answer)
+
+    if video_answer:
+        return head + str(video_answer.refined_answer)
+    if pdf_answer:
+        return head + str(pdf_answer.summary)
+    return head
+
+
+def format_answer_head(question, video_answer=None, pdf_answer=None) -> str:
+    """
+    Formats everything of the final answer that is known right after
+    retrieval: the question, the source block and the raw answer.
+
+    The refined answer (or PDF summary) is meant to be appended as is, so
+    it can be streamed while the LLM generates it. The head followed by the
+    refined text is exactly `format_answer`.
+
+    Args:
+        question: The original user question.
+        video_answer: A VideoAnswer object containing video-based results.
+        pdf_answer: A PDFAnswer object containing PDF-based results.
+
+    Returns:
+        The beginning of the formatted answer.
+    """
     lines = []
     lines.append("\n=== QUESTION ===")
     lines.append(question)
@@ -35,17 +60,39 @@ def format_answer(question, video_answer=None, pdf_answer=None) -> str:
         lines.append(video_answer.transcript_snippet)
 
         lines.append("\n=== REFINED ANSWER ===")
-        lines.append(video_answer.refined_answer)
+        return "\n".join(lines) + "\n"
 
-    elif pdf_answer:
+    if pdf_answer:
         lines.append("Type: PDF")
         lines.append(f"PDF: {pdf_answer.pdf_id}")
         lines.append(f"Page: {pdf_answer.page_number}")
         lines.append(f"Paragraph: {pdf_answer.paragraph_index}")
         lines.append(f"raw text: {pdf_answer.text}")
-        lines.append(f"summary: {pdf_answer.summary}")
-    else:
-        lines.append("No answer was available due to lack of resources. Please provide more resources and try again.")
+        return "\n".join(lines) + "\nsummary: "
 
-    final = "\n".join(lines)
+    lines.append("No answer was available due to lack of resources. Please provide more resources and try again.")
     return "\n".join(lines)
+
+
+def answer_source(video_answer=None, pdf_answer=None) -> dict | None:
+    """
+    Returns the source metadata of a retrieved answer as a dictionary,
+    or None when there is no answer.
+    """
+    if video_answer:
+        return {
+            "type": "video",
+            "video_id": video_answer.video_id,
+            "start_timestamp": video_answer.start_timestamp,
+            "end_timestamp": video_answer.end_timestamp,
+            "start_token_id": video_answer.start_token_id,
+            "end_token_id": video_answer.end_token_id,
+        }
+    if pdf_answer:
+        return {
+            "type": "pdf",
+            "pdf_id": pdf_answer.pdf_id,
+            "page_number": pdf_answer.page_number,
+            "paragraph_index": pdf_answer.paragraph_index,
+        }
+    return None
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Groups concurrent requests into batches for a batched processing
+    function.
+
+    Items submitted within `max_wait_ms` of the first pending item (or
+    until `max_batch_size` items are pending) are handed together to
+    `process`, which runs on `executor` and must return one result per
+    item. Each caller then receives its own result.
+
+    Batch sizes and queue waits are recorded for monitoring.
+    """
+
+    def __init__(self, process, max_batch_size: int = 32, max_wait_ms: float = 5.0, executor=None):
+        """
+        Args:
+            process: Callable taking a list of items and returning a list
+                of results in the same order.
+            max_batch_size: Maximum number of items per batch.
+            max_wait_ms: Maximum time the first item of a batch waits for
+                more items to arrive.
+            executor: Executor running `process` (None uses the event
+                loop's default executor).
+        """
+        self.process = process
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+
+        self._pending = []  # (item, future, enqueued_at)
+        self._timer = None
+
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self._recent_sizes = deque(maxlen=1024)
+        self._recent_waits = deque(maxlen=1024)
+
+    @classmethod
+    def from_env(cls, process, executor=None) -> "MicroBatcher":
+        return cls(
+            process,
+            max_batch_size=int(os.getenv("MICRO_BATCH_MAX_SIZE", 32)),
+            max_wait_ms=float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", 5)),
+            executor=executor,
+        )
+
+    async def submit(self, item):
+        """
+        Queues an item and waits for its result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        started = time.perf_counter()
+        self._record(len(batch), [started - enqueued_at for _, _, enqueued_at in batch])
+
+        items = [item for item, _, _ in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.process, items
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, size: int, waits: list[float]):
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += size
+            self._recent_sizes.append(size)
+            self._recent_waits.extend(waits)
+
+    def stats(self) -> dict:
+        """
+        Returns batch counters plus size and queue-wait statistics over
+        the most recent batches.
+        """
+        with self._stats_lock:
+            sizes = np.array(self._recent_sizes, dtype=np.float64)
+            waits_ms = np.array(self._recent_waits, dtype=np.float64) * 1000
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "recent_mean_batch_size": float(sizes.mean()) if sizes.size else None,
+                "recent_max_batch_size": int(sizes.max()) if sizes.size else None,
+                "recent_mean_queue_wait_ms": float(waits_ms.mean()) if waits_ms.size else None,
+                "recent_p95_queue_wait_ms": float(np.percentile(waits_ms, 95)) if waits_ms.size else None,
+            }
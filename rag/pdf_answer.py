@@ -5,10 +5,11 @@ class PDFAnswer:
     Wraps a PDFChunk with additional fields used during answer refinement
     and presentation, such as an optional LLM-generated summary.
     """
-    
+    __slots__ = ("pdf_id", "page_number", "paragraph_index", "text", "summary")
+
     def __init__(self, chunk):
         self.pdf_id = chunk.pdf_id
         self.page_number = chunk.page_number
         self.paragraph_index = chunk.paragraph_index
         self.text = chunk.text
-        self.summary = None
\ No newline at end of file
+        self.summary = None
@@ -7,9 +7,15 @@ class RAGSystem:
     This class performs semantic retrieval over a collection of embedded
     chunks using a vector index. It is responsible only for similarity
     search and does not perform answer formatting or refinement.
+
+    The chunks and the vector index are built once and kept together, so
+    answering a question only requires a query embedding and a single
+    index search. `chunks` maps each chunk ID stored in the index to its
+    chunk (an `indexing.chunk_table.ChunkTable`, which only builds chunk
+    objects for the IDs that are looked up).
     """
 
-    def __init__(self, chunks, embedder, index):
+    def __init__(self, chunks: dict, embedder, index):
         self.chunks = chunks
         self.embedder = embedder
         self.index = index
@@ -27,11 +33,50 @@ class RAGSystem:
         Returns:
             A tuple containing:
                 - best_score: Similarity score of the top matching chunk.
-                - best_idx: Index of the matching chunk in `self.chunks`.
+                - best_idx: ID of the matching chunk in `self.chunks`.
         """
         q_vec = self.embedder.embed_query(question)
+        return self.answer_vector(q_vec)
+
+    def answer_vector(self, q_vec) -> tuple[float, int]:
+        """
+        Retrieves the most relevant chunk for an already embedded query.
+
+        Args:
+            q_vec: 1D normalized query embedding.
+
+        Returns:
+            A tuple of (best_score, best_idx), or (None, None) when the
+            index is empty.
+        """
+        if self.index is None or not self.chunks:
+            return None, None
+
         scores, indices = self.index.search(q_vec, k=3)
 
         best_score = scores[0][0]
         best_idx = indices[0][0]
+        if best_idx < 0:
+            return None, None
         return best_score, best_idx
+
+    def answer_vectors(self, q_vecs) -> list[tuple[float, int]]:
+        """
+        Retrieves the most relevant chunk for each of many embedded queries
+        with a single multi-row index search.
+
+        Args:
+            q_vecs: 2D array of normalized query embeddings.
+
+        Returns:
+            A list with one (best_score, best_idx) tuple per query, with
+            (None, None) where nothing was found.
+        """
+        if self.index is None or not self.chunks or len(q_vecs) == 0:
+            return [(None, None)] * len(q_vecs)
+
+        scores, indices = self.index.search_batch(q_vecs, k=3)
+        return [
+            (score, idx) if idx >= 0 else (None, None)
+            for score, idx in zip(scores[:, 0], indices[:, 0])
+        ]
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from models.lru_cache import LRUCache
+
+
+def refinement_key(template: str, question: str, text: str, model_name: str) -> str:
+    """
+    Hashes everything that determines an LLM refinement into a cache key.
+    """
+    h = hashlib.sha256()
+    for part in (template, question, text, model_name):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SQLiteRefinementCache:
+    """
+    On-disk refinement cache backed by SQLite.
+
+    Entries older than `ttl` seconds are ignored and the least recently
+    used entries are evicted once more than `max_size` are stored. Shares
+    the `get`/`put`/`stats` interface of the in-memory `LRUCache`, so the
+    two backends are interchangeable.
+    """
+
+    def __init__(self, path: str, max_size: int = 100_000, ttl: float | None = None):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS refinements (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS refinements_last_access ON refinements (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM refinements WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is not None and self.ttl and row[1] + self.ttl < now:
+                self._conn.execute("DELETE FROM refinements WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return default
+
+            self._conn.execute("UPDATE refinements SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        if self.max_size <= 0:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refinements (key, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM refinements WHERE key IN ("
+                "SELECT key FROM refinements ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM refinements")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM refinements").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "max_size": self.max_size,
+        }
+
+
+def refinement_cache_from_env():
+    """
+    Builds the refinement cache selected by the environment.
+
+    `REFINEMENT_CACHE` is one of "memory" (default), "sqlite" or "none".
+    `REFINEMENT_CACHE_SIZE` and `REFINEMENT_CACHE_TTL` (seconds, 0 means
+    no expiry) bound both backends; the SQLite file is
+    `REFINEMENT_CACHE_PATH`.
+
+    Returns:
+        A cache exposing `get`/`put`/`stats`, or None when disabled.
+    """
+    backend = os.getenv("REFINEMENT_CACHE", "memory").lower()
+    max_size = int(os.getenv("REFINEMENT_CACHE_SIZE", 10_000))
+    ttl = float(os.getenv("REFINEMENT_CACHE_TTL", 0))
+
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return LRUCache(max_size=max_size, ttl=ttl)
+    if backend == "sqlite":
+        path = os.getenv("REFINEMENT_CACHE_PATH", "cache/refinements.sqlite")
+        return SQLiteRefinementCache(path, max_size=max_size, ttl=ttl)
+    raise ValueError(f"Unknown REFINEMENT_CACHE backend {backend!r}")
@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+import weakref
+
+from rag.retrievel import Retriever
+
+
+class ReindexManager:
+    """
+    Holds the retriever generation currently serving queries and rebuilds
+    new generations in the background.
+
+    Request handlers read `current` once and use that retriever for the
+    whole request. A rebuild runs in a worker thread while queries keep
+    being served from the current generation; the finished generation is
+    then swapped in with a single reference assignment. Previous
+    generations are released once the last in-flight request holding them
+    returns.
+
+    Document additions and removals go through the manager so that the
+    ones made while a rebuild is running are replayed onto the new
+    generation before it is swapped in.
+
+    `corpus_version` changes on every document change and swap, so caches
+    of answers derived from the corpus can be invalidated.
+
+    Snapshots (`persist`) are written outside the manager lock. Document
+    changes are batched: the first change schedules one snapshot
+    `persist_delay` seconds later, covering every change made until then.
+    A rebuilt generation is persisted before it is swapped in, while no
+    query is using it yet.
+    """
+
+    def __init__(self, retriever: Retriever, persist=None, persist_delay: float = 5.0):
+        """
+        Args:
+            retriever: Retriever serving the initial generation.
+            persist: Optional callable receiving a retriever to persist,
+                e.g. to publish a snapshot.
+            persist_delay: Seconds between the first unpersisted document
+                change and the snapshot covering it.
+        """
+        self.current = retriever
+        self.generation = 1
+        self.corpus_version = 1
+        self.persist = persist
+        self.persist_delay = persist_delay
+
+        self._lock = threading.Lock()
+        self._pending = None  # document operations made during a rebuild
+        self._thread = None
+        self.last_error = None
+        self.last_duration = None
+        self._track(retriever, self.generation)
+
+        self._dirty = False  # document changes not persisted yet
+        self._persist_timer = None
+        self._persist_lock = threading.Lock()
+        # Snapshots are numbered when their content is captured, so that
+        # an older one finishing late never replaces a newer one.
+        self._persist_ticket = 0
+        self._persisted_ticket = 0
+
+    @staticmethod
+    def _track(retriever: Retriever, generation: int):
+        weakref.finalize(retriever, logging.info, f"Released retriever generation {generation}")
+
+    @property
+    def rebuilding(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> dict:
+        """
+        Returns the current generation and the state of the last rebuild.
+        """
+        return {
+            "generation": self.generation,
+            "corpus_version": self.corpus_version,
+            "rebuilding": self.rebuilding,
+            "last_error": self.last_error,
+            "last_duration": self.last_duration,
+        }
+
+    def add_document(self, source: str, doc: dict, source_file: str | None = None) -> tuple[str, int]:
+        """
+        Adds a document to the current generation (see `Retriever.add_document`).
+        """
+        with self._lock:
+            result = self.current.add_document(source, doc, source_file)
+            self.corpus_version += 1
+            if self._pending is not None:
+                self._pending.append(("add", source, doc, source_file))
+            self._schedule_persist()
+        return result
+
+    def remove_document(self, doc_id: str) -> tuple[str, int]:
+        """
+        Removes a document from the current generation (see `Retriever.remove_document`).
+        """
+        with self._lock:
+            result = self.current.remove_document(doc_id)
+            self.corpus_version += 1
+            if self._pending is not None:
+                self._pending.append(("remove", doc_id))
+            self._schedule_persist()
+        return result
+
+    def start_rebuild(self, build) -> bool:
+        """
+        Starts building a new generation in a background thread.
+
+        Args:
+            build: Callable returning a new Retriever, e.g. one that reloads
+                the sources with a new embedding model or chunking config.
+
+        Returns:
+            False if a rebuild is already running, True otherwise.
+        """
+        with self._lock:
+            if self.rebuilding:
+                return False
+            self._pending = []
+            self._thread = threading.Thread(
+                target=self._rebuild,
+                args=(build,),
+                name="reindex",
+                daemon=True,
+            )
+            self._thread.start()
+        return True
+
+    def _rebuild(self, build):
+        start = time.perf_counter()
+        logging.info(f"Rebuilding index generation {self.generation + 1}")
+
+        try:
+            retriever = build()
+        except Exception as e:
+            logging.exception("Index rebuild failed")
+            with self._lock:
+                self._pending = None
+                self.last_error = str(e)
+                if self._dirty:
+                    self._schedule_persist()
+            return
+
+        # Persist the new generation before it serves queries; changes made
+        # meanwhile are replayed at the swap and persisted later.
+        with self._lock:
+            self._replay(retriever)
+            ticket = self._next_ticket()
+        self._persist(retriever, ticket)
+
+        with self._lock:
+            changed = self._replay(retriever)
+            self._pending = None
+
+            self.generation += 1
+            self.corpus_version += 1
+            self._track(retriever, self.generation)
+            self.current = retriever
+            self.last_error = None
+            self.last_duration = time.perf_counter() - start
+            self._dirty = changed
+            if changed:
+                self._schedule_persist()
+
+        logging.info(f"Swapped in index generation {self.generation} after {self.last_duration:.1f}s")
+
+    def _replay(self, retriever: Retriever) -> bool:
+        """
+        Applies the pending document operations to `retriever` and clears
+        them. Called with the lock held.
+
+        Returns:
+            Whether there were any.
+        """
+        pending, self._pending = self._pending, []
+        for op in pending:
+            try:
+                if op[0] == "add":
+                    retriever.add_document(op[1], op[2], op[3])
+                else:
+                    retriever.remove_document(op[1])
+            except KeyError:
+                # Removal of a document the new sources no longer contain.
+                pass
+            except RuntimeError as e:
+                logging.warning(f"Could not replay {op[0]} on the new generation: {e}")
+        return bool(pending)
+
+    def _schedule_persist(self):
+        # Called with the lock held.
+        self._dirty = True
+        if self.persist is None or self._persist_timer is not None:
+            return
+        self._persist_timer = threading.Timer(self.persist_delay, self.flush)
+        self._persist_timer.daemon = True
+        self._persist_timer.start()
+
+    def _next_ticket(self) -> int:
+        # Called with the lock held.
+        self._persist_ticket += 1
+        return self._persist_ticket
+
+    def flush(self):
+        """
+        Persists the current generation now if it has unpersisted document
+        changes, e.g. at shutdown.
+
+        During a rebuild nothing is written: the changes are replayed onto
+        the new generation, which is persisted before the swap.
+        """
+        with self._lock:
+            if self._persist_timer is not None:
+                self._persist_timer.cancel()
+                self._persist_timer = None
+            if not self._dirty or self._pending is not None:
+                return
+            self._dirty = False
+            retriever, ticket = self.current, self._next_ticket()
+        self._persist(retriever, ticket)
+
+    def _persist(self, retriever: Retriever, ticket: int):
+        if self.persist is None:
+            return
+        with self._persist_lock:
+            if ticket <= self._persisted_ticket:
+                return
+            try:
+                self.persist(retriever)
+            except Exception:
+                logging.exception("Persisting the index failed")
+                return
+            self._persisted_ticket = ticket
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class RetrievalCoordinator:
+    """
+    Searches the video and PDF sources concurrently for a question.
+
+    The question is embedded once and the same vector is used for both
+    sources. The PDF search no longer waits for the video search to miss,
+    so questions answered from PDFs take one search round trip instead of
+    two. The answer keeps the video-first precedence: a PDF answer is only
+    returned when no video chunk clears the video threshold.
+
+    With `speculative_pdf_refinement`, `answer` also starts the LLM summary
+    of the PDF candidate while the video search is still running. If a
+    video hit then clears the threshold, the PDF refinement is cancelled
+    when `cancel_pdf_refinement` is set; otherwise it completes in the
+    background and only warms the refinement cache.
+
+    A unified retriever (see `Retriever`) already serves both sources with
+    one search, so it is queried directly.
+    """
+
+    def __init__(
+        self,
+        video_threshold: float,
+        pdf_threshold: float,
+        executor=None,
+        speculative_pdf_refinement: bool = False,
+        cancel_pdf_refinement: bool = True,
+    ):
+        """
+        Args:
+            video_threshold: Minimum similarity for video answers.
+            pdf_threshold: Minimum similarity for PDF answers.
+            executor: Executor running the concurrent PDF searches. It must
+                not be the executor the synchronous methods are called
+                from, or a saturated pool would deadlock. A dedicated pool
+                is created when None.
+            speculative_pdf_refinement: Start refining the PDF candidate
+                before the video search has finished.
+            cancel_pdf_refinement: Cancel a speculative PDF refinement once
+                a video answer is accepted.
+        """
+        self.video_threshold = video_threshold
+        self.pdf_threshold = pdf_threshold
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=int(os.getenv("CPU_WORKERS", os.cpu_count() or 1)),
+            thread_name_prefix="retrieval",
+        )
+        self.speculative_pdf_refinement = speculative_pdf_refinement
+        self.cancel_pdf_refinement = cancel_pdf_refinement
+
+    @classmethod
+    def from_env(cls, executor=None) -> "RetrievalCoordinator":
+        """
+        Builds a coordinator from the VIDEO_SIMILARITY_THRESHOLD,
+        PDF_SIMILARITY_THRESHOLD, SPECULATIVE_PDF_REFINEMENT and
+        CANCEL_SPECULATIVE_PDF_REFINEMENT settings.
+        """
+        return cls(
+            video_threshold=float(os.getenv("VIDEO_SIMILARITY_THRESHOLD", 0.7)),
+            pdf_threshold=float(os.getenv("PDF_SIMILARITY_THRESHOLD", 0.7)),
+            executor=executor,
+            speculative_pdf_refinement=_env_flag("SPECULATIVE_PDF_REFINEMENT", False),
+            cancel_pdf_refinement=_env_flag("CANCEL_SPECULATIVE_PDF_REFINEMENT", True),
+        )
+
+    def retrieve(self, retriever, question: str, q_vec=None):
+        """
+        Retrieves the answer to one question from both sources concurrently.
+
+        Returns:
+            Tuple of (video_answer, pdf_answer); at most one is set.
+        """
+        if q_vec is None:
+            q_vec = retriever.embedder.embed_query(question)
+
+        if retriever.unified:
+            q_vecs = np.asarray(q_vec, dtype=np.float32).reshape(1, -1)
+            return retriever.retrieve_batch(
+                [question], self.video_threshold, self.pdf_threshold, q_vecs=q_vecs
+            )[0]
+
+        pdf_future = self.executor.submit(
+            retriever.retrieve_pdf, question, self.pdf_threshold, q_vec
+        )
+        video_answer = retriever.retrieve_video(question, self.video_threshold, q_vec=q_vec)
+        if video_answer:
+            pdf_future.cancel()
+            return video_answer, None
+        return None, pdf_future.result()
+
+    def retrieve_batch(self, retriever, questions: list[str], q_vecs=None):
+        """
+        Retrieves answers for many questions, searching the PDF source for
+        all of them while the video source is searched.
+
+        Args:
+            retriever: Retriever to search.
+            questions: List of user questions.
+            q_vecs: Optional precomputed 2D array of query embeddings.
+
+        Returns:
+            A list with one (video_answer, pdf_answer) tuple per question,
+            with at most one answer set in each.
+        """
+        if q_vecs is None:
+            q_vecs = retriever.embedder.embed_queries(questions)
+
+        if retriever.unified:
+            return retriever.retrieve_batch(
+                questions, self.video_threshold, self.pdf_threshold, q_vecs=q_vecs
+            )
+
+        pdf_future = self.executor.submit(
+            retriever.retrieve_pdf_batch, q_vecs, self.pdf_threshold
+        )
+        video_answers = retriever.retrieve_video_batch(q_vecs, self.video_threshold)
+        pdf_answers = pdf_future.result()
+
+        return [
+            (video_answer, None) if video_answer else (None, pdf_answer)
+            for video_answer, pdf_answer in zip(video_answers, pdf_answers)
+        ]
+
+    async def answer(self, retriever, question: str, answer_refiner, q_vec=None):
+        """
+        Retrieves and refines the answer to one question.
+
+        Both sources are searched concurrently on the executor. With
+        speculative PDF refinement, the PDF candidate is refined as soon
+        as it is found, overlapping the LLM call with the video search.
+
+        Returns:
+            Tuple of refined (video_answer, pdf_answer); at most one is
+            set, and both are None when nothing cleared the thresholds.
+        """
+        loop = asyncio.get_running_loop()
+        if q_vec is None:
+            q_vec = await loop.run_in_executor(
+                self.executor, retriever.embedder.embed_query, question
+            )
+
+        if retriever.unified:
+            video_answer, pdf_answer = await loop.run_in_executor(
+                self.executor, self.retrieve, retriever, question, q_vec
+            )
+            if video_answer or pdf_answer:
+                await answer_refiner.arefine_answer(question, video_answer, pdf_answer)
+            return video_answer, pdf_answer
+
+        async def pdf_branch():
+            pdf_answer = await loop.run_in_executor(
+                self.executor, retriever.retrieve_pdf, question, self.pdf_threshold, q_vec
+            )
+            if pdf_answer and self.speculative_pdf_refinement:
+                await answer_refiner.arefine_answer(question, None, pdf_answer)
+            return pdf_answer
+
+        pdf_task = asyncio.create_task(pdf_branch())
+        video_answer = await loop.run_in_executor(
+            self.executor, retriever.retrieve_video, question, self.video_threshold, q_vec
+        )
+
+        if video_answer:
+            if self.cancel_pdf_refinement:
+                pdf_task.cancel()
+            else:
+                # Let the speculative work finish to warm the refinement
+                # cache, but do not let its errors go unobserved.
+                pdf_task.add_done_callback(_log_pdf_task_error)
+            video_answer, _ = await answer_refiner.arefine_answer(question, video_answer, None)
+            return video_answer, None
+
+        pdf_answer = await pdf_task
+        if pdf_answer and not self.speculative_pdf_refinement:
+            await answer_refiner.arefine_answer(question, None, pdf_answer)
+        return None, pdf_answer
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _log_pdf_task_error(task):
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning(f"Speculative PDF refinement failed: {task.exception()}")
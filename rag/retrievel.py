@@ -1,34 +1,43 @@
+from preprocessing.video.load_videos_data import iter_video_files
 from preprocessing.video.video_chunking import chunk_video_transcript
+from preprocessing.pdf.load_pdfs_data import iter_pdf_files
 from preprocessing.pdf.pdf_chunking import chunk_pdf_pages
-from indexing.faiss.vector_index import VectorIndex
+from indexing.chunk_metadata import save_chunks, load_chunks
+from indexing.chunk_table import ChunkTable
+from indexing.chunk_ids import DOC_SHIFT, make_chunk_id, doc_id_range
+from indexing.snapshots import current_snapshot_dir, publish_snapshot
+from indexing.chunk_store import SOURCE_PATTERNS, chunk_store_from_env
+from preprocessing.video.transcript_chunk import TranscriptChunk
 from rag.rag_system import RAGSystem
 from rag.video_answer import VideoAnswer
 from rag.pdf_answer import PDFAnswer
+from pathlib import Path
+import json
 import logging
+import os
+import shutil
+import threading
+from contextlib import ExitStack
 
+import numpy as np
 
-def retrieve_from_videos(question, videos, embedder, threshold):
-    """
-    Retrieves the most relevant video-based answer for a given question.
+# Per-document source tags used to filter unified index results.
+SOURCE_TAGS = {"video": 1, "pdf": 2}
 
-    This function:
-    - Chunks all video transcripts
-    - Embeds the resulting chunks
-    - Builds a vector index
-    - Performs semantic retrieval via RagSystem
-    - Applies a similarity threshold to accept or reject the result
+# Written into each ingestion checkpoint next to the snapshot files.
+INGESTION_PROGRESS_FILE = "ingestion.json"
+
+
+def chunk_videos(videos) -> list:
+    """
+    Chunks all video transcripts into TranscriptChunk objects.
 
     Args:
-        question: User query string.
         videos: List of video transcript dictionaries.
-        embedder: Embedder used to generate text embeddings.
-        threshold: Minimum similarity score required to accept a result.
 
     Returns:
-        A VideoAnswer object if a chunk exceeds the similarity threshold,
-        otherwise None.
+        A flat list of TranscriptChunk objects for all videos.
     """
-
     all_chunks = []
 
     for video in videos:
@@ -37,29 +46,972 @@ def retrieve_from_videos(question, videos, embedder, threshold):
             tokens=video['video_transcripts'],
         )
         all_chunks.extend(chunks)
-    
+
     logging.info(f"chunked videos into {len(all_chunks)} chunks")
-    
-    vectors = embedder.embed_texts([chunk.text for chunk in all_chunks])
+    return all_chunks
+
+
+def chunk_pdfs(pdfs) -> list:
+    """
+    Chunks all PDF documents into paragraph-level PDFChunk objects.
+
+    Args:
+        pdfs: List of PDF document dictionaries.
+
+    Returns:
+        A flat list of PDFChunk objects for all PDFs.
+    """
+    all_chunks = []
+
+    for pdf in pdfs:
+        chunks = chunk_pdf_pages(pdf)
+        all_chunks.extend(chunks)
+
+    logging.info(f"chunked pdfs into {len(all_chunks)} chunks")
+    return all_chunks
+
+
+def build_rag_system(chunks, embedder) -> RAGSystem:
+    """
+    Embeds chunks and builds a RAGSystem around a new vector index.
+
+    Args:
+        chunks: List of chunk objects exposing a `text` attribute.
+        embedder: Embedder used to generate text embeddings.
+
+    Returns:
+        A RAGSystem holding the chunks (keyed by their position) and the
+        vector index. The index is None when there are no chunks.
+    """
+    if not chunks:
+        return RAGSystem(chunks=ChunkTable(), embedder=embedder, index=None)
+
+    vectors = embedder.embed_texts([chunk.text for chunk in chunks])
+    from indexing.faiss.vector_index import VectorIndex  # FAISS, imported on first use to keep startup light
     index = VectorIndex(dim=vectors.shape[1])
     index.add(vectors)
 
-    rag = RAGSystem(
-        chunks=all_chunks,
+    return RAGSystem(
+        chunks=ChunkTable.from_chunks(dict(enumerate(chunks))),
         embedder=embedder,
         index=index,
     )
 
-    best_score, best_idx = rag.answer(question)
-    
+
+def document_id(source: str, doc: dict) -> str:
+    """
+    Returns the identifier of a loaded video or PDF document.
+    """
+    return doc["video_id"] if source == "video" else doc["pdf_id"]
+
+
+def chunk_document(source: str, doc: dict) -> list:
+    """
+    Chunks a single loaded video or PDF document.
+    """
+    if source == "video":
+        return chunk_video_transcript(
+            video_id=doc['video_id'],
+            tokens=doc['video_transcripts'],
+        )
+    return chunk_pdf_pages(doc)
+
+
+def iter_source_documents(source: str, folder: str | None, skip=()):
+    """
+    Lazily loads and chunks the source files of `folder`.
+
+    Files are read one at a time, or a few ahead on the loader pools
+    (`VIDEO_LOAD_WORKERS` threads, or one process pool of `PDF_WORKERS`
+    extracting PDFs in parallel), so only the documents currently being
+    loaded and chunked are held in memory.
+
+    Args:
+        source: "video" or "pdf".
+        folder: Source directory (None is treated as empty).
+        skip: File names to leave out, e.g. those already ingested.
+
+    Yields:
+        (path, document id, chunks) for every readable file, in filename
+        order.
+    """
+    paths = sorted(Path(folder).glob(SOURCE_PATTERNS[source])) if folder else []
+    paths = [path for path in paths if path.name not in skip]
+
+    if source == "pdf":
+        for path, pdf in iter_pdf_files(paths):
+            yield path, pdf["pdf_id"], chunk_pdf_pages(pdf)
+        return
+
+    for path, video in iter_video_files(paths):
+        yield path, video["video_id"], chunk_document("video", video)
+
+
+def unified_index_enabled() -> bool:
+    """
+    Returns whether the UNIFIED_INDEX setting asks for one shared index.
+    """
+    return os.getenv("UNIFIED_INDEX", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+def select_video_answer(best_score, best_chunk, threshold):
+    """
+    Applies the similarity threshold to a video search result.
+
+    Returns:
+        A VideoAnswer object if the score exceeds the threshold,
+        otherwise None.
+    """
     if( best_score is not None and best_score > threshold):
-        best_chunk = all_chunks[best_idx]
         logging.info(f"best video chunk retrieved with score: {best_score}. Acceptance threshold: {threshold}")
         return VideoAnswer(best_chunk)
     
     logging.info(f"No video chunk exceeded threshold. Best score: {best_score}, threshold: {threshold}")
     return None
 
+
+def select_pdf_answer(best_score, best_chunk, threshold):
+    """
+    Applies the similarity threshold to a PDF search result.
+
+    Returns:
+        A PDFAnswer object if the score exceeds the threshold,
+        otherwise None.
+    """
+    if(best_score is not None and best_score > threshold):
+        logging.info(f"best pdf chunk retrieved with score: {best_score}. Acceptance threshold: {threshold}")
+        return PDFAnswer(best_chunk)
+    
+    logging.info(f"No pdf chunk exceeded threshold. Best score: {best_score}, threshold: {threshold}")
+    return None
+
+
+class Retriever:
+    """
+    Prebuilt retrieval component over the video and PDF sources.
+
+    Chunking, embedding and indexing happen once when the retriever is
+    built. Each query then only costs one query embedding and one vector
+    index search per source.
+
+    Documents can be added or removed at runtime: only the affected
+    document is chunked and embedded, and its vectors are added to or
+    removed from the index by chunk ID. Each document owns a contiguous
+    range of 64-bit chunk IDs (see `indexing.chunk_ids`). `source_files`
+    records the files each document was read from, so they can be
+    replaced or deleted along with it without scanning the source folders.
+
+    The video and PDF indexes are locked separately, so both sources can
+    be searched at the same time. Document changes lock both.
+
+    In unified mode (`video_rag is pdf_rag`), video and PDF chunks share
+    one index. A compact array maps each document key to its source tag,
+    so a single top-k search is split per source with vectorized masks
+    and the per-source thresholds and video-first precedence still apply.
+    """
+
+    def __init__(self, embedder, video_rag: RAGSystem, pdf_rag: RAGSystem):
+        self.embedder = embedder
+        self.video_rag = video_rag
+        self.pdf_rag = pdf_rag
+        self.unified = video_rag is pdf_rag
+        # Number of neighbours fetched per unified search, widened when
+        # they do not settle every source.
+        self.unified_k = int(os.getenv("UNIFIED_SEARCH_K", 10))
+        # FAISS indexes are not safe to search while they are being mutated.
+        # Each index has its own lock, so the video and PDF sources can be
+        # searched at the same time; changes hold every lock (`_exclusive`).
+        if self.unified:
+            self._locks = dict.fromkeys(("video", "pdf"), threading.Lock())
+        else:
+            self._locks = {"video": threading.Lock(), "pdf": threading.Lock()}
+
+        # document id -> paths of the source files it was ingested from
+        self.source_files = {}
+        # document id -> (source, document key)
+        self.documents = {}
+        for rag in self._rags():
+            for doc_id, source, doc_key in rag.chunks.documents():
+                self.documents[doc_id] = (source, doc_key)
+        self._next_doc_key = max((key for _, key in self.documents.values()), default=-1) + 1
+
+        # document key -> source tag
+        self._doc_sources = np.zeros(max(self._next_doc_key, 16), dtype=np.uint8)
+        for source, doc_key in self.documents.values():
+            self._doc_sources[doc_key] = SOURCE_TAGS[source]
+
+    def _exclusive(self) -> ExitStack:
+        """
+        Acquires the lock of every index, for changes to the indexes,
+        chunk tables or document registry.
+        """
+        stack = ExitStack()
+        for lock in dict.fromkeys(self._locks.values()):
+            stack.enter_context(lock)
+        return stack
+
+    def _rags(self) -> list[RAGSystem]:
+        return [self.video_rag] if self.unified else [self.video_rag, self.pdf_rag]
+
+    def _rag(self, source: str) -> RAGSystem:
+        if source == "video":
+            return self.video_rag
+        if source == "pdf":
+            return self.pdf_rag
+        raise ValueError(f"Unknown source {source!r}")
+
+    @classmethod
+    def from_sources(cls, videos, pdfs, embedder, unified: bool = False) -> "Retriever":
+        """
+        Builds the video and PDF indexes from loaded source data.
+
+        Args:
+            videos: List of video transcript dictionaries.
+            pdfs: List of PDF document dictionaries.
+            embedder: Embedder used to generate text embeddings.
+            unified: Index both sources in one shared index.
+
+        Returns:
+            A Retriever ready to answer queries.
+        """
+        return cls.from_chunks(
+            ((document_id("video", doc), chunk_document("video", doc)) for doc in videos),
+            ((document_id("pdf", doc), chunk_document("pdf", doc)) for doc in pdfs),
+            embedder,
+            unified=unified,
+        )
+
+    @classmethod
+    def from_chunks(cls, video_documents, pdf_documents, embedder, unified: bool = False) -> "Retriever":
+        """
+        Builds the video and PDF indexes from already chunked documents,
+        e.g. as returned by `indexing.chunk_store.ChunkStore.sync`.
+
+        Args:
+            video_documents: Iterable of (video id, chunks) tuples.
+            pdf_documents: Iterable of (PDF id, chunks) tuples.
+            embedder: Embedder used to generate text embeddings.
+            unified: Index both sources in one shared index.
+
+        Returns:
+            A Retriever ready to answer queries.
+        """
+        video_rag = RAGSystem(chunks=ChunkTable(), embedder=embedder, index=None)
+        pdf_rag = video_rag if unified else RAGSystem(chunks=ChunkTable(), embedder=embedder, index=None)
+        retriever = cls(embedder, video_rag, pdf_rag)
+
+        retriever.ingest("video", video_documents)
+        retriever.ingest("pdf", pdf_documents)
+        return retriever
+
+    def ingest(self, source: str, documents, batch_size: int | None = None,
+               checkpoint=None, checkpoint_every: int | None = None) -> int:
+        """
+        Streams chunked documents into the index.
+
+        Chunks are pulled lazily from `documents` and embedded `batch_size`
+        at a time, and each batch is appended to the index and the chunk
+        metadata right away. Only one batch of chunk texts and vectors is
+        held at once, instead of every chunk text and every vector of the
+        corpus.
+
+        Args:
+            source: "video" or "pdf".
+            documents: Iterable of (document id, chunks) tuples. A document
+                id seen before is merged into the existing document.
+            batch_size: Chunks per embedding batch. Defaults to the
+                `INGEST_BATCH_SIZE` setting (256).
+            checkpoint: Optional callable invoked, between documents, once
+                at least `checkpoint_every` chunks were ingested since the
+                previous call. Every document pulled so far is then fully
+                indexed.
+            checkpoint_every: Chunks between checkpoints. Defaults to the
+                `INGEST_CHECKPOINT_EVERY` setting (10000).
+
+        Returns:
+            Number of chunks ingested.
+
+        Notes:
+            - Indexes that need training (IVF) keep their vectors pending
+              until `train_sample` vectors are available, so training does
+              not only see the first batch. No checkpoint is taken while
+              vectors are pending.
+        """
+        if batch_size is None:
+            batch_size = int(os.getenv("INGEST_BATCH_SIZE", 256))
+        if checkpoint_every is None:
+            checkpoint_every = int(os.getenv("INGEST_CHECKPOINT_EVERY", 10_000))
+        batch_size = max(1, batch_size)
+
+        rag = self._rag(source)
+        chunks, ids = [], []
+        pending = []  # embedded (chunks, ids, vectors) not yet in the index
+        next_position = {}
+        total = since_checkpoint = 0
+
+        def flush(final: bool = False):
+            if chunks:
+                vectors = self.embedder.embed_texts([chunk.text for chunk in chunks])
+                pending.append((chunks[:], ids[:], vectors))
+                chunks.clear()
+                ids.clear()
+            if not pending:
+                return
+
+            with self._exclusive():
+                if rag.index is None:
+                    from indexing.faiss.vector_index import VectorIndex
+                    rag.index = VectorIndex(dim=pending[0][2].shape[1])
+                ready = (
+                    final
+                    or rag.index.index.is_trained
+                    or sum(len(batch[1]) for batch in pending) >= rag.index.config.train_sample
+                )
+                if ready:
+                    self._insert(
+                        source,
+                        [chunk for batch in pending for chunk in batch[0]],
+                        [chunk_id for batch in pending for chunk_id in batch[1]],
+                        np.concatenate([batch[2] for batch in pending]),
+                    )
+            if ready:
+                pending.clear()
+
+        for doc_id, doc_chunks in documents:
+            with self._exclusive():
+                if doc_id in self.documents:
+                    # Files sharing an identifier are indexed as one document.
+                    logging.warning(f"Merging duplicate {source} document {doc_id}")
+                    doc_source, doc_key = self.documents[doc_id]
+                    start = next_position.get(doc_key)
+                    if start is None:
+                        start = self._next_position(doc_source, doc_key)
+                else:
+                    doc_key = self._register(source, doc_id)
+                    start = 0
+            next_position[doc_key] = start + len(doc_chunks)
+
+            for pos, chunk in enumerate(doc_chunks, start):
+                chunks.append(chunk)
+                ids.append(make_chunk_id(doc_key, pos))
+                if len(chunks) >= batch_size:
+                    flush()
+
+            total += len(doc_chunks)
+            since_checkpoint += len(doc_chunks)
+            if checkpoint is not None and since_checkpoint >= checkpoint_every:
+                flush()
+                if not pending:
+                    checkpoint()
+                    since_checkpoint = 0
+
+        flush(final=True)
+        logging.info(f"Indexed {total} {source} chunks in batches of {batch_size}")
+        return total
+
+    def _next_position(self, source: str, doc_key: int) -> int:
+        start, end = doc_id_range(doc_key)
+        ids = self._rag(source).chunks.ids_in_range(start, end)
+        return int(ids.max()) - start + 1 if len(ids) else 0
+
+    def _register(self, source: str, doc_id: str) -> int:
+        doc_key = self._allocate_doc_key(source)
+        self.documents[doc_id] = (source, doc_key)
+        return doc_key
+
+    def _allocate_doc_key(self, source: str) -> int:
+        doc_key = self._next_doc_key
+        self._next_doc_key += 1
+
+        if doc_key >= len(self._doc_sources):
+            grown = np.zeros(2 * doc_key, dtype=np.uint8)
+            grown[: len(self._doc_sources)] = self._doc_sources
+            self._doc_sources = grown
+        self._doc_sources[doc_key] = SOURCE_TAGS[source]
+        return doc_key
+
+    def _insert(self, source, chunks, ids, vectors):
+        rag = self._rag(source)
+        if rag.index is None:
+            from indexing.faiss.vector_index import VectorIndex
+            rag.index = VectorIndex(dim=vectors.shape[1])
+        rag.index.add(vectors, ids)
+        rag.chunks.extend(ids, chunks)
+
+    def _discard(self, source: str, doc_key: int):
+        # Drops whatever a failed insert left under an unregistered key.
+        rag = self._rag(source)
+        start, end = doc_id_range(doc_key)
+        if rag.index is not None and rag.index.supports_removal:
+            rag.index.remove_range(start, end)
+        rag.chunks.remove_range(start, end)
+
+    def _remove(self, doc_id: str) -> tuple[str, int]:
+        source, doc_key = self.documents[doc_id]
+        rag = self._rag(source)
+        start, end = doc_id_range(doc_key)
+
+        removed = rag.index.remove_range(start, end) if rag.index is not None else 0
+        del self.documents[doc_id]
+        self.source_files.pop(doc_id, None)
+        rag.chunks.remove_range(start, end)
+        return source, removed
+
+    def add_document(self, source: str, doc: dict, source_file: str | None = None) -> tuple[str, int]:
+        """
+        Chunks, embeds and indexes a single document.
+
+        A document with the same identifier is replaced. The new version
+        is inserted under a new document key before the old one is
+        removed, so if indexing fails the previous version stays in place.
+
+        Args:
+            source: "video" or "pdf".
+            doc: Loaded video transcript or PDF dictionary.
+            source_file: Path of the file the document is stored in, if
+                any. It replaces the files of the previous version in
+                `source_files`.
+
+        Returns:
+            Tuple of (document id, number of chunks added).
+
+        Raises:
+            RuntimeError: If the index cannot be modified, e.g. replacing a
+                document in an HNSW index, which does not support removal.
+        """
+        doc_id = document_id(source, doc)
+        chunks = chunk_document(source, doc)
+        vectors = self.embedder.embed_texts([chunk.text for chunk in chunks]) if chunks else None
+
+        with self._exclusive():
+            replaced = self.documents.get(doc_id)
+            if replaced is not None:
+                index = self._rag(replaced[0]).index
+                if index is not None and not index.supports_removal:
+                    raise RuntimeError(f"Cannot replace {doc_id}: the index does not support removal")
+
+            doc_key = self._allocate_doc_key(source)
+            if chunks:
+                ids = [make_chunk_id(doc_key, pos) for pos in range(len(chunks))]
+                try:
+                    self._insert(source, chunks, ids, vectors)
+                except Exception:
+                    self._discard(source, doc_key)
+                    raise
+
+            if replaced is not None:
+                self._remove(doc_id)
+            self.documents[doc_id] = (source, doc_key)
+            if source_file is not None:
+                self.source_files[doc_id] = [str(source_file)]
+
+        logging.info(f"Indexed {source} document {doc_id} with {len(chunks)} chunks")
+        return doc_id, len(chunks)
+
+    def remove_document(self, doc_id: str) -> tuple[str, int]:
+        """
+        Removes a document and all its vectors from the index.
+
+        Args:
+            doc_id: Video ID or PDF filename.
+
+        Returns:
+            Tuple of (source, number of vectors removed).
+
+        Raises:
+            KeyError: If the document is not indexed.
+        """
+        with self._exclusive():
+            source, removed = self._remove(doc_id)
+
+        logging.info(f"Removed {source} document {doc_id} ({removed} vectors)")
+        return source, removed
+
+    def save(self, index_dir: str):
+        """
+        Writes a snapshot of both sources to `index_dir`.
+
+        For each source the FAISS index (`<source>.index`) and the chunk
+        metadata (`<source>_chunks.json`) are written, plus a manifest
+        recording the embedding model used to build them, and the source
+        files of each document (`source_files.json`). In unified mode the
+        shared index is written once as `unified.index`.
+
+        Args:
+            index_dir: Directory to write the snapshot to. Use
+                `indexing.snapshots.publish_snapshot` to write a new
+                generation and make it current atomically.
+        """
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+
+        # Copy under the lock and write outside it, so searches only wait
+        # for the copy, not for the disk writes.
+        with self._exclusive():
+            if self.unified:
+                indexes = {"unified": self.video_rag.index}
+                table = self.video_rag.chunks.copy()
+                tables = {"video": table, "pdf": table}
+            else:
+                indexes = {source: self._rag(source).index for source in ("video", "pdf")}
+                tables = {source: self._rag(source).chunks.copy() for source in ("video", "pdf")}
+            indexes = {name: index.copy() for name, index in indexes.items() if index is not None}
+
+            source_files = {doc_id: list(paths) for doc_id, paths in self.source_files.items()}
+            manifest = {
+                "embedding_model": getattr(self.embedder, "model_name", None),
+                "unified": self.unified,
+                "video_chunks": self.video_rag.chunks.count("video"),
+                "pdf_chunks": self.pdf_rag.chunks.count("pdf"),
+            }
+
+        for name, index in indexes.items():
+            index.save(index_dir / f"{name}.index")
+        # A unified table is split per source on write.
+        for source, table in tables.items():
+            save_chunks(table, index_dir / f"{source}_chunks.json", chunk_type=source)
+        with open(index_dir / "source_files.json", "w") as f:
+            json.dump(source_files, f)
+
+        # The manifest is written last so a partial snapshot is never loaded.
+        with open(index_dir / "manifest.json", "w") as f:
+            json.dump(manifest, f)
+
+        logging.info(f"Saved index snapshot to {index_dir}")
+
+    @staticmethod
+    def read_manifest(index_dir: str) -> dict | None:
+        """
+        Returns the snapshot manifest in `index_dir`, or None if absent.
+        """
+        manifest_path = Path(index_dir) / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    @classmethod
+    def load(cls, index_dir: str, embedder, mmap: bool = True) -> "Retriever":
+        """
+        Loads a snapshot written with `save`.
+
+        Args:
+            index_dir: Directory containing the snapshot.
+            embedder: Embedder used to embed queries. It must be the same
+                model that built the snapshot.
+            mmap: Memory-map the FAISS index files.
+
+        Returns:
+            A Retriever ready to answer queries.
+        """
+        index_dir = Path(index_dir)
+        manifest = cls.read_manifest(index_dir) or {}
+
+        def load_index(name):
+            from indexing.faiss.vector_index import VectorIndex
+
+            index_path = index_dir / f"{name}.index"
+            return VectorIndex.load(index_path, mmap=mmap) if index_path.exists() else None
+
+        if manifest.get("unified"):
+            chunks = load_chunks(index_dir / "video_chunks.json")
+            load_chunks(index_dir / "pdf_chunks.json", table=chunks)
+            rag = RAGSystem(chunks=chunks, embedder=embedder, index=load_index("unified"))
+            rags = [rag, rag]
+        else:
+            rags = [
+                RAGSystem(
+                    chunks=load_chunks(index_dir / f"{source}_chunks.json"),
+                    embedder=embedder,
+                    index=load_index(source),
+                )
+                for source in ("video", "pdf")
+            ]
+
+        retriever = cls(embedder, *rags)
+        source_files_path = index_dir / "source_files.json"
+        if source_files_path.exists():
+            with open(source_files_path) as f:
+                retriever.source_files = json.load(f)
+
+        logging.info(f"Loaded index snapshot from {index_dir}")
+        return retriever
+
+    def _search_unified(self, q_vecs, floors: dict) -> list[dict]:
+        """
+        Finds the best chunk of each source in `floors` for every query
+        with one top-k search of the unified index.
+
+        Results are split per source by looking up the source tag of each
+        returned chunk ID. A source is settled for a query once one of its
+        chunks appears in the top k, or once the k-th score is at most the
+        source's floor (nothing further down could clear it). When the
+        video source yields a hit above its floor, the PDF source is not
+        needed. Unsettled queries are searched again with a larger k.
+
+        Args:
+            q_vecs: 2D array of normalized query embeddings.
+            floors: Mapping of source to score floor, e.g. its threshold,
+                or -inf to always find the best chunk of that source.
+
+        Returns:
+            One dict per query mapping each source to (best_score,
+            best_chunk), with (None, None) where nothing was found.
+        """
+        rag = self.video_rag
+        results = [{source: (None, None) for source in floors} for _ in range(len(q_vecs))]
+        if rag.index is None or not rag.chunks or len(q_vecs) == 0:
+            return results
+
+        ntotal = len(rag.index)
+        k = min(self.unified_k, ntotal)
+        pending = np.arange(len(q_vecs))
+
+        while len(pending):
+            scores, ids = rag.index.search_batch(q_vecs[pending], k)
+            found = ids >= 0
+            tags = np.where(found, self._doc_sources[np.where(found, ids, 0) >> DOC_SHIFT], 0)
+            # Past the last neighbour nothing else can be reached.
+            exhausted = (k >= ntotal) | ~found[:, -1]
+
+            settled = np.ones(len(pending), dtype=bool)
+            video_hit = np.zeros(len(pending), dtype=bool)
+            for source in ("video", "pdf"):
+                if source not in floors:
+                    continue
+                floor = floors[source]
+                mask = tags == SOURCE_TAGS[source]
+                has = mask.any(axis=1)
+                first = mask.argmax(axis=1)
+                best = scores[np.arange(len(pending)), first]
+                source_settled = has | exhausted | (scores[:, -1] <= floor)
+                if source == "pdf":
+                    source_settled |= video_hit
+                elif source == "video":
+                    video_hit = has & (best > floor)
+                settled &= source_settled
+
+                for row in np.flatnonzero(has & source_settled):
+                    results[pending[row]][source] = (best[row], rag.chunks[int(ids[row, first[row]])])
+
+            pending = pending[~settled]
+            k = min(4 * k, ntotal)
+
+        return results
+
+    def _search(self, source: str, question: str, q_vec=None):
+        rag = self._rag(source)
+        if q_vec is None:
+            q_vec = self.embedder.embed_query(question)
+        if self.unified:
+            q_vecs = np.asarray(q_vec, dtype=np.float32).reshape(1, -1)
+            with self._locks[source]:
+                return self._search_unified(q_vecs, {source: -np.inf})[0][source]
+        with self._locks[source]:
+            best_score, best_idx = rag.answer_vector(q_vec)
+            best_chunk = rag.chunks[best_idx] if best_idx is not None else None
+        return best_score, best_chunk
+
+    def _search_batch(self, source: str, q_vecs):
+        rag = self._rag(source)
+        if self.unified:
+            with self._locks[source]:
+                return [row[source] for row in self._search_unified(q_vecs, {source: -np.inf})]
+        with self._locks[source]:
+            return [
+                (best_score, rag.chunks[best_idx] if best_idx is not None else None)
+                for best_score, best_idx in rag.answer_vectors(q_vecs)
+            ]
+
+    def retrieve_batch(self, questions, video_threshold, pdf_threshold, q_vecs=None):
+        """
+        Retrieves answers for many questions at once.
+
+        All questions are embedded in one batch and each source is searched
+        with one multi-row query. As in the single-question path, the PDF
+        source is only consulted for questions without a video answer.
+        In unified mode, one search of the shared index serves both sources.
+
+        Args:
+            questions: List of user questions.
+            video_threshold: Minimum similarity for video answers.
+            pdf_threshold: Minimum similarity for PDF answers.
+            q_vecs: Optional precomputed 2D array of query embeddings.
+
+        Returns:
+            A list with one (video_answer, pdf_answer) tuple per question.
+        """
+        if q_vecs is None:
+            q_vecs = self.embedder.embed_queries(questions)
+
+        if self.unified:
+            with self._locks["video"]:
+                rows = self._search_unified(
+                    q_vecs, {"video": video_threshold, "pdf": pdf_threshold}
+                )
+            answers = []
+            for row in rows:
+                video_answer = select_video_answer(*row["video"], video_threshold)
+                pdf_answer = None if video_answer else select_pdf_answer(*row["pdf"], pdf_threshold)
+                answers.append((video_answer, pdf_answer))
+            return answers
+
+        video_answers = self.retrieve_video_batch(q_vecs, video_threshold)
+        pdf_answers = [None] * len(questions)
+
+        misses = [i for i, answer in enumerate(video_answers) if answer is None]
+        if misses:
+            pdf_hits = self.retrieve_pdf_batch(q_vecs[misses], pdf_threshold)
+            for i, pdf_answer in zip(misses, pdf_hits):
+                pdf_answers[i] = pdf_answer
+
+        return list(zip(video_answers, pdf_answers))
+
+    def retrieve_video_batch(self, q_vecs, threshold):
+        """
+        Retrieves the best video answer above `threshold` (or None) for
+        each row of the 2D query embedding array `q_vecs`.
+        """
+        return [
+            select_video_answer(best_score, best_chunk, threshold)
+            for best_score, best_chunk in self._search_batch("video", q_vecs)
+        ]
+
+    def retrieve_pdf_batch(self, q_vecs, threshold):
+        """
+        Retrieves the best PDF answer above `threshold` (or None) for each
+        row of the 2D query embedding array `q_vecs`.
+        """
+        return [
+            select_pdf_answer(best_score, best_chunk, threshold)
+            for best_score, best_chunk in self._search_batch("pdf", q_vecs)
+        ]
+
+    def retrieve_video(self, question, threshold, q_vec=None):
+        """
+        Retrieves the best video answer above `threshold`, or None.
+
+        `q_vec` can be passed to reuse an already computed query embedding.
+        """
+        return select_video_answer(*self._search("video", question, q_vec), threshold)
+
+    def retrieve_pdf(self, question, threshold, q_vec=None):
+        """
+        Retrieves the best PDF answer above `threshold`, or None.
+
+        `q_vec` can be passed to reuse an already computed query embedding.
+        """
+        return select_pdf_answer(*self._search("pdf", question, q_vec), threshold)
+
+
+def build_retriever(embedder, videos_path, pdfs_path, unified: bool = False, chunk_store=None,
+                    checkpoint_dir: str | None = None) -> Retriever:
+    """
+    Loads, chunks and embeds the source directories into a new Retriever.
+
+    With a chunk store (argument or the `CHUNK_STORE_PATH` setting), only
+    new or changed source files are read and chunked; the chunks of the
+    other files come from the store. Otherwise the files are streamed
+    through `ingest_sources`.
+
+    Args:
+        embedder: Embedder used to generate text embeddings.
+        videos_path: Directory containing video transcript JSON files.
+        pdfs_path: Directory containing PDF files.
+        unified: Index both sources in one shared index.
+        chunk_store: Optional `ChunkStore`.
+        checkpoint_dir: Ingestion checkpoint directory (see
+            `ingest_sources`). Defaults to the `INGEST_CHECKPOINT_DIR`
+            setting.
+
+    Returns:
+        A Retriever ready to answer queries.
+    """
+    owned_store = chunk_store is None
+    if owned_store:
+        chunk_store = chunk_store_from_env()
+
+    if chunk_store is not None:
+        try:
+            video_documents = chunk_store.sync("video", videos_path)
+            pdf_documents = chunk_store.sync("pdf", pdfs_path)
+            source_files = chunk_store.source_files()
+        finally:
+            if owned_store:
+                chunk_store.close()
+        logging.info(f"Loaded {len(video_documents)} videos and {len(pdf_documents)} pdfs from the chunk store")
+        retriever = Retriever.from_chunks(video_documents, pdf_documents, embedder, unified=unified)
+        retriever.source_files = source_files
+        return retriever
+
+    if checkpoint_dir is None:
+        checkpoint_dir = os.getenv("INGEST_CHECKPOINT_DIR")
+    return ingest_sources(embedder, videos_path, pdfs_path, unified=unified, checkpoint_dir=checkpoint_dir)
+
+
+def ingest_sources(embedder, videos_path, pdfs_path, unified: bool = False, checkpoint_dir: str | None = None,
+                   batch_size: int | None = None, checkpoint_every: int | None = None) -> Retriever:
+    """
+    Streams the source directories into a new Retriever with bounded memory.
+
+    Files are loaded and chunked one at a time (`iter_source_documents`)
+    and their chunks are embedded and indexed in fixed-size batches
+    (`Retriever.ingest`), so the raw documents, chunk texts and vectors of
+    the whole corpus are never held at once.
+
+    With a checkpoint directory, a snapshot generation of the partial
+    index is published there (see `indexing.snapshots`) every
+    `checkpoint_every` chunks, together with the names of the files
+    already ingested. A run that was interrupted resumes from the last
+    checkpoint and skips those files. The checkpoint directory is removed
+    once the run completes.
+
+    Args:
+        embedder: Embedder used to generate text embeddings.
+        videos_path: Directory containing video transcript JSON files.
+        pdfs_path: Directory containing PDF files.
+        unified: Index both sources in one shared index.
+        checkpoint_dir: Optional checkpoint directory.
+        batch_size: Chunks per embedding batch (see `Retriever.ingest`).
+        checkpoint_every: Chunks between checkpoints.
+
+    Returns:
+        A Retriever ready to answer queries.
+
+    Notes:
+        - A checkpoint built with another embedding model or index layout
+          is ignored and the run starts over.
+        - Each checkpoint rewrites the partial snapshot, so its cost grows
+          with the corpus; keep `checkpoint_every` large for big corpora.
+    """
+    retriever, progress = _resume_ingestion(embedder, checkpoint_dir, unified)
+    if retriever is None:
+        retriever = Retriever.from_chunks([], [], embedder, unified=unified)
+        progress = {"video": [], "pdf": []}
+
+    def save_checkpoint(snapshot_dir):
+        Path(snapshot_dir).mkdir(parents=True, exist_ok=True)
+        with open(Path(snapshot_dir) / INGESTION_PROGRESS_FILE, "w") as f:
+            json.dump(progress, f)
+        retriever.save(snapshot_dir)
+
+    checkpoint = (lambda: publish_snapshot(checkpoint_dir, save_checkpoint)) if checkpoint_dir else None
+
+    for source, folder in (("video", videos_path), ("pdf", pdfs_path)):
+        done = progress[source]
+
+        def documents():
+            for path, doc_id, chunks in iter_source_documents(source, folder, skip=set(done)):
+                # Recorded when pulled: by the next checkpoint it is indexed.
+                done.append(path.name)
+                retriever.source_files.setdefault(doc_id, []).append(str(path))
+                yield doc_id, chunks
+
+        retriever.ingest(source, documents(), batch_size, checkpoint, checkpoint_every)
+
+    if checkpoint_dir:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    logging.info(f"Ingested {len(progress['video'])} videos and {len(progress['pdf'])} pdfs")
+    return retriever
+
+
+def _resume_ingestion(embedder, checkpoint_dir: str | None, unified: bool):
+    """
+    Loads the last ingestion checkpoint in `checkpoint_dir`.
+
+    Returns:
+        Tuple of (retriever, progress), or (None, None) when there is no
+        usable checkpoint.
+    """
+    snapshot_dir = current_snapshot_dir(checkpoint_dir) if checkpoint_dir else None
+    if snapshot_dir is None or not (snapshot_dir / INGESTION_PROGRESS_FILE).exists():
+        return None, None
+
+    manifest = Retriever.read_manifest(snapshot_dir) or {}
+    if (
+        manifest.get("embedding_model") != getattr(embedder, "model_name", None)
+        or manifest.get("unified", False) != unified
+    ):
+        logging.info(f"Ingestion checkpoint in {snapshot_dir} does not match this build, starting over")
+        return None, None
+
+    with open(snapshot_dir / INGESTION_PROGRESS_FILE) as f:
+        progress = json.load(f)
+    # The index keeps growing, so it is read into memory rather than mapped.
+    retriever = Retriever.load(snapshot_dir, embedder, mmap=False)
+    logging.info(
+        f"Resuming ingestion from {snapshot_dir}: {len(progress['video'])} videos "
+        f"and {len(progress['pdf'])} pdfs already indexed"
+    )
+    return retriever, progress
+
+
+def load_or_build_retriever(embedder, videos_path, pdfs_path, index_dir=None, unified: bool = False) -> Retriever:
+    """
+    Cold-starts a Retriever from a snapshot, or builds it from the sources.
+
+    If the current snapshot generation in `index_dir` was built with the
+    same embedding model and index layout, it is loaded directly and the
+    source files are not read. Otherwise the sources are loaded, chunked and embedded, and
+    a new snapshot generation is published to `index_dir` when one is given.
+
+    Args:
+        embedder: Embedder used to generate text embeddings.
+        videos_path: Directory containing video transcript JSON files.
+        pdfs_path: Directory containing PDF files.
+        index_dir: Optional snapshot directory (e.g. the `INDEX_DIR` setting).
+        unified: Index both sources in one shared index.
+
+    Returns:
+        A Retriever ready to answer queries.
+    """
+    snapshot_dir = current_snapshot_dir(index_dir) if index_dir else None
+    if snapshot_dir is not None:
+        manifest = Retriever.read_manifest(snapshot_dir)
+        model_name = getattr(embedder, "model_name", None)
+        if manifest is not None and manifest.get("embedding_model") == model_name:
+            if manifest.get("unified", False) == unified:
+                return Retriever.load(snapshot_dir, embedder)
+            logging.info(f"Index snapshot in {snapshot_dir} uses another index layout, rebuilding")
+        else:
+            logging.info(f"Index snapshot in {snapshot_dir} was built with another embedding model, rebuilding")
+
+    retriever = build_retriever(embedder, videos_path, pdfs_path, unified=unified)
+    if index_dir:
+        publish_snapshot(index_dir, retriever.save)
+    return retriever
+
+
+def retrieve_from_videos(question, videos, embedder, threshold):
+    """
+    Retrieves the most relevant video-based answer for a given question.
+
+    This function:
+    - Chunks all video transcripts
+    - Embeds the resulting chunks
+    - Builds a vector index
+    - Performs semantic retrieval via RagSystem
+    - Applies a similarity threshold to accept or reject the result
+
+    Args:
+        question: User query string.
+        videos: List of video transcript dictionaries.
+        embedder: Embedder used to generate text embeddings.
+        threshold: Minimum similarity score required to accept a result.
+
+    Returns:
+        A VideoAnswer object if a chunk exceeds the similarity threshold,
+        otherwise None.
+
+    Notes:
+        - The index is rebuilt on every call. Long-running callers should
+          build a `Retriever` once and reuse it instead.
+    """
+    rag = build_rag_system(chunk_videos(videos), embedder)
+    best_score, best_idx = rag.answer(question)
+    best_chunk = rag.chunks[best_idx] if best_idx is not None else None
+    return select_video_answer(best_score, best_chunk, threshold)
+
 def retrieve_from_pdfs(question, pdfs, embedder, threshold):
     """
     Retrieves the most relevant PDF-based answer for a given question.
@@ -80,31 +1032,12 @@ def retrieve_from_pdfs(question, pdfs, embedder, threshold):
     Returns:
         A PDFAnswer object if a chunk exceeds the similarity threshold,
         otherwise None.
-    """
-    
-    all_chunks = []
 
-    for pdf in pdfs:
-        chunks = chunk_pdf_pages(pdf)
-        all_chunks.extend(chunks)
-    
-    logging.info(f"chunked pdfs into {len(all_chunks)} chunks")
-
-    texts = [chunk.text for chunk in all_chunks]
-    vectors = embedder.embed_texts(texts)
-    pdf_vector_index = VectorIndex(dim=vectors.shape[1])
-    pdf_vector_index.add(vectors)
-    pdf_rag = RAGSystem(
-        chunks=all_chunks,
-        embedder=embedder,
-        index=pdf_vector_index,
-    )
-    best_score, best_idx = pdf_rag.answer(question)
-    
-    if(best_score is not None and best_score > threshold):
-        best_chunk = all_chunks[best_idx]
-        logging.info(f"best pdf chunk retrieved with score: {best_score}. Acceptance threshold: {threshold}")
-        return PDFAnswer(best_chunk)
-    
-    logging.info(f"No pdf chunk exceeded threshold. Best score: {best_score}, threshold: {threshold}")
-    return None
+    Notes:
+        - The index is rebuilt on every call. Long-running callers should
+          build a `Retriever` once and reuse it instead.
+    """
+    rag = build_rag_system(chunk_pdfs(pdfs), embedder)
+    best_score, best_idx = rag.answer(question)
+    best_chunk = rag.chunks[best_idx] if best_idx is not None else None
+    return select_pdf_answer(best_score, best_chunk, threshold)
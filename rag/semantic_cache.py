@@ -0,0 +1,115 @@
+import itertools
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Cache of formatted answers looked up by question similarity.
+
+    Previously answered question embeddings are kept in a small exact
+    FAISS index. A new question whose cosine similarity to a cached one
+    reaches `threshold` gets the cached answer, skipping retrieval,
+    refinement and formatting. Entries are evicted least recently used
+    first, and the whole cache is invalidated when the corpus version
+    changes.
+    """
+
+    def __init__(self, max_size: int = 1000, threshold: float = 0.95):
+        """
+        Args:
+            max_size: Maximum number of cached answers. 0 disables the cache.
+            threshold: Minimum cosine similarity for a cache hit.
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self.corpus_version = None
+        self._index = None
+        self._answers = OrderedDict()  # entry id -> answer
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SemanticAnswerCache":
+        return cls(
+            max_size=int(os.getenv("SEMANTIC_CACHE_SIZE", 1000)),
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95)),
+        )
+
+    def _check_version(self, corpus_version):
+        if corpus_version != self.corpus_version:
+            self._index = None
+            self._answers.clear()
+            self.corpus_version = corpus_version
+
+    def lookup(self, q_vec: np.ndarray, corpus_version):
+        """
+        Returns the cached answer of the most similar previous question,
+        or None if none is similar enough.
+
+        Args:
+            q_vec: Normalized question embedding.
+            corpus_version: Version of the corpus the answer must come from.
+        """
+        if self.max_size <= 0:
+            return None
+
+        with self._lock:
+            self._check_version(corpus_version)
+            if self._index is None or not self._answers:
+                self.misses += 1
+                return None
+
+            scores, ids = self._index.search(q_vec, k=1)
+            entry_id = int(ids[0][0])
+            if entry_id < 0 or scores[0][0] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._answers.move_to_end(entry_id)
+            self.hits += 1
+            return self._answers[entry_id]
+
+    def store(self, q_vec: np.ndarray, answer, corpus_version):
+        """
+        Caches the answer given to a question.
+
+        Args:
+            q_vec: Normalized question embedding.
+            answer: Answer to return for similar questions.
+            corpus_version: Version of the corpus the answer was built from.
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._check_version(corpus_version)
+            if self._index is None:
+                from indexing.faiss.index_factory import IndexConfig  # FAISS, imported on first use
+                from indexing.faiss.vector_index import VectorIndex
+
+                self._index = VectorIndex(dim=len(q_vec), config=IndexConfig("flat"))
+
+            entry_id = next(self._ids)
+            self._index.add(q_vec.reshape(1, -1), [entry_id])
+            self._answers[entry_id] = answer
+
+            while len(self._answers) > self.max_size:
+                evicted, _ = self._answers.popitem(last=False)
+                self._index.remove_ids([evicted])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._answers),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "corpus_version": self.corpus_version,
+            }
@@ -5,7 +5,11 @@ class VideoAnswer:
     Wraps a TranscriptChunk with additional fields used during answer
     refinement and presentation, such as an optional LLM-refined response.
     """
-    
+    __slots__ = (
+        "video_id", "start_timestamp", "start_token_id", "end_timestamp", "end_token_id",
+        "transcript_snippet", "refined_answer",
+    )
+
     def __init__(self, chunk):
         self.video_id = chunk.video_id
         self.start_timestamp = chunk.start_timestamp
@@ -13,4 +17,4 @@ class VideoAnswer:
         self.end_timestamp = chunk.end_timestamp
         self.end_token_id = chunk.end_token_id
         self.transcript_snippet = chunk.text
-        self.refined_answer = None
\ No newline at end of file
+        self.refined_answer = None
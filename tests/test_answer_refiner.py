@@ -1,3 +1,7 @@
+import asyncio
+
+import pytest
+
 from rag.answer_refiner import AnswerRefiner
 from rag.video_answer import VideoAnswer
 from preprocessing.video.transcript_chunk import TranscriptChunk
@@ -5,6 +9,8 @@ from rag.pdf_answer import PDFAnswer
 from rag.video_answer import VideoAnswer
 from rag.pdf_answer import PDFAnswer
 from preprocessing.pdf.pdf_chunk import PDFChunk
+from rag.refinement_cache import SQLiteRefinementCache
+from models.lru_cache import LRUCache
 
 class DummyLLMClient:
     def generate(self, prompt: str) -> str:
@@ -60,3 +66,139 @@ def test_answer_refiner_with_pdf():
     assert refined_pdf.summary == "Refined output"
     assert refined_video is None
 
+
+
+class CountingLLMClient:
+    model_name = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        return f"Refined output {self.calls}"
+
+
+def make_video_answer(text="raw output"):
+    return VideoAnswer(TranscriptChunk("vid1", 1, 4, 0.0, 2.0, text))
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_answer_refiner_cache_skips_llm(backend, tmp_path):
+    if backend == "memory":
+        cache = LRUCache(max_size=10)
+    else:
+        cache = SQLiteRefinementCache(str(tmp_path / "refinements.sqlite"))
+    llm = CountingLLMClient()
+    refiner = AnswerRefiner(llm, cache=cache)
+
+    first, _ = refiner.refine_answer("How do I save?", make_video_answer())
+    second, _ = refiner.refine_answer("How do I save?", make_video_answer())
+    other, _ = refiner.refine_answer("How do I save?", make_video_answer("other chunk"))
+
+    assert llm.calls == 2
+    assert second.refined_answer == first.refined_answer == "Refined output 1"
+    assert other.refined_answer == "Refined output 2"
+
+
+def test_sqlite_refinement_cache_evicts_by_size_and_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("rag.refinement_cache.time.time", lambda: now[0])
+    cache = SQLiteRefinementCache(str(tmp_path / "refinements.sqlite"), max_size=2, ttl=60)
+
+    cache.put("a", "A")
+    now[0] += 1
+    cache.put("b", "B")
+    now[0] += 1
+    cache.get("a")
+    now[0] += 1
+    cache.put("c", "C")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    now[0] += 61
+    assert cache.get("c") is None
+
+
+class AsyncDummyLLMClient:
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def agenerate(self, prompt: str) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return "Async refined output"
+
+    def generate(self, prompt: str) -> str:
+        raise AssertionError("the async path must not call generate")
+
+
+def test_arefine_answer_uses_agenerate_concurrently():
+    llm = AsyncDummyLLMClient()
+    refiner = AnswerRefiner(llm)
+    pdf = PDFAnswer(PDFChunk("doc.pdf", 2, 1, "Registration instructions"))
+
+    video, pdf = asyncio.run(refiner.arefine_answer("How do I save?", make_video_answer(), pdf))
+
+    assert video.refined_answer == "Async refined output"
+    assert pdf.summary == "Async refined output"
+    assert llm.max_in_flight == 2
+
+
+def test_arefine_answer_falls_back_to_sync_client():
+    refiner = AnswerRefiner(DummyLLMClient(), cache=LRUCache())
+
+    video, pdf = asyncio.run(refiner.arefine_answer("How do I save?", make_video_answer()))
+
+    assert video.refined_answer == "Refined output"
+    assert pdf is None
+
+
+class StreamingLLMClient:
+    model_name = "streaming"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def astream(self, prompt: str):
+        self.calls += 1
+        for piece in ["Refined ", "streamed ", "output"]:
+            await asyncio.sleep(0)
+            yield piece
+
+
+async def collect(stream):
+    return [piece async for piece in stream]
+
+
+def test_astream_refinement_yields_pieces_and_caches():
+    llm = StreamingLLMClient()
+    refiner = AnswerRefiner(llm, cache=LRUCache())
+
+    video = make_video_answer()
+    pieces = asyncio.run(collect(refiner.astream_refinement("How do I save?", video)))
+
+    assert pieces == ["Refined ", "streamed ", "output"]
+    assert video.refined_answer == "Refined streamed output"
+
+    again = make_video_answer()
+    assert asyncio.run(collect(refiner.astream_refinement("How do I save?", again))) == [
+        "Refined streamed output"
+    ]
+    assert again.refined_answer == "Refined streamed output"
+    assert llm.calls == 1
+
+
+def test_astream_refinement_without_streaming_client():
+    refiner = AnswerRefiner(DummyLLMClient())
+    pdf = PDFAnswer(PDFChunk("doc.pdf", 2, 1, "Registration instructions"))
+
+    pieces = asyncio.run(collect(refiner.astream_refinement("How do I register?", None, pdf)))
+
+    assert pieces == ["Refined output"]
+    assert pdf.summary == "Refined output"
@@ -0,0 +1,261 @@
+import json
+import threading
+import time
+
+import fitz
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import api.app as api_app
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def embed_texts(self, texts):
+        return np.array([self.embed_query(t) for t in texts], dtype=np.float32)
+
+    def embed_query(self, query):
+        vec = np.zeros(26, dtype=np.float32)
+        vec[ord(query.lower()[0]) - ord("a")] = 1.0
+        return vec
+
+    def embed_queries(self, queries):
+        return self.embed_texts(queries)
+
+
+class DummyLLMClient:
+    def generate(self, prompt: str) -> str:
+        return "Refined output"
+
+    async def astream(self, prompt: str):
+        for piece in ("Refined ", "output"):
+            yield piece
+
+
+def transcript(video_id, word):
+    return {
+        "video_id": video_id,
+        "video_transcripts": [{"id": 1, "timestamp": 0.0, "word": word}],
+    }
+
+
+def start_app(tmp_path, monkeypatch):
+    """
+    Starts the API over `tmp_path/videos` and `tmp_path/pdfs` with stub
+    embedding and LLM backends.
+    """
+    for name in ("videos", "pdfs"):
+        (tmp_path / name).mkdir(exist_ok=True)
+    monkeypatch.setenv("VIDEO_SOURCE_PATH", str(tmp_path / "videos"))
+    monkeypatch.setenv("PDF_SOURCE_PATH", str(tmp_path / "pdfs"))
+    monkeypatch.delenv("INDEX_DIR", raising=False)
+    monkeypatch.delenv("CHUNK_STORE_PATH", raising=False)
+    monkeypatch.setenv("SEMANTIC_CACHE_SIZE", "0")
+    monkeypatch.setattr(api_app, "create_embedder", lambda **kwargs: DummyEmbedder())
+    monkeypatch.setattr(api_app, "create_llm_client", lambda **kwargs: DummyLLMClient())
+    return TestClient(api_app.app)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    (tmp_path / "videos").mkdir()
+    (tmp_path / "videos" / "vid1.json").write_text(json.dumps(transcript("vid1", "apple")))
+
+    with start_app(tmp_path, monkeypatch) as client:
+        yield client
+
+
+def upload(client, name, body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    return client.post("/documents", files={"file": (name, data, "application/json")})
+
+
+def test_add_and_delete_document(client, tmp_path):
+    response = upload(client, "upload.json", transcript("vid2", "banana"))
+
+    assert response.status_code == 200
+    assert response.json() == {"document_id": "vid2", "source": "video", "chunks": 1}
+    assert (tmp_path / "videos" / "vid2.json").exists()
+    assert client.post("/ask", json={"question": "banana"}).status_code == 200
+
+    response = client.delete("/documents/vid2")
+
+    assert response.status_code == 200
+    assert response.json()["chunks"] == 1
+    assert not (tmp_path / "videos" / "vid2.json").exists()
+    assert client.post("/ask", json={"question": "banana"}).status_code == 404
+
+
+def test_replacing_document_rewrites_every_file_sharing_its_id(tmp_path, monkeypatch):
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    (videos / "part1.json").write_text(json.dumps(transcript("vid1", "apple")))
+    (videos / "part2.json").write_text(json.dumps(transcript("vid1", "avocado")))
+
+    with start_app(tmp_path, monkeypatch) as client:
+        assert upload(client, "new.json", transcript("vid1", "banana")).status_code == 200
+
+        assert sorted(path.name for path in videos.iterdir()) == ["part1.json"]
+        assert json.loads((videos / "part1.json").read_text()) == transcript("vid1", "banana")
+
+        assert client.delete("/documents/vid1").status_code == 200
+        assert list(videos.iterdir()) == []
+
+
+def test_delete_unknown_document_is_404(client):
+    assert client.delete("/documents/missing").status_code == 404
+
+
+def test_document_changes_on_hnsw_index_are_409(tmp_path, monkeypatch):
+    (tmp_path / "videos").mkdir()
+    (tmp_path / "videos" / "vid1.json").write_text(json.dumps(transcript("vid1", "apple")))
+    monkeypatch.setenv("INDEX_TYPE", "hnsw")
+
+    with start_app(tmp_path, monkeypatch) as client:
+        assert client.delete("/documents/vid1").status_code == 409
+        assert upload(client, "vid1.json", transcript("vid1", "banana")).status_code == 409
+        # New documents can still be added.
+        assert upload(client, "vid2.json", transcript("vid2", "banana")).status_code == 200
+
+
+def test_upload_with_unsupported_type_is_400(client):
+    response = client.post("/documents", files={"file": ("notes.txt", b"hello", "text/plain")})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    [1, 2],
+    {"video_transcripts": []},
+    {"video_id": "vid3", "video_transcripts": [{"id": "one", "timestamp": 0.0, "word": "cherry"}]},
+    {"video_id": "vid3", "video_transcripts": [{"id": None, "timestamp": 0.0, "word": "cherry"}]},
+    {"video_id": 3, "video_transcripts": []},
+])
+def test_upload_with_malformed_transcript_is_400(client, body):
+    assert upload(client, "upload.json", body).status_code == 400
+
+
+@pytest.mark.parametrize("video_id", ["../../escape_test", "sub/vid", "..", ""])
+def test_upload_with_path_in_video_id_is_rejected(client, tmp_path, video_id):
+    response = upload(client, "upload.json", transcript(video_id, "cherry"))
+
+    assert response.status_code == 400
+    assert not list(tmp_path.rglob("escape_test.json"))
+    # Nothing was indexed under the rejected id either.
+    assert client.post("/ask", json={"question": "cherry"}).status_code == 404
+
+
+def sse_events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_ask_stream_sends_source_then_tokens(client):
+    response = client.post("/ask/stream", json={"question": "apple"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = sse_events(response)
+    assert [event for event, _ in events] == ["source", "token", "token", "done"]
+    assert events[0][1]["source"]["video_id"] == "vid1"
+
+    # The source text and the tokens add up to the /ask answer.
+    streamed = events[0][1]["text"] + "".join(data["text"] for event, data in events if event == "token")
+    assert streamed == client.post("/ask", json={"question": "apple"}).json()["answer"]
+    # The GET variant serves EventSource clients the same answer.
+    events = sse_events(client.get("/ask/stream", params={"question": "apple"}))
+    assert events[0][1]["text"] + "".join(data["text"] for event, data in events if event == "token") == streamed
+
+
+def test_ask_stream_without_relevant_answer_is_404(client):
+    assert client.post("/ask/stream", json={"question": "zebra"}).status_code == 404
+    assert client.get("/ask/stream", params={"question": "zebra"}).status_code == 404
+    assert client.get("/ask/stream").status_code == 422
+
+
+def test_ask_answers_from_indexed_video(client):
+    response = client.post("/ask", json={"question": "apple"})
+
+    assert response.status_code == 200
+    assert "Refined output" in response.json()["answer"]
+    assert client.post("/ask", json={"question": "zebra"}).status_code == 404
+    assert client.post("/ask", json={}).status_code == 422
+
+
+def test_upload_pdf_document(client, tmp_path):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Banana bread recipe")
+    data = doc.tobytes()
+    doc.close()
+
+    response = client.post("/documents", files={"file": ("recipes.pdf", data, "application/pdf")})
+
+    assert response.status_code == 200
+    assert response.json() == {"document_id": "recipes.pdf", "source": "pdf", "chunks": 1}
+    assert (tmp_path / "pdfs" / "recipes.pdf").read_bytes() == data
+    assert "recipes.pdf" in client.post("/ask", json={"question": "banana"}).json()["answer"]
+
+    response = client.post("/documents", files={"file": ("broken.pdf", b"not a pdf", "application/pdf")})
+    assert response.status_code == 400
+
+
+def test_ask_batch_streams_one_line_per_question(client):
+    response = client.post("/ask/batch", json={"questions": ["apple", "zebra"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda r: r["index"])
+    assert [(r["index"], r["question"]) for r in results] == [(0, "apple"), (1, "zebra")]
+    assert "Refined output" in results[0]["answer"]
+    assert results[1]["answer"] is None
+    assert client.post("/ask/batch", json={"questions": "apple"}).status_code == 422
+
+
+def test_reindex_runs_in_background(client, tmp_path, monkeypatch):
+    release = threading.Event()
+    build_retriever = api_app.build_retriever
+
+    def slow_build(*args, **kwargs):
+        release.wait(timeout=5)
+        return build_retriever(*args, **kwargs)
+
+    monkeypatch.setattr(api_app, "build_retriever", slow_build)
+    (tmp_path / "videos" / "vid2.json").write_text(json.dumps(transcript("vid2", "banana")))
+
+    response = client.post("/reindex")
+    assert response.status_code == 202
+    assert response.json()["rebuilding"] is True
+    assert client.post("/reindex").status_code == 409
+    # Still served by the current generation.
+    assert client.post("/ask", json={"question": "banana"}).status_code == 404
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while client.get("/reindex").json()["rebuilding"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    status = client.get("/reindex").json()
+    assert (status["generation"], status["rebuilding"], status["last_error"]) == (2, False, None)
+    assert status["last_duration"] > 0
+    assert client.post("/ask", json={"question": "banana"}).status_code == 200
+
+
+def test_stats_reports_caches_and_batching(client):
+    client.post("/ask", json={"question": "apple"})
+
+    stats = client.get("/stats").json()
+
+    assert set(stats) == {
+        "query_embedding_cache",
+        "refinement_cache",
+        "semantic_answer_cache",
+        "query_micro_batching",
+    }
+    assert stats["semantic_answer_cache"] is not None
+    assert stats["query_micro_batching"] is not None
@@ -0,0 +1,77 @@
+import asyncio
+
+import numpy as np
+
+from rag.answer_refiner import AnswerRefiner
+from rag.batch import answer_batch, batch_result
+from rag.retrievel import Retriever
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def __init__(self):
+        self.batch_calls = 0
+
+    def embed_texts(self, texts):
+        return np.array([self.embed_query(t) for t in texts], dtype=np.float32)
+
+    def embed_query(self, query):
+        vec = np.zeros(26, dtype=np.float32)
+        vec[ord(query.lower()[0]) - ord("a")] = 1.0
+        return vec
+
+    def embed_queries(self, queries):
+        self.batch_calls += 1
+        return np.array([self.embed_query(q) for q in queries], dtype=np.float32)
+
+
+class DummyLLMClient:
+    async def agenerate(self, prompt: str) -> str:
+        return "Refined output"
+
+
+VIDEOS = [
+    {
+        "video_id": "vid1",
+        "video_transcripts": [{"id": 1, "timestamp": 0.0, "word": "apple"}],
+    }
+]
+PDFS = [{"pdf_id": "doc.pdf", "pages": ["Banana bread"]}]
+
+
+def test_retrieve_batch_matches_single_question_path():
+    embedder = DummyEmbedder()
+    retriever = Retriever.from_sources(VIDEOS, PDFS, embedder)
+    questions = ["apple?", "banana?", "cherry?"]
+
+    results = retriever.retrieve_batch(questions, 0.5, 0.5)
+
+    assert embedder.batch_calls == 1
+    for question, (video, pdf) in zip(questions, results):
+        single_video = retriever.retrieve_video(question, 0.5)
+        single_pdf = None if single_video else retriever.retrieve_pdf(question, 0.5)
+        assert bool(video) == bool(single_video)
+        assert bool(pdf) == bool(single_pdf)
+    assert results[0][0].video_id == "vid1"
+    assert results[1][1].pdf_id == "doc.pdf"
+    assert results[2] == (None, None)
+
+
+def test_answer_batch_yields_every_question():
+    retriever = Retriever.from_sources(VIDEOS, PDFS, DummyEmbedder())
+    refiner = AnswerRefiner(DummyLLMClient())
+    questions = ["apple?", "banana?", "cherry?", "apple pie?"]
+
+    async def collect():
+        return [
+            batch_result(i, questions[i], video, pdf)
+            async for i, video, pdf in answer_batch(questions, retriever, refiner, 0.5, 0.5, chunk_size=3)
+        ]
+
+    results = sorted(asyncio.run(collect()), key=lambda r: r["index"])
+
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert "Refined output" in results[0]["answer"]
+    assert "doc.pdf" in results[1]["answer"]
+    assert results[2]["answer"] is None
@@ -0,0 +1,117 @@
+import json
+import os
+
+import fitz
+import numpy as np
+
+from indexing import chunk_store as chunk_store_module
+from indexing.chunk_metadata import CHUNK_FIELDS
+from indexing.chunk_store import ChunkStore
+from rag.retrievel import build_retriever
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def embed_texts(self, texts):
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+def record(chunk):
+    source = "video" if hasattr(chunk, "video_id") else "pdf"
+    return {field: getattr(chunk, field) for field in CHUNK_FIELDS[source][1]}
+
+
+def write_transcript(path, video_id, words):
+    tokens = [{"id": i, "timestamp": float(i), "word": w} for i, w in enumerate(words)]
+    path.write_text(json.dumps({"video_id": video_id, "video_transcripts": tokens}))
+
+
+def write_pdf(path, text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+def tracking_store(path, monkeypatch):
+    store = ChunkStore(str(path))
+    processed = []
+    original = store._process
+
+    def process(source, paths):
+        processed.extend(p.name for p in paths)
+        return original(source, paths)
+
+    monkeypatch.setattr(store, "_process", process)
+    return store, processed
+
+
+def test_sync_only_reprocesses_changed_files(tmp_path, monkeypatch):
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    write_transcript(videos / "a.json", "A", ["click", "save"])
+    write_transcript(videos / "b.json", "B", ["open", "menu"])
+    store, processed = tracking_store(tmp_path / "chunks.sqlite", monkeypatch)
+
+    first = store.sync("video", str(videos))
+    assert [doc_id for doc_id, _ in first] == ["A", "B"]
+    assert processed == ["a.json", "b.json"]
+
+    processed.clear()
+    second = store.sync("video", str(videos))
+    assert processed == []
+    assert [[record(c) for c in chunks] for _, chunks in second] == [
+        [record(c) for c in chunks] for _, chunks in first
+    ]
+
+    # Same content with a new mtime is recognised by its hash.
+    stat = os.stat(videos / "a.json")
+    os.utime(videos / "a.json", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    write_transcript(videos / "b.json", "B", ["close", "menu", "now"])
+    store.sync("video", str(videos))
+    assert processed == ["b.json"]
+
+    processed.clear()
+    (videos / "a.json").unlink()
+    remaining = store.sync("video", str(videos))
+    assert processed == []
+    assert [doc_id for doc_id, _ in remaining] == ["B"]
+    assert len(store) == 1
+
+
+def test_chunking_config_change_reprocesses(tmp_path, monkeypatch):
+    pdfs = tmp_path / "pdfs"
+    pdfs.mkdir()
+    write_pdf(pdfs / "doc.pdf", "Registration instructions")
+    store, processed = tracking_store(tmp_path / "chunks.sqlite", monkeypatch)
+
+    [(doc_id, chunks)] = store.sync("pdf", str(pdfs))
+    assert doc_id == "doc.pdf" and chunks[0].text == "Registration instructions"
+
+    monkeypatch.setattr(chunk_store_module, "CHUNKER_VERSION", chunk_store_module.CHUNKER_VERSION + 1)
+    processed.clear()
+    store.sync("pdf", str(pdfs))
+    assert processed == ["doc.pdf"]
+
+
+def test_build_retriever_with_chunk_store_matches_direct_build(tmp_path):
+    videos, pdfs = tmp_path / "videos", tmp_path / "pdfs"
+    videos.mkdir()
+    pdfs.mkdir()
+    write_transcript(videos / "a.json", "A", ["click", "save"])
+    write_pdf(pdfs / "doc.pdf", "Registration instructions")
+    store = ChunkStore(str(tmp_path / "chunks.sqlite"))
+
+    direct = build_retriever(DummyEmbedder(), str(videos), str(pdfs))
+    stored = build_retriever(DummyEmbedder(), str(videos), str(pdfs), chunk_store=store)
+
+    assert direct.documents == stored.documents
+    for source in ("video", "pdf"):
+        assert [record(c) for c in direct._rag(source).chunks.values()] == [
+            record(c) for c in stored._rag(source).chunks.values()
+        ]
+    assert stored.source_files == {
+        "A": [str((videos / "a.json").resolve())],
+        "doc.pdf": [str((pdfs / "doc.pdf").resolve())],
+    }
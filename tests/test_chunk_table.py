@@ -0,0 +1,72 @@
+import numpy as np
+
+from indexing import chunk_table as chunk_table_module
+from indexing.chunk_metadata import CHUNK_FIELDS
+from indexing.chunk_ids import make_chunk_id
+from indexing.chunk_table import ChunkTable
+from preprocessing.pdf.pdf_chunk import PDFChunk
+from preprocessing.video.transcript_chunk import TranscriptChunk
+from preprocessing.video.video_chunking import chunk_video_transcript
+
+
+def record(chunk):
+    source = "video" if isinstance(chunk, TranscriptChunk) else "pdf"
+    return {field: getattr(chunk, field) for field in CHUNK_FIELDS[source][1]}
+
+
+def tokens(words):
+    return [{"id": i, "timestamp": i * 0.1, "word": w} for i, w in enumerate(words)]
+
+
+def test_table_maps_ids_to_equal_chunks():
+    video_chunks = chunk_video_transcript("vid1", tokens(["click", "save", "then", "ok"]), chunk_size=2, overlap=0)
+    pdf_chunk = PDFChunk("doc.pdf", 3, 1, "Registration instructions")
+    ids = [make_chunk_id(0, 0), make_chunk_id(0, 1), make_chunk_id(1, 0)]
+
+    table = ChunkTable()
+    table.extend(ids, video_chunks + [pdf_chunk])
+
+    assert list(table) == ids and len(table) == 3
+    assert [record(table[i]) for i in ids] == [record(c) for c in video_chunks + [pdf_chunk]]
+    assert table[ids[0]].window is not None  # text stays a window on the transcript
+    assert table.documents() == [("vid1", "video", 0), ("doc.pdf", "pdf", 1)]
+    assert (table.count("video"), table.count("pdf")) == (2, 1)
+    assert make_chunk_id(2, 0) not in table
+
+
+def test_out_of_order_ids_and_replacement():
+    table = ChunkTable()
+    table.extend([30, 10], [PDFChunk("a.pdf", 1, 0, "thirty"), PDFChunk("a.pdf", 1, 1, "ten")])
+    table[20] = PDFChunk("a.pdf", 1, 2, "twenty")
+    table[10] = PDFChunk("a.pdf", 1, 3, "ten again")
+
+    assert sorted(table) == [10, 20, 30]
+    assert [table[i].text for i in (10, 20, 30)] == ["ten again", "twenty", "thirty"]
+
+
+def test_remove_range_and_compaction(monkeypatch):
+    monkeypatch.setattr(chunk_table_module, "_COMPACT_MIN_DEAD", 2)
+    table = ChunkTable()
+    ids = [make_chunk_id(key, 0) for key in range(5)]
+    table.extend(ids, [PDFChunk(f"{key}.pdf", 1, 0, f"text {key}") for key in range(5)])
+
+    assert table.remove_range(ids[0], ids[3]) == 3  # 3 dead rows > 2 live rows: compacted
+    assert bytes(table._blob) == b"text 3text 4"
+
+    del table[ids[4]]
+    assert list(table) == [ids[3]]
+    assert table[ids[3]].text == "text 3"
+    assert np.array_equal(table.ids_in_range(ids[0], ids[4] + 1), [ids[3]])
+
+
+def test_columns_roundtrip_without_objects():
+    chunks = chunk_video_transcript("vid1", tokens(["open", "the", "menu"]), chunk_size=2, overlap=1)
+    table = ChunkTable()
+    table.extend(range(len(chunks)), chunks)
+
+    ids, columns = table.columns("video")
+    restored = ChunkTable()
+    restored.extend_columns("video", ids, columns)
+
+    assert [record(restored[i]) for i in ids] == [record(c) for c in chunks]
+    assert restored.columns("pdf") == ([], {"pdf_id": [], "page_number": [], "paragraph_index": [], "text": []})
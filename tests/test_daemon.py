@@ -0,0 +1,117 @@
+import asyncio
+import os
+import socket
+import stat
+import tempfile
+
+import pytest
+
+from rag.daemon import ask, default_socket_path, serve
+
+
+def accepts_connections(socket_path):
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def run_with_daemon(socket_path, answer, client):
+    async def run():
+        server = asyncio.create_task(serve(socket_path, answer))
+        # A stale socket file may exist before the daemon replaces it.
+        while not accepts_connections(socket_path):
+            await asyncio.sleep(0.01)
+        try:
+            return await asyncio.to_thread(client)
+        finally:
+            server.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await server
+
+    return asyncio.run(run())
+
+
+def test_ask_round_trip(tmp_path):
+    socket_path = str(tmp_path / "rag.sock")
+
+    async def answer(question):
+        if question == "fail":
+            raise ValueError("boom")
+        return f"answer to {question}"
+
+    def client():
+        first = ask(socket_path, "How do I save?", timeout=5)
+        with pytest.raises(RuntimeError, match="boom"):
+            ask(socket_path, "fail", timeout=5)
+        return first
+
+    assert run_with_daemon(socket_path, answer, client) == "answer to How do I save?"
+    assert not os.path.exists(socket_path)
+
+
+def test_ask_without_daemon(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ask(str(tmp_path / "missing.sock"), "How do I save?")
+
+
+def test_serve_replaces_stale_socket(tmp_path):
+    socket_path = str(tmp_path / "rag.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+
+    async def answer(question):
+        return "ok"
+
+    assert run_with_daemon(socket_path, answer, lambda: ask(socket_path, "q", timeout=5)) == "ok"
+
+
+def test_ask_times_out_on_hung_daemon(tmp_path):
+    socket_path = str(tmp_path / "hung.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        # Listens but never accepts or answers.
+        server.bind(socket_path)
+        server.listen(1)
+
+        with pytest.raises(TimeoutError, match="did not answer within 0.2s"):
+            ask(socket_path, "How do I save?", timeout=0.2)
+
+
+def test_socket_is_private_from_creation(tmp_path):
+    socket_path = str(tmp_path / "rag.sock")
+
+    async def answer(question):
+        return "ok"
+
+    def client():
+        return stat.S_IMODE(os.stat(socket_path).st_mode)
+
+    assert run_with_daemon(socket_path, answer, client) == 0o600
+
+
+def test_default_socket_path_is_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert default_socket_path() == "/run/user/1000/multisource-rag.sock"
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    socket_path = default_socket_path()
+    assert os.path.dirname(socket_path) == str(tmp_path / f"multisource-rag-{os.getuid()}")
+
+    async def answer(question):
+        return "ok"
+
+    assert run_with_daemon(socket_path, answer, lambda: ask(socket_path, "q", timeout=5)) == "ok"
+    assert stat.S_IMODE(os.stat(os.path.dirname(socket_path)).st_mode) == 0o700
+
+    # A directory others can reach, e.g. created first by another user, is refused.
+    os.chmod(os.path.dirname(socket_path), 0o755)
+    with pytest.raises(RuntimeError, match="mode 0700"):
+        asyncio.run(serve(socket_path, answer))
+    with pytest.raises(RuntimeError, match="mode 0700"):
+        ask(socket_path, "q", timeout=5)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+import models.embedder as embedder_module
+from models.embedder import Embedder
+from models.embedding_cache import EmbeddingCache, text_hash
+from models.lru_cache import LRUCache
+
+
+class DummySentenceTransformer:
+    def __init__(self, model_name):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return np.array([len(texts), 1.0], dtype=np.float32)
+        self.encoded.extend(texts)
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32).reshape(-1, 2)
+
+
+def test_text_hash_ignores_whitespace():
+    assert text_hash("click  save\n") == text_hash("click save")
+    assert text_hash("click save") != text_hash("click cancel")
+
+
+def test_embed_texts_only_encodes_cache_misses(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedder_module, "SentenceTransformer", DummySentenceTransformer)
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+
+    embedder = Embedder("dummy", cache=cache, batch_size=2)
+    first = embedder.embed_texts(["a", "bb", "a", "ccc"])
+    assert embedder.model.encoded == ["a", "bb", "ccc"]
+    assert first.shape == (4, 2)
+
+    # A fresh embedder (e.g. after a restart) reuses the persisted vectors.
+    restarted = Embedder("dummy", cache=EmbeddingCache(cache.path))
+    second = restarted.embed_texts(["ccc", "a", "dddd"])
+    assert restarted.model.encoded == ["dddd"]
+    np.testing.assert_array_equal(second[0], first[3])
+    np.testing.assert_array_equal(second[1], first[0])
+
+
+def test_cache_is_keyed_by_model_name(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+    h = text_hash("hello")
+    cache.put_many("model-a", [h], np.ones((1, 3)))
+
+    assert h in cache.get_many("model-a", [h])
+    assert cache.get_many("model-b", [h]) == {}
+
+
+def test_embed_query_uses_lru_cache(monkeypatch):
+    monkeypatch.setattr(embedder_module, "SentenceTransformer", DummySentenceTransformer)
+    embedder = Embedder("dummy", query_cache=LRUCache(max_size=2))
+
+    first = embedder.embed_query("add customer")
+    second = embedder.embed_query("  add   customer ")
+
+    assert second is first
+    assert not first.flags.writeable
+    with pytest.raises(ValueError):
+        first[0] = 0.0
+    assert embedder.query_cache.stats()["hits"] == 1
+    assert embedder.query_cache.stats()["misses"] == 1
+
+
+def test_lru_cache_evicts_least_recently_used_and_expires(monkeypatch):
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    now = [100.0]
+    monkeypatch.setattr("models.lru_cache.time.monotonic", lambda: now[0])
+    expiring = LRUCache(max_size=2, ttl=10)
+    expiring.put("q", 1)
+    now[0] += 11
+    assert expiring.get("q") is None
+
+
+def test_embed_queries_encodes_misses_in_one_batch(monkeypatch):
+    monkeypatch.setattr(embedder_module, "SentenceTransformer", DummySentenceTransformer)
+    embedder = Embedder("dummy", query_cache=LRUCache(max_size=10))
+    cached = embedder.embed_query("a")
+
+    vectors = embedder.embed_queries(["a", "bb", "bb ", "ccc"])
+
+    assert embedder.model.encoded == ["bb", "ccc"]
+    assert vectors.shape == (4, 2)
+    np.testing.assert_array_equal(vectors[0], cached)
+    np.testing.assert_array_equal(vectors[1], vectors[2])
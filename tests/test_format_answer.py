@@ -1,4 +1,4 @@
-from rag.format_answers import format_answer
+from rag.format_answers import format_answer, format_answer_head
 from rag.pdf_answer import PDFAnswer
 from rag.video_answer import VideoAnswer
 from preprocessing.pdf.pdf_chunk import PDFChunk
@@ -50,3 +50,14 @@ def test_format_video_answer():
     assert "Video ID" in output
     assert "refined click save." in output
 
+
+
+def test_format_answer_head_is_prefix_of_answer():
+    video = VideoAnswer(TranscriptChunk("vid1", 1, 4, 0.0, 2.0, "click save"))
+    video.refined_answer = "Click save."
+    pdf = PDFAnswer(PDFChunk("doc.pdf", 2, 1, "Registration instructions"))
+    pdf.summary = "Register first."
+
+    assert format_answer_head("Q?", video) + "Click save." == format_answer("Q?", video)
+    assert format_answer_head("Q?", None, pdf) + "Register first." == format_answer("Q?", None, pdf)
+    assert format_answer_head("Q?") == format_answer("Q?")
@@ -0,0 +1,42 @@
+import pytest
+
+from benchmark_import_time import BUDGET_MS, ENTRY_POINTS, fastest_import, heavy_imports, measure_imports
+
+
+@pytest.mark.parametrize("module", sorted(ENTRY_POINTS.values()))
+def test_entry_points_do_not_import_heavy_backends(module):
+    imports = measure_imports(module)
+
+    assert module in imports
+    assert heavy_imports(imports) == []
+
+
+@pytest.mark.parametrize("module", sorted(ENTRY_POINTS.values()))
+def test_entry_points_import_within_budget(module):
+    imports = fastest_import(module)
+
+    assert imports[module][1] / 1000 <= BUDGET_MS[module]
+
+
+def test_registry_imports_backend_only_when_selected():
+    imports = measure_imports("models.registry")
+
+    assert "models.embedder" not in imports
+    assert "models.gemini_llm_client" not in imports
+    assert heavy_imports(imports) == []
+
+
+def test_heavy_imports_matches_submodules():
+    imports = {"torch": (1, 1), "torch.nn": (1, 1), "torchvision": (1, 1), "numpy": (1, 1)}
+    assert heavy_imports(imports) == ["torch", "torch.nn"]
+
+
+def test_registry_selects_backend_from_env(monkeypatch):
+    from models import registry
+
+    monkeypatch.setitem(registry.LLM_BACKENDS, "dummy", "collections:OrderedDict")
+    monkeypatch.setenv("LLM_BACKEND", "dummy")
+    assert type(registry.create_llm_client()).__name__ == "OrderedDict"
+
+    with pytest.raises(ValueError, match="Unknown embedding backend"):
+        registry.create_embedder("missing")
@@ -0,0 +1,132 @@
+import pytest
+import numpy as np
+
+from rag.retrievel import Retriever
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_texts(self, texts):
+        self.embedded.extend(texts)
+        return np.array([self._vec(t) for t in texts], dtype=np.float32)
+
+    def embed_query(self, query):
+        return self._vec(query)
+
+    @staticmethod
+    def _vec(text):
+        # One-hot on the first letter keeps matches predictable.
+        vec = np.zeros(26, dtype=np.float32)
+        vec[ord(text.lower()[0]) - ord("a")] = 1.0
+        return vec
+
+
+def make_video(video_id, words):
+    return {
+        "video_id": video_id,
+        "video_transcripts": [
+            {"id": i, "timestamp": float(i), "word": word}
+            for i, word in enumerate(words)
+        ],
+    }
+
+
+def test_add_document_only_embeds_new_document():
+    embedder = DummyEmbedder()
+    retriever = Retriever.from_sources([make_video("vid1", ["apple"])], [], embedder)
+    embedder.embedded.clear()
+
+    doc_id, n_chunks = retriever.add_document("video", make_video("vid2", ["banana"]))
+
+    assert (doc_id, n_chunks) == ("vid2", 1)
+    assert embedder.embedded == ["banana"]
+    assert retriever.retrieve_video("banana?", threshold=0.5).video_id == "vid2"
+    assert retriever.retrieve_video("apple?", threshold=0.5).video_id == "vid1"
+
+
+def test_remove_document_by_id_range():
+    embedder = DummyEmbedder()
+    videos = [make_video("vid1", ["apple"]), make_video("vid2", ["banana"])]
+    retriever = Retriever.from_sources(videos, [], embedder)
+
+    source, removed = retriever.remove_document("vid2")
+
+    assert (source, removed) == ("video", 1)
+    assert "vid2" not in retriever.documents
+    assert retriever.retrieve_video("banana?", threshold=0.5) is None
+    assert retriever.retrieve_video("apple?", threshold=0.5).video_id == "vid1"
+
+
+def test_add_pdf_to_empty_source_and_replace():
+    embedder = DummyEmbedder()
+    retriever = Retriever.from_sources([], [], embedder)
+
+    retriever.add_document("pdf", {"pdf_id": "doc.pdf", "pages": ["Cats"]})
+    retriever.add_document("pdf", {"pdf_id": "doc.pdf", "pages": ["Dogs"]})
+
+    assert len(retriever.pdf_rag.chunks) == 1
+    assert len(retriever.pdf_rag.index) == 1
+    assert retriever.retrieve_pdf("dogs?", threshold=0.5).text == "Dogs"
+
+
+def test_runtime_changes_survive_snapshot(tmp_path):
+    embedder = DummyEmbedder()
+    retriever = Retriever.from_sources([make_video("vid1", ["apple"])], [], embedder)
+    retriever.add_document("video", make_video("vid2", ["banana"]))
+    retriever.save(tmp_path / "index")
+    # Saving again over an existing snapshot replaces it.
+    retriever.remove_document("vid1")
+    retriever.save(tmp_path / "index")
+
+    loaded = Retriever.load(tmp_path / "index", embedder)
+
+    assert set(loaded.documents) == {"vid2"}
+    loaded.add_document("video", make_video("vid3", ["cherry"]))
+    assert loaded.documents["vid3"][1] > loaded.documents["vid2"][1]
+    assert loaded.retrieve_video("cherry?", threshold=0.5).video_id == "vid3"
+
+
+def test_documents_sharing_an_id_are_merged():
+    embedder = DummyEmbedder()
+    videos = [make_video("vid1", ["apple"]), make_video("vid1", ["banana"])]
+    retriever = Retriever.from_sources(videos, [], embedder)
+
+    assert len(retriever.video_rag.chunks) == 2
+    assert retriever.retrieve_video("banana?", threshold=0.5).video_id == "vid1"
+    assert retriever.remove_document("vid1") == ("video", 2)
+
+
+def test_failed_replacement_keeps_previous_version():
+    embedder = DummyEmbedder()
+    retriever = Retriever.from_sources([make_video("vid1", ["apple"])], [], embedder)
+    documents = dict(retriever.documents)
+
+    def fail(vectors, ids=None):
+        raise RuntimeError("read-only index")
+
+    retriever.video_rag.index.add = fail
+    with pytest.raises(RuntimeError):
+        retriever.add_document("video", make_video("vid1", ["banana"]))
+    with pytest.raises(RuntimeError):
+        retriever.add_document("video", make_video("vid2", ["cherry"]))
+
+    assert retriever.documents == documents
+    assert len(retriever.video_rag.chunks) == 1
+    assert retriever.retrieve_video("apple?", threshold=0.5).video_id == "vid1"
+
+
+def test_source_files_follow_document_changes(tmp_path):
+    retriever = Retriever.from_sources([make_video("vid1", ["apple"])], [], DummyEmbedder())
+
+    retriever.add_document("video", make_video("vid2", ["banana"]), source_file="videos/vid2.json")
+    retriever.add_document("video", make_video("vid3", ["cherry"]))
+    retriever.save(tmp_path / "index")
+    loaded = Retriever.load(tmp_path / "index", retriever.embedder)
+
+    assert loaded.source_files == {"vid2": ["videos/vid2.json"]}
+    loaded.remove_document("vid2")
+    assert loaded.source_files == {}
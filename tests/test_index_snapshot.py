@@ -0,0 +1,77 @@
+import numpy as np
+
+from indexing.chunk_metadata import CHUNK_FIELDS, save_chunks, load_chunks
+from preprocessing.pdf.pdf_chunk import PDFChunk
+from preprocessing.video.transcript_chunk import TranscriptChunk
+from rag.retrievel import Retriever, load_or_build_retriever
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def embed_texts(self, texts):
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+    def embed_query(self, query):
+        return np.array([len(query), 1.0], dtype=np.float32)
+
+
+VIDEOS = [
+    {
+        "video_id": "vid1",
+        "video_transcripts": [
+            {"id": 1, "timestamp": 0.0, "word": "click"},
+            {"id": 2, "timestamp": 0.5, "word": "save"},
+        ],
+    }
+]
+PDFS = [{"pdf_id": "doc.pdf", "pages": ["Registration instructions"]}]
+
+
+def record(chunk):
+    source = "video" if isinstance(chunk, TranscriptChunk) else "pdf"
+    return {field: getattr(chunk, field) for field in CHUNK_FIELDS[source][1]}
+
+
+def test_chunk_metadata_roundtrip(tmp_path):
+    chunks = {
+        7: TranscriptChunk("vid1", 1, 20, 0.0, 4.5, "click save"),
+        (1 << 32) | 3: TranscriptChunk("vid1", 19, 38, 4.0, 9.0, "then press ok"),
+    }
+    save_chunks(chunks, tmp_path / "video_chunks.json")
+    loaded = load_chunks(tmp_path / "video_chunks.json")
+
+    assert list(loaded) == list(chunks)
+    assert [record(c) for c in loaded.values()] == [record(c) for c in chunks.values()]
+
+    pdf_chunks = {0: PDFChunk("doc.pdf", 2, 1, "Registration instructions")}
+    save_chunks(pdf_chunks, tmp_path / "pdf_chunks.json")
+    assert record(load_chunks(tmp_path / "pdf_chunks.json")[0]) == record(pdf_chunks[0])
+
+
+def test_retriever_snapshot_roundtrip(tmp_path):
+    embedder = DummyEmbedder()
+    retriever = Retriever.from_sources(VIDEOS, PDFS, embedder)
+    retriever.save(tmp_path)
+
+    loaded = Retriever.load(tmp_path, embedder, mmap=True)
+
+    video = loaded.retrieve_video("How do I save?", threshold=0.0)
+    pdf = loaded.retrieve_pdf("How do I register?", threshold=0.0)
+    assert video.video_id == "vid1"
+    assert pdf.pdf_id == "doc.pdf"
+
+
+def test_load_or_build_cold_starts_from_snapshot(tmp_path):
+    embedder = DummyEmbedder()
+    Retriever.from_sources(VIDEOS, PDFS, embedder).save(tmp_path / "index")
+
+    # The source directories do not exist: the snapshot must be used.
+    retriever = load_or_build_retriever(
+        embedder,
+        str(tmp_path / "missing_videos"),
+        str(tmp_path / "missing_pdfs"),
+        index_dir=str(tmp_path / "index"),
+    )
+    assert len(retriever.video_rag.chunks) == 1
+    assert len(retriever.pdf_rag.chunks) == 1
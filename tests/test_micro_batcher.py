@@ -0,0 +1,61 @@
+import asyncio
+
+from rag.micro_batcher import MicroBatcher
+
+
+def test_concurrent_submissions_are_batched():
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["requests"] == 5
+    assert stats["recent_mean_batch_size"] == 5
+    assert stats["recent_mean_queue_wait_ms"] >= 0
+
+
+def test_batches_are_capped_at_max_size():
+    sizes = []
+
+    def process(items):
+        sizes.append(len(items))
+        return items
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=20)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+
+    assert asyncio.run(run()) == list(range(7))
+    assert sorted(sizes) == [1, 3, 3]
+
+
+def test_processing_errors_reach_every_caller():
+    def process(items):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=5)
+        return await asyncio.gather(
+            *(batcher.submit(i) for i in range(2)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_stats_before_any_batch():
+    stats = MicroBatcher(lambda items: items).stats()
+    assert stats["batches"] == 0
+    assert stats["recent_mean_batch_size"] is None
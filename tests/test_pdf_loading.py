@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+
+from preprocessing.pdf import load_pdfs_data
+from preprocessing.pdf.load_pdfs_data import load_pdf_collection, load_pdf_pages
+from rag.retrievel import iter_source_documents
+
+
+def write_pdf(path, texts):
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+def make_collection(tmp_path):
+    write_pdf(tmp_path / "a.pdf", [f"Manual A page {i}" for i in range(7)])
+    write_pdf(tmp_path / "b.pdf", ["Manual B only page"])
+    (tmp_path / "corrupt.pdf").write_bytes(b"not a pdf")
+    return tmp_path
+
+
+def test_load_pdf_pages_range(tmp_path):
+    write_pdf(tmp_path / "a.pdf", [f"Page {i}" for i in range(5)])
+
+    pages = load_pdf_pages(str(tmp_path / "a.pdf"), 1, 3)
+
+    assert [p.strip() for p in pages] == ["Page 1", "Page 2"]
+
+
+def test_serial_load_skips_corrupt_pdf(tmp_path):
+    pdfs = load_pdf_collection(str(make_collection(tmp_path)), workers=1)
+
+    assert [pdf["pdf_id"] for pdf in pdfs] == ["a.pdf", "b.pdf"]
+    assert len(pdfs[0]["pages"]) == 7
+
+
+def test_parallel_load_matches_serial_page_order(tmp_path):
+    pdf_dir = str(make_collection(tmp_path))
+
+    serial = load_pdf_collection(pdf_dir, workers=1)
+    parallel = load_pdf_collection(pdf_dir, workers=2, pages_per_task=2)
+
+    assert parallel == serial
+
+
+def test_source_iteration_extracts_on_one_pool(tmp_path, monkeypatch):
+    for i in range(12):
+        write_pdf(tmp_path / f"doc_{i:02d}.pdf", [f"Document {i}"])
+    pools = []
+
+    class TrackedPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(load_pdfs_data, "ProcessPoolExecutor", TrackedPool)
+    monkeypatch.setenv("PDF_WORKERS", "2")
+
+    documents = list(iter_source_documents("pdf", str(tmp_path)))
+
+    # More files than fit in flight, still a single pool.
+    assert len(pools) == 1
+    assert [doc_id for _, doc_id, _ in documents] == [f"doc_{i:02d}.pdf" for i in range(12)]
@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+
+from indexing.snapshots import current_snapshot_dir, publish_snapshot
+from rag.reindex import ReindexManager
+from rag.retrievel import Retriever, load_or_build_retriever
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def embed_texts(self, texts):
+        return np.array([self.embed_query(t) for t in texts], dtype=np.float32)
+
+    def embed_query(self, query):
+        vec = np.zeros(26, dtype=np.float32)
+        vec[ord(query.lower()[0]) - ord("a")] = 1.0
+        return vec
+
+
+def make_video(video_id, word):
+    return {
+        "video_id": video_id,
+        "video_transcripts": [{"id": 1, "timestamp": 0.0, "word": word}],
+    }
+
+
+def test_rebuild_swaps_generation_and_replays_pending_changes():
+    embedder = DummyEmbedder()
+    old = Retriever.from_sources([make_video("vid1", "apple")], [], embedder)
+    manager = ReindexManager(old)
+
+    release = threading.Event()
+
+    def build():
+        release.wait(timeout=5)
+        return Retriever.from_sources([make_video("vid1", "avocado")], [], embedder)
+
+    assert manager.start_rebuild(build)
+    assert not manager.start_rebuild(build)
+
+    # Still served by the old generation while the rebuild runs.
+    in_flight = manager.current
+    manager.add_document("video", make_video("vid2", "banana"))
+    assert manager.current is old
+
+    release.set()
+    manager._thread.join(timeout=5)
+
+    assert manager.generation == 2
+    assert manager.current is not old
+    assert manager.current.retrieve_video("avocado", 0.5).transcript_snippet == "avocado"
+    assert manager.current.retrieve_video("banana", 0.5).video_id == "vid2"
+    # A request that started before the swap keeps its generation.
+    assert in_flight.retrieve_video("apple", 0.5).transcript_snippet == "apple"
+
+
+def test_failed_rebuild_keeps_current_generation():
+    old = Retriever.from_sources([], [], DummyEmbedder())
+    manager = ReindexManager(old)
+
+    def build():
+        raise RuntimeError("boom")
+
+    manager.start_rebuild(build)
+    manager._thread.join(timeout=5)
+
+    assert manager.current is old
+    assert manager.status()["last_error"] == "boom"
+    assert manager.status()["generation"] == 1
+
+
+def test_publish_snapshot_generations(tmp_path):
+    embedder = DummyEmbedder()
+    retriever = Retriever.from_sources([make_video("vid1", "apple")], [], embedder)
+
+    first = publish_snapshot(tmp_path, retriever.save)
+    retriever.add_document("video", make_video("vid2", "banana"))
+    second = publish_snapshot(tmp_path, retriever.save)
+
+    assert current_snapshot_dir(tmp_path) == second
+    # The previous generation is kept for readers that resolved it already.
+    assert first.exists()
+    third = publish_snapshot(tmp_path, retriever.save)
+    assert not first.exists() and second.exists() and third.exists()
+
+    loaded = load_or_build_retriever(embedder, None, None, index_dir=str(tmp_path))
+    assert set(loaded.documents) == {"vid1", "vid2"}
+
+
+def test_document_changes_are_persisted_in_one_delayed_snapshot():
+    persisted = []
+    done = threading.Event()
+
+    def persist(retriever):
+        persisted.append(set(retriever.documents))
+        done.set()
+
+    manager = ReindexManager(Retriever.from_sources([], [], DummyEmbedder()), persist=persist, persist_delay=0.05)
+    manager.add_document("video", make_video("vid1", "apple"))
+    manager.add_document("video", make_video("vid2", "banana"))
+
+    assert done.wait(timeout=5)
+    manager.flush()
+    assert persisted == [{"vid1", "vid2"}]
+
+
+def test_rebuilt_generation_is_persisted_before_the_swap():
+    embedder = DummyEmbedder()
+    old = Retriever.from_sources([make_video("vid1", "apple")], [], embedder)
+    serving = []
+    manager = ReindexManager(old, persist=lambda retriever: serving.append(manager.current is old))
+
+    manager.start_rebuild(lambda: Retriever.from_sources([make_video("vid1", "avocado")], [], embedder))
+    manager._thread.join(timeout=5)
+
+    assert serving == [True]
+    assert manager.current is not old
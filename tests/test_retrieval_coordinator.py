@@ -0,0 +1,142 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from models.lru_cache import LRUCache
+from rag.answer_refiner import AnswerRefiner
+from rag.retrievel import Retriever
+from rag.retrieval_coordinator import RetrievalCoordinator
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def embed_texts(self, texts):
+        return np.array([self.embed_query(t) for t in texts], dtype=np.float32)
+
+    def embed_query(self, query):
+        vec = np.zeros(26, dtype=np.float32)
+        vec[ord(query.lower()[0]) - ord("a")] = 1.0
+        return vec
+
+    def embed_queries(self, queries):
+        return np.array([self.embed_query(q) for q in queries], dtype=np.float32)
+
+
+class SlowLLMClient:
+    def __init__(self):
+        self.completed = []
+
+    async def agenerate(self, prompt: str) -> str:
+        await asyncio.sleep(0.05)
+        self.completed.append(prompt)
+        return "Refined output"
+
+
+VIDEOS = [
+    {
+        "video_id": "vid1",
+        "video_transcripts": [{"id": 1, "timestamp": 0.0, "word": "apple"}],
+    }
+]
+PDFS = [{"pdf_id": "doc.pdf", "pages": ["Apple pie\n\nBanana bread"]}]
+
+
+def make_retriever():
+    return Retriever.from_sources(VIDEOS, PDFS, DummyEmbedder())
+
+
+def test_retrieve_keeps_video_precedence():
+    retriever = make_retriever()
+    coordinator = RetrievalCoordinator(0.5, 0.5)
+
+    video, pdf = coordinator.retrieve(retriever, "apple?")
+    assert video.video_id == "vid1" and pdf is None
+
+    video, pdf = coordinator.retrieve(retriever, "banana?")
+    assert video is None and pdf.pdf_id == "doc.pdf"
+
+    assert coordinator.retrieve(retriever, "cherry?") == (None, None)
+
+
+def test_retrieve_batch_matches_sequential_retrieval():
+    retriever = make_retriever()
+    coordinator = RetrievalCoordinator(0.5, 0.5)
+    questions = ["apple?", "banana?", "cherry?"]
+
+    concurrent = coordinator.retrieve_batch(retriever, questions)
+    sequential = retriever.retrieve_batch(questions, 0.5, 0.5)
+
+    for (video, pdf), (expected_video, expected_pdf) in zip(concurrent, sequential):
+        assert bool(video) == bool(expected_video)
+        assert bool(pdf) == bool(expected_pdf)
+
+
+def test_answer_cancels_speculative_pdf_refinement_on_video_hit():
+    retriever = make_retriever()
+    llm = SlowLLMClient()
+    refiner = AnswerRefiner(llm)
+    coordinator = RetrievalCoordinator(0.5, 0.5, speculative_pdf_refinement=True)
+
+    async def run():
+        answers = await coordinator.answer(retriever, "apple?", refiner)
+        await asyncio.sleep(0.1)
+        return answers
+
+    video, pdf = asyncio.run(run())
+
+    assert video.refined_answer == "Refined output"
+    assert pdf is None
+    assert len(llm.completed) == 1
+
+
+def test_answer_can_let_speculative_refinement_warm_the_cache():
+    retriever = make_retriever()
+    cache = LRUCache()
+    refiner = AnswerRefiner(SlowLLMClient(), cache=cache)
+    coordinator = RetrievalCoordinator(
+        0.5, 0.5, speculative_pdf_refinement=True, cancel_pdf_refinement=False
+    )
+
+    async def run():
+        answers = await coordinator.answer(retriever, "apple?", refiner)
+        await asyncio.sleep(0.1)
+        return answers
+
+    video, pdf = asyncio.run(run())
+
+    assert video is not None and pdf is None
+    assert len(cache) == 2
+
+
+def test_answer_refines_pdf_on_video_miss():
+    retriever = make_retriever()
+    coordinator = RetrievalCoordinator(0.5, 0.5)
+
+    video, pdf = asyncio.run(
+        coordinator.answer(retriever, "banana?", AnswerRefiner(SlowLLMClient()))
+    )
+
+    assert video is None
+    assert pdf.summary == "Refined output"
+
+
+def test_video_and_pdf_searches_overlap():
+    retriever = make_retriever()
+    searching = {"video": threading.Event(), "pdf": threading.Event()}
+
+    def waits_for_other_source(source, other, search):
+        def answer_vector(q_vec):
+            # Each search only returns once the other one is running too.
+            searching[source].set()
+            assert searching[other].wait(timeout=5)
+            return search(q_vec)
+        return answer_vector
+
+    video_rag, pdf_rag = retriever.video_rag, retriever.pdf_rag
+    video_rag.answer_vector = waits_for_other_source("video", "pdf", video_rag.answer_vector)
+    pdf_rag.answer_vector = waits_for_other_source("pdf", "video", pdf_rag.answer_vector)
+
+    video, pdf = RetrievalCoordinator(0.5, 0.5).retrieve(retriever, "banana?")
+    assert video is None and pdf.pdf_id == "doc.pdf"
@@ -29,3 +29,46 @@ def test_retrieve_from_videos_runs():
 
     # Should not crash
     assert answer is not None
+
+
+class CountingEmbedder(DummyEmbedder):
+    def __init__(self):
+        self.embed_texts_calls = 0
+
+    def embed_texts(self, texts):
+        self.embed_texts_calls += 1
+        return super().embed_texts(texts)
+
+
+def test_retriever_builds_indexes_once():
+    from rag.retrievel import Retriever
+
+    videos = [
+        {
+            "video_id": "vid1",
+            "video_transcripts": [
+                {"id": 1, "timestamp": 0.0, "word": "click"},
+                {"id": 2, "timestamp": 0.5, "word": "save"},
+            ],
+        }
+    ]
+    pdfs = [{"pdf_id": "doc.pdf", "pages": ["Registration instructions"]}]
+
+    embedder = CountingEmbedder()
+    retriever = Retriever.from_sources(videos, pdfs, embedder)
+    assert embedder.embed_texts_calls == 2
+
+    for _ in range(3):
+        assert retriever.retrieve_video("How do I save?", threshold=0.0) is not None
+        assert retriever.retrieve_pdf("How do I register?", threshold=0.0) is not None
+
+    assert embedder.embed_texts_calls == 2
+
+
+def test_retriever_with_empty_source():
+    from rag.retrievel import Retriever
+
+    retriever = Retriever.from_sources([], [], DummyEmbedder())
+
+    assert retriever.retrieve_video("How do I save?", threshold=0.0) is None
+    assert retriever.retrieve_pdf("How do I save?", threshold=0.0) is None
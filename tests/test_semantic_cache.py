@@ -0,0 +1,38 @@
+import numpy as np
+
+from rag.semantic_cache import SemanticAnswerCache
+
+
+def unit(*values):
+    vec = np.array(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def test_semantic_cache_hits_near_duplicates_only():
+    cache = SemanticAnswerCache(max_size=10, threshold=0.9)
+    cache.store(unit(1, 0, 0), "add customer answer", corpus_version=1)
+
+    assert cache.lookup(unit(1, 0.1, 0), corpus_version=1) == "add customer answer"
+    assert cache.lookup(unit(0, 1, 0), corpus_version=1) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_semantic_cache_invalidated_by_corpus_change():
+    cache = SemanticAnswerCache(max_size=10, threshold=0.9)
+    cache.store(unit(1, 0, 0), "old answer", corpus_version=1)
+
+    assert cache.lookup(unit(1, 0, 0), corpus_version=2) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    cache = SemanticAnswerCache(max_size=2, threshold=0.99)
+    cache.store(unit(1, 0, 0), "a", corpus_version=1)
+    cache.store(unit(0, 1, 0), "b", corpus_version=1)
+    cache.lookup(unit(1, 0, 0), corpus_version=1)
+    cache.store(unit(0, 0, 1), "c", corpus_version=1)
+
+    assert cache.lookup(unit(0, 1, 0), corpus_version=1) is None
+    assert cache.lookup(unit(1, 0, 0), corpus_version=1) == "a"
+    assert cache.lookup(unit(0, 0, 1), corpus_version=1) == "c"
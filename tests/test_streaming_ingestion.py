@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+from indexing.snapshots import current_snapshot_dir
+from preprocessing.video.load_videos_data import load_video_file
+from rag.retrievel import Retriever, ingest_sources
+
+
+class DummyEmbedder:
+    model_name = "dummy"
+
+    def __init__(self, fail_after=None):
+        self.batches = []
+        self.fail_after = fail_after
+
+    def embed_texts(self, texts):
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise RuntimeError("embedding service went away")
+        self.batches.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+def write_transcripts(folder, count):
+    folder.mkdir()
+    for i in range(count):
+        tokens = [{"id": j, "timestamp": float(j), "word": f"w{i}_{j}"} for j in range(3)]
+        (folder / f"video_{i:02d}.json").write_text(
+            json.dumps({"video_id": f"vid{i}", "video_transcripts": tokens})
+        )
+    return folder
+
+
+def test_ingest_embeds_fixed_size_batches(tmp_path):
+    videos = write_transcripts(tmp_path / "videos", 5)
+    embedder = DummyEmbedder()
+
+    retriever = ingest_sources(embedder, str(videos), None, batch_size=2)
+
+    assert [len(batch) for batch in embedder.batches] == [2, 2, 1]
+    assert sorted(retriever.documents) == [f"vid{i}" for i in range(5)]
+    assert len(retriever.video_rag.index) == len(retriever.video_rag.chunks) == 5
+
+
+def test_streamed_build_matches_in_memory_build(tmp_path):
+    videos = write_transcripts(tmp_path / "videos", 4)
+    loaded = [load_video_file(path) for path in sorted(videos.glob("*.json"))]
+
+    streamed = ingest_sources(DummyEmbedder(), str(videos), None, batch_size=3)
+    in_memory = Retriever.from_sources(loaded, [], DummyEmbedder())
+
+    assert streamed.documents == in_memory.documents
+    assert {i: c.text for i, c in streamed.video_rag.chunks.items()} == {
+        i: c.text for i, c in in_memory.video_rag.chunks.items()
+    }
+
+
+def test_interrupted_ingestion_resumes_from_checkpoint(tmp_path):
+    videos = write_transcripts(tmp_path / "videos", 6)
+    checkpoint_dir = tmp_path / "checkpoint"
+
+    # One chunk per transcript: checkpoints after files 2 and 4, then fail.
+    with pytest.raises(RuntimeError):
+        ingest_sources(
+            DummyEmbedder(fail_after=4), str(videos), None,
+            checkpoint_dir=str(checkpoint_dir), batch_size=1, checkpoint_every=2,
+        )
+    assert current_snapshot_dir(checkpoint_dir) is not None
+
+    embedder = DummyEmbedder()
+    retriever = ingest_sources(
+        embedder, str(videos), None,
+        checkpoint_dir=str(checkpoint_dir), batch_size=1, checkpoint_every=2,
+    )
+
+    embedded = [text for batch in embedder.batches for text in batch]
+    assert embedded == ["w4_0 w4_1 w4_2", "w5_0 w5_1 w5_2"]
+    assert sorted(retriever.documents) == [f"vid{i}" for i in range(6)]
+    assert len(retriever.video_rag.index) == 6
+    assert not checkpoint_dir.exists()
+
+
+def test_ingestion_records_source_files(tmp_path):
+    videos = write_transcripts(tmp_path / "videos", 2)
+    (videos / "video_02.json").write_text((videos / "video_00.json").read_text())
+
+    retriever = ingest_sources(DummyEmbedder(), str(videos), None)
+
+    assert retriever.source_files == {
+        "vid0": [str(videos / "video_00.json"), str(videos / "video_02.json")],
+        "vid1": [str(videos / "video_01.json")],
+    }
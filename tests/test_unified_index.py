@@ -0,0 +1,108 @@
+import numpy as np
+
+from rag.retrievel import Retriever, load_or_build_retriever
+
+
+class TableEmbedder:
+    """
+    Embeds texts by looking up the first word in a fixed vector table.
+    """
+
+    model_name = "table"
+
+    VECTORS = {
+        "apple": [1.0, 0.0, 0.0],
+        "apricot": [0.8, 0.6, 0.0],
+        "avocado": [0.6, 0.8, 0.0],
+        "banana": [0.0, 1.0, 0.0],
+        "cherry": [0.0, 0.0, 1.0],
+        "plum": [0.9, 0.436, 0.0],
+    }
+
+    def embed_texts(self, texts):
+        return np.array([self.embed_query(t) for t in texts], dtype=np.float32)
+
+    def embed_query(self, query):
+        return np.array(self.VECTORS[query.split()[0].lower().strip("?")], dtype=np.float32)
+
+    def embed_queries(self, queries):
+        return self.embed_texts(queries)
+
+
+def video(video_id, word):
+    return {
+        "video_id": video_id,
+        "video_transcripts": [{"id": 1, "timestamp": 0.0, "word": word}],
+    }
+
+
+VIDEOS = [video("vid1", "apple"), video("vid2", "apricot")]
+PDFS = [{"pdf_id": "doc.pdf", "pages": ["Banana bread\n\nAvocado toast"]}]
+QUESTIONS = ["apple?", "banana?", "avocado?", "cherry?"]
+
+
+def summary(answers):
+    return [
+        (v.video_id if v else None, p.text if p else None)
+        for v, p in answers
+    ]
+
+
+def test_unified_index_matches_separate_indexes():
+    embedder = TableEmbedder()
+    separate = Retriever.from_sources(VIDEOS, PDFS, embedder)
+    unified = Retriever.from_sources(VIDEOS, PDFS, embedder, unified=True)
+
+    assert unified.unified and unified.video_rag is unified.pdf_rag
+    assert len(unified.video_rag.index) == 4
+
+    for threshold in (0.5, 0.9):
+        expected = separate.retrieve_batch(QUESTIONS, threshold, threshold)
+        assert summary(unified.retrieve_batch(QUESTIONS, threshold, threshold)) == summary(expected)
+
+    assert unified.retrieve_video("banana?", 0.0).video_id == "vid2"
+    assert unified.retrieve_pdf("apple?", 0.0).pdf_id == "doc.pdf"
+
+
+def test_unified_search_widens_k_until_sources_settle():
+    unified = Retriever.from_sources(VIDEOS, PDFS, TableEmbedder(), unified=True)
+    unified.unified_k = 1
+
+    # Both videos outrank the PDF chunk but stay below the video threshold.
+    [(video_answer, pdf_answer)] = unified.retrieve_batch(["plum?"], 0.99, 0.5)
+    assert video_answer is None
+    assert pdf_answer.text == "Avocado toast"
+
+
+def test_unified_index_add_remove_and_snapshot(tmp_path):
+    embedder = TableEmbedder()
+    retriever = Retriever.from_sources(VIDEOS, [], embedder, unified=True)
+
+    retriever.add_document("pdf", {"pdf_id": "new.pdf", "pages": ["Cherry jam"]})
+    assert retriever.retrieve_pdf("cherry?", 0.5).pdf_id == "new.pdf"
+
+    retriever.remove_document("vid1")
+    assert retriever.retrieve_video("apple?", 0.9) is None
+
+    retriever.save(tmp_path)
+    loaded = Retriever.load(tmp_path, embedder)
+    assert loaded.unified
+    assert loaded.documents == retriever.documents
+    assert summary(loaded.retrieve_batch(QUESTIONS, 0.5, 0.5)) == summary(
+        retriever.retrieve_batch(QUESTIONS, 0.5, 0.5)
+    )
+
+
+def test_snapshot_with_other_layout_is_rebuilt(tmp_path, monkeypatch):
+    embedder = TableEmbedder()
+    Retriever.from_sources(VIDEOS, PDFS, embedder).save(tmp_path)
+
+    built = []
+    monkeypatch.setattr(
+        "rag.retrievel.build_retriever",
+        lambda *args, unified=False: built.append(unified)
+        or Retriever.from_sources(VIDEOS, PDFS, embedder, unified=unified),
+    )
+
+    retriever = load_or_build_retriever(embedder, None, None, index_dir=tmp_path, unified=True)
+    assert retriever.unified and built == [True]
@@ -1,5 +1,9 @@
+import pytest
+import faiss
 import numpy as np
 from indexing.faiss.vector_index import VectorIndex
+from indexing.faiss.index_factory import IndexConfig
+from indexing.faiss.rescore_store import RescoreStore
 
 def test_vector_index_search():
     index = VectorIndex(dim=2)
@@ -15,3 +19,205 @@ def test_vector_index_search():
     scores, indices = index.search(query, k=1)
 
     assert indices[0][0] == 0
+
+
+def test_vector_index_save_and_mmap_load(tmp_path):
+    index = VectorIndex(dim=2)
+    index.add(np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32))
+
+    path = tmp_path / "test.index"
+    index.save(path)
+    loaded = VectorIndex.load(path, mmap=True)
+
+    assert len(loaded) == 2
+    scores, indices = loaded.search(np.array([0.0, 1.0], dtype=np.float32), k=1)
+    assert indices[0][0] == 1
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq", "hnsw", "sq_fp16", "sq_int8"])
+def test_vector_index_types_find_exact_match(index_type):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    index = VectorIndex(dim=16, config=IndexConfig(index_type, nlist=8, nprobe=8, pq_m=4))
+    index.add(vectors)
+
+    assert len(index) == 300
+    scores, indices = index.search(vectors[42], k=1)
+    assert indices[0][0] == 42
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq", "sq_int8"])
+def test_mmap_loaded_index_accepts_writes(tmp_path, index_type):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    config = IndexConfig(index_type, nlist=4, nprobe=4, pq_m=4)
+
+    index = VectorIndex(dim=16, config=config)
+    index.add(vectors[:200])
+    path = tmp_path / "test.index"
+    index.save(path)
+    loaded = VectorIndex.load(path, mmap=True, config=config)
+
+    loaded.add(vectors[200:], ids=np.arange(200, 300))
+    assert loaded.remove_range(0, 10) == 10
+    assert len(loaded) == 290
+    assert loaded.search(vectors[250], k=1)[1][0][0] == 250
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "sq_int8", "ivf_flat"])
+def test_mmap_load_keeps_vectors_on_disk_until_written(tmp_path, index_type):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    config = IndexConfig(index_type, nlist=4, nprobe=4)
+
+    index = VectorIndex(dim=16, config=config)
+    index.add(vectors[:200])
+    path = tmp_path / "test.index"
+    index.save(path)
+
+    assert VectorIndex.load(path, mmap=False, config=config).is_mmapped is False
+    loaded = VectorIndex.load(path, mmap=True, config=config)
+    assert loaded.is_mmapped
+    # Snapshots copy the index without reading it into memory.
+    loaded.copy().save(tmp_path / "copy.index")
+    assert loaded.is_mmapped == (index_type != "ivf_flat")
+
+    loaded.add(vectors[200:], ids=np.arange(200, 300))
+    assert not loaded.is_mmapped
+    assert loaded.search(vectors[250], k=1)[1][0][0] == 250
+    assert len(VectorIndex.load(tmp_path / "copy.index", config=config)) == 200
+
+
+@pytest.mark.parametrize("index_type", ["sq_fp16", "sq_int8"])
+def test_quantized_index_returns_exact_scores(index_type):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    index = VectorIndex(dim=16, config=IndexConfig(index_type))
+    index.add(vectors)
+
+    scores, indices = index.search_batch(vectors[:5], k=3)
+    assert indices[:, 0].tolist() == [0, 1, 2, 3, 4]
+    exact = np.einsum("qd,qkd->qk", vectors[:5], vectors[indices])
+    assert np.allclose(scores, exact, atol=1e-6)
+
+
+def test_quantized_index_save_and_mmap_load_rescore_vectors(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    config = IndexConfig("sq_int8")
+    index = VectorIndex(dim=8, config=config)
+    index.add(vectors, ids=np.arange(100) + 1000)
+    index.remove_ids(np.array([1007]))
+
+    path = tmp_path / "test.index"
+    index.save(path)
+    loaded = VectorIndex.load(path, mmap=True, config=config)
+
+    assert len(loaded.rescore_store) == 99
+    scores, indices = loaded.search(vectors[3], k=1)
+    assert indices[0][0] == 1003
+    assert scores[0][0] == pytest.approx(1.0, abs=1e-6)
+    scores, indices = loaded.search(vectors[7], k=2)
+    assert 1007 not in indices[0]
+
+
+def test_rescore_store_spills_vectors_to_memory_mapped_segments():
+    rng = np.random.default_rng(0)
+    store = RescoreStore(dim=8, spill_rows=50)
+    expected = {}
+    for _ in range(20):
+        ids = rng.integers(0, 400, size=30)
+        vectors = rng.standard_normal((30, 8)).astype(np.float32)
+        store.add(ids, vectors)
+        expected.update(zip(ids.tolist(), vectors))
+
+    ids = np.array(sorted(expected))
+    assert len(store) == len(ids)
+    # Only IDs and the unspilled tail stay resident.
+    assert store.resident_nbytes < len(ids) * 8 + 50 * 8 * 4 * 2
+    assert np.array_equal(store.get(ids), np.array([expected[i] for i in ids]))
+
+
+def test_quantized_index_without_rescoring():
+    index = VectorIndex(dim=2, config=IndexConfig("sq_fp16", rescore_factor=0))
+    index.add(np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32))
+
+    assert index.rescore_store is None
+    scores, indices = index.search(np.array([0.0, 1.0], dtype=np.float32), k=1)
+    assert indices[0][0] == 1
+
+
+def low_rank_vectors(n, dim, rank, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, rank)) @ rng.standard_normal((rank, dim))
+    vectors += 0.1 * rng.standard_normal((n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "hnsw", "sq_int8"])
+def test_pca_index_shortlists_and_rescores_at_full_dimension(index_type):
+    vectors = low_rank_vectors(500, 32, rank=6)
+
+    index = VectorIndex(dim=32, config=IndexConfig(index_type, pca_dim=8, shortlist=20))
+    index.add(vectors)
+
+    reduced = index.index.index if isinstance(index.index, faiss.IndexIDMap) else index.index
+    assert faiss.downcast_index(reduced).index.d == 8
+    scores, indices = index.search_batch(vectors[:10], k=1)
+    assert indices[:, 0].tolist() == list(range(10))
+    assert np.allclose(scores[:, 0], 1.0, atol=1e-5)
+
+
+def test_pca_index_on_small_corpus_stays_at_full_dimension():
+    vectors = low_rank_vectors(5, 32, rank=6)
+
+    index = VectorIndex(dim=32, config=IndexConfig("flat", pca_dim=8))
+    index.add(vectors[:3])
+    index.add(vectors[3:])
+
+    assert faiss.downcast_index(index.index.index).d == 32
+    assert index.rescore_store is None
+    scores, indices = index.search_batch(vectors, k=1)
+    assert indices[:, 0].tolist() == list(range(5))
+
+
+def test_pca_projection_is_saved_with_the_index(tmp_path):
+    vectors = low_rank_vectors(300, 32, rank=6)
+    config = IndexConfig("flat", pca_dim=8, shortlist=20)
+    index = VectorIndex(dim=32, config=config)
+    index.add(vectors)
+
+    path = tmp_path / "test.index"
+    index.save(path)
+    loaded = VectorIndex.load(path, mmap=False, config=IndexConfig("flat"))
+
+    assert loaded.rescore_store is not None
+    scores, indices = loaded.search(vectors[5], k=1)
+    assert indices[0][0] == 5
+    assert scores[0][0] == pytest.approx(1.0, abs=1e-5)
+    assert loaded.remove_range(0, 10) == 10
+    assert loaded.search(vectors[5], k=1)[1][0][0] != 5
+
+
+def test_index_config_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        IndexConfig("annoy")
+
+
+def test_index_config_from_env(monkeypatch):
+    monkeypatch.setenv("INDEX_TYPE", "HNSW")
+    monkeypatch.setenv("INDEX_EF_SEARCH", "128")
+
+    config = IndexConfig.from_env()
+
+    assert config.index_type == "hnsw"
+    assert config.ef_search == 128
+    assert config.pca_dim == 0
@@ -47,3 +47,51 @@ def test_video_chunking_with_overlap():
     assert chunks[1].text == "world click"
     assert chunks[2].text == "click save"
 
+
+
+def test_transcript_columns_text_slices():
+    from preprocessing.video.transcript_columns import TranscriptColumns
+
+    tokens = [
+        {"id": 10, "timestamp": 0.1, "word": "héllo"},
+        {"id": 11, "timestamp": 10.4, "word": "world"},
+        {"id": 12, "timestamp": 11.0, "word": "save"},
+    ]
+    columns = TranscriptColumns.from_tokens("vid1", tokens)
+
+    assert len(columns) == 3
+    assert columns.ids.dtype.name == "int64"
+    assert columns.timestamps.dtype.name == "float32"
+    assert columns.text(0, 3) == "héllo world save"
+    assert columns.text(1, 2) == "world"
+    assert columns.text(2, 2) == ""
+
+
+def test_columnar_chunking_matches_token_dicts():
+    from preprocessing.video.transcript_columns import TranscriptColumns
+    from preprocessing.video.video_chunking import get_chunk_text
+
+    tokens = [
+        {"id": i + 1, "timestamp": round(0.4 * i, 1), "word": f"w{i}"}
+        for i in range(47)
+    ]
+    chunks = chunk_video_transcript(
+        video_id="vid1",
+        tokens=TranscriptColumns.from_tokens("vid1", tokens),
+        chunk_size=20,
+        overlap=2,
+    )
+
+    expected = []
+    for i in range(0, len(tokens), 18):
+        window = tokens[i : i + 20]
+        expected.append((
+            window[0]["id"], window[-1]["id"],
+            window[0]["timestamp"], window[-1]["timestamp"],
+            get_chunk_text(window),
+        ))
+
+    assert [
+        (c.start_token_id, c.end_token_id, c.start_timestamp, c.end_timestamp, c.text)
+        for c in chunks
+    ] == expected
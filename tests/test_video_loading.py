@@ -0,0 +1,63 @@
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from preprocessing.video.load_videos_data import (
+    iter_video_files,
+    parse_video_transcript,
+    read_video_transcript,
+)
+
+SAMPLES = sorted(Path(__file__).resolve().parent.parent.glob("data/video_transcript_source/*.json"))
+
+
+def assert_same_columns(a, b):
+    assert np.array_equal(a.ids, b.ids)
+    assert np.array_equal(a.timestamps, b.timestamps)
+    assert np.array_equal(a.offsets, b.offsets)
+    assert a.blob == b.blob
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 1 << 16])
+def test_streaming_reader_matches_json_load(read_size):
+    for path in SAMPLES:
+        expected = parse_video_transcript(json.loads(path.read_text()))
+        with open(path) as f:
+            streamed = read_video_transcript(f, read_size=read_size)
+
+        assert streamed["video_id"] == expected["video_id"]
+        assert_same_columns(streamed["video_transcripts"], expected["video_transcripts"])
+
+
+def test_streaming_reader_accepts_any_key_order():
+    doc = '{"video_transcripts": [{"id": 1, "timestamp": 0.5, "word": "caf\\u00e9"}], "duration": 12, "video_id": "v"}'
+
+    video = read_video_transcript(io.StringIO(doc), read_size=3)
+
+    assert video["video_id"] == "v"
+    assert video["video_transcripts"].text(0, 1) == "café"
+
+
+def test_streaming_reader_rejects_truncated_documents():
+    doc = '{"video_id": "v", "video_transcripts": [{"id": 1, "timestamp": 0.5, "word": "a"},'
+
+    with pytest.raises(ValueError):
+        read_video_transcript(io.StringIO(doc), read_size=4)
+
+
+def test_iter_video_files_keeps_order_and_skips_unreadable(tmp_path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"video_{i}.json"
+        tokens = [{"id": 0, "timestamp": 0.0, "word": f"w{i}"}]
+        path.write_text(json.dumps({"video_id": f"v{i}", "video_transcripts": tokens}))
+        paths.append(path)
+    paths[2].write_text("{not json")
+
+    loaded = list(iter_video_files(paths, workers=3))
+
+    assert [path.name for path, _ in loaded] == ["video_0.json", "video_1.json", "video_3.json", "video_4.json"]
+    assert [video["video_id"] for _, video in loaded] == ["v0", "v1", "v3", "v4"]